@@ -0,0 +1,115 @@
+"""
+Memory per object and construction time for the domain objects
+(Player, Team, Congregation, TeamState, GameState), one at a time
+and in bulk with Player.from_arrays.
+Also run as the objects case of benchmarks/suite.py.
+
+    python benchmarks/bench_objects.py [-n 100000] [--json]
+"""
+import gc
+import sys
+import json
+import time
+import random
+import argparse
+import tracemalloc
+
+from gator_poking.core import (
+    DefaultConfig,
+    Player,
+    Team,
+    Congregation
+)
+from gator_poking.states import GameState, TeamState
+
+
+def measure(label, n, build):
+    """
+    Time build(n), which makes n objects, then build them again under
+    tracemalloc to measure the memory still allocated per object
+    """
+    gc.collect()
+    start = time.perf_counter()
+    objects = build(n)
+    elapsed = time.perf_counter() - start
+    del objects
+
+    gc.collect()
+    tracemalloc.start()
+    objects = build(n)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return {
+        'name': label,
+        'n': n,
+        'us_per_object': 1e6*elapsed/n,
+        'bytes_per_object': current/n,
+    }
+
+
+def run(n):
+    """
+    Measure every kind of object n at a time, and return one result per kind
+    """
+    rng = random.Random(0)
+    names = [f"Player {i}" for i in range(n)]
+    ids = [f"id-{i}" for i in range(n)]
+    stars = [[rng.randint(1, 5) for i in range(n)] for k in range(4)]
+    config = DefaultConfig()
+    team = Team(city="Tampa", nickname="Pokers", color="Red")
+    cong = Congregation(place="Everglades", nickname="Glories", agg=3, rea=3, rxn=3, con=3)
+
+    def players(n):
+        agg, rea, rxn, con = stars
+        return [
+            Player(id=ids[i], name=names[i], agg=agg[i], rea=rea[i], rxn=rxn[i], con=con[i])
+            for i in range(n)
+        ]
+
+    def players_bulk(n):
+        return Player.from_arrays(names, *stars, ids=ids)
+
+    def teams(n):
+        return [Team(id=ids[i], city="Tampa", nickname="Pokers", color="Red") for i in range(n)]
+
+    def congregations(n):
+        return [
+            Congregation(id=ids[i], place="Everglades", nickname="Glories", agg=3, rea=3, rxn=3, con=3)
+            for i in range(n)
+        ]
+
+    def team_states(n):
+        return [TeamState(team) for i in range(n)]
+
+    def game_states(n):
+        return [GameState(config, team, team, None, None, cong) for i in range(n)]
+
+    return [
+        measure('Player', n, players),
+        measure('Player.from_arrays', n, players_bulk),
+        measure('Team', n, teams),
+        measure('Congregation', n, congregations),
+        measure('TeamState', n, team_states),
+        measure('GameState', n, game_states),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('-n', type=int, default=100000, help='number of objects of each kind')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args(argv)
+    results = run(args.n)
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=4)
+        print()
+    else:
+        print(f"{'object':<20} {'us/object':>10} {'bytes/object':>13}")
+        for r in results:
+            print(f"{r['name']:<20} {r['us_per_object']:>10.2f} {r['bytes_per_object']:>13.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,446 @@
+"""
+Benchmark suite for the simulation hot paths, at several sizes, with stored baselines.
+
+    python benchmarks/suite.py [--scale quick|full] [--only CASE ...] [--json]
+                               [--save NAME] [--compare NAME] [--threshold 0.1]
+
+Every case runs at each of its sizes in a fresh interpreter, so peak RSS
+is that case's own, and import times are measured from a cold start.
+Each result reports the best time per call over repeated calls (at least
+--min-time seconds in total), the rate in the case's unit (games/sec,
+balls/sec, teams/sec, ...) and the peak RSS of the process.
+
+--save NAME writes the results to benchmarks/baselines/NAME.json, and
+--compare NAME prints them next to a saved baseline, flagging every
+result slower than the baseline by more than --threshold (exit status 1).
+"""
+import os
+import sys
+import atexit
+import json
+import time
+import random
+import shutil
+import logging
+import argparse
+import platform
+import tempfile
+import resource
+import subprocess
+
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+BASELINE_DIR = os.path.join(HERE, 'baselines')
+
+# Modules whose cold import time is reported
+IMPORT_MODULES = ['gator_poking', 'gator_poking.game', 'gator_poking.montecarlo']
+IMPORT_REPEAT = 5
+
+
+##################################
+# Cases
+#
+# A case function takes a size and returns a callable running the work once,
+# which returns the number of units done (and optionally the number of balls played).
+
+CASES = {}
+
+
+def case(name, unit, quick, full):
+    """
+    Register a case, run at the quick sizes by default and at the full sizes with --scale full
+    """
+    def register(f):
+        CASES[name] = {'setup': f, 'unit': unit, 'quick': quick, 'full': full}
+        return f
+    return register
+
+
+def make_teams(rng):
+    from gator_poking.core import Team, Congregation
+    from gator_poking.generators import RosterGenerator
+    team1 = Team(city="Tampa", nickname="Pokers", color="Red")
+    team2 = Team(city="Ocala", nickname="Prodders", color="Blue")
+    team1.set_roster(RosterGenerator().generate(size=11, rng=rng))
+    team2.set_roster(RosterGenerator().generate(size=11, rng=rng))
+    congregation = Congregation(place="Everglades", nickname="Glories", agg=3, rea=3, rxn=3, con=3)
+    return team1, team2, congregation
+
+
+def make_name_files(workdir):
+    """
+    Write name files with 400 cities x 400 nicknames (and 12 colors),
+    since the bundled ones only make 49 distinct team names
+    """
+    files = []
+    for label, n in [('cities', 400), ('nicknames', 400), ('colors', 12)]:
+        path = os.path.join(workdir, f'{label}.txt')
+        with open(path, 'w') as f:
+            f.write(''.join(f"{label.title()} {i}\n" for i in range(n)))
+        files.append(path)
+    return files
+
+
+@case('beta_inv_cdf', 'samples', quick=[100, 1000], full=[100, 1000, 10000])
+def bench_beta_inv_cdf(size):
+    from gator_poking.betaroll import BetaRoll
+    rng = random.Random(0)
+    def run():
+        for i in range(size):
+            BetaRoll.random_sample_beta_inv_cdf(0.5, 3.0, rng)
+        return size
+    return run
+
+
+@case('attr_roll', 'rolls', quick=[1000, 100000], full=[1000, 100000, 1000000])
+def bench_attr_roll(size):
+    from gator_poking.outcomeroll import OutcomeRoll
+    player, _, congregation = make_teams(random.Random(0))
+    player = player.roster[0]
+    gator = congregation.get_next_gator()
+    rng = random.Random(0)
+    OutcomeRoll.get_tables()
+    def run():
+        for i in range(size):
+            OutcomeRoll.attr_roll('agg', player, gator, rng)
+        return size
+    return run
+
+
+@case('outcome_roll', 'rolls', quick=[1000, 100000], full=[1000, 100000, 1000000])
+def bench_outcome_roll(size):
+    from gator_poking.outcomeroll import OutcomeRoll
+    player, _, congregation = make_teams(random.Random(0))
+    player = player.roster[0]
+    gator = congregation.get_next_gator()
+    rng = random.Random(0)
+    OutcomeRoll.outcome_roll(player, gator, rng=rng)
+    def run():
+        for i in range(size):
+            OutcomeRoll.outcome_roll(player, gator, rng=rng)
+        return size
+    return run
+
+
+@case('generate_half', 'innings', quick=[1, 1000], full=[1, 1000, 100000])
+def bench_generate_half(size):
+    from gator_poking.core import DefaultConfig
+    from gator_poking.states import GameState, TeamState
+    from gator_poking.inninggenerator import InningGenerator
+    rng = random.Random(0)
+    team1, team2, congregation = make_teams(rng)
+    config = DefaultConfig()
+    def run():
+        balls = 0
+        for i in range(size):
+            # Team states hold a whole game's score, so each innings gets fresh ones
+            state = GameState(config, team1, team2, TeamState(team1), TeamState(team2), congregation, rng, None)
+            balls += InningGenerator.generate_half(config, state, True).nballs
+        return size, balls
+    return run
+
+
+@case('game', 'games', quick=[1, 1000], full=[1, 1000, 100000])
+def bench_game(size):
+    from gator_poking import Game
+    rng = random.Random(0)
+    team1, team2, congregation = make_teams(rng)
+    def run():
+        balls = 0
+        for i in range(size):
+            game = Game(team1=team1, team2=team2, congregation=congregation, rng=rng)
+            game.simulate()
+            balls += game.innings[0].nballs + game.innings[1].nballs
+        return size, balls
+    return run
+
+
+@case('montecarlo', 'games', quick=[1, 1000, 100000], full=[1, 1000, 100000])
+def bench_montecarlo(size):
+    from gator_poking import MonteCarloGame
+    team1, team2, congregation = make_teams(random.Random(0))
+    game = MonteCarloGame(team1=team1, team2=team2, congregation=congregation)
+    def run():
+        result = game.simulate(size, seed=0)
+        return size, int(result.balls1.sum() + result.balls2.sum())
+    return run
+
+
+@case('league_generate', 'teams', quick=[4, 1000], full=[4, 1000, 100000])
+def bench_league_generate(size):
+    from gator_poking import LeagueGenerator
+    workdir = tempfile.mkdtemp()
+    generator = LeagueGenerator(*make_name_files(workdir))
+    shutil.rmtree(workdir)
+    rng = random.Random(0)
+    def run():
+        generator.generate(size=size, rng=rng)
+        return size
+    return run
+
+
+def league_file(size):
+    """
+    Write a league of size teams, and return the league file and the directory it is in
+    """
+    from gator_poking import LeagueGenerator
+    workdir = tempfile.mkdtemp()
+    atexit.register(shutil.rmtree, workdir, True)
+    generator = LeagueGenerator(*make_name_files(workdir))
+    _, json_file = generator.generate(working_dir=workdir, size=size, rng=random.Random(0))
+    return json_file, workdir
+
+
+@case('league_load', 'teams', quick=[4, 1000], full=[4, 1000, 100000])
+def bench_league_load(size):
+    from gator_poking import League
+    json_file, _ = league_file(size)
+    def run():
+        League(json_file).get_teams()
+        return size
+    return run
+
+
+@case('league_load_indexed', 'teams', quick=[4, 1000], full=[4, 1000, 100000])
+def bench_league_load_indexed(size):
+    from gator_poking import League
+    json_file, cache_dir = league_file(size)
+    League(json_file, cache_dir=cache_dir)
+    def run():
+        League(json_file, cache_dir=cache_dir).get_teams()
+        return size
+    return run
+
+
+@case('objects', 'objects', quick=[10000], full=[100000])
+def bench_objects(size):
+    # Measured by bench_objects itself; see run_case
+    sys.path.insert(0, HERE)
+    import bench_objects
+    return bench_objects
+
+
+##################################
+# Running
+
+def time_call(run, min_time):
+    """
+    Call run() until min_time seconds have passed (at least once),
+    and return the best time per call with the counts it returned
+    """
+    best = None
+    total = 0.0
+    while best is None or total < min_time:
+        start = time.perf_counter()
+        counts = run()
+        elapsed = time.perf_counter() - start
+        total += elapsed
+        if best is None or elapsed < best:
+            best = elapsed
+    if not isinstance(counts, tuple):
+        counts = (counts, None)
+    return best, counts
+
+
+def peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        rss /= 1024
+    return rss/1024
+
+
+def run_case(name, size, min_time):
+    """
+    Run one case at one size in this process, and return its results
+    """
+    logging.getLogger('gp').disabled = True
+    spec = CASES[name]
+    if name == 'objects':
+        results = []
+        for r in spec['setup'](size).run(size):
+            results.append({
+                'case': f"objects/{r['name']}",
+                'size': size,
+                'seconds': r['us_per_object']*1e-6*size,
+                'rate': 1e6/r['us_per_object'],
+                'unit': spec['unit'],
+                'bytes_per_object': r['bytes_per_object'],
+            })
+        for r in results:
+            r['peak_rss_mb'] = peak_rss_mb()
+        return results
+
+    # Warm up at the smallest size first, so lazy imports and table loads are not timed
+    spec['setup'](spec['quick'][0])()
+    run = spec['setup'](size)
+    seconds, (units, balls) = time_call(run, min_time)
+    result = {
+        'case': name,
+        'size': size,
+        'seconds': seconds,
+        'rate': units/seconds,
+        'unit': spec['unit'],
+    }
+    if balls is not None:
+        result['balls_per_sec'] = balls/seconds
+    result['peak_rss_mb'] = peak_rss_mb()
+    return [result]
+
+
+def run_in_subprocess(name, size, min_time):
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--worker', name, str(size), '--min-time', str(min_time)],
+        check=True, stdout=subprocess.PIPE
+    ).stdout
+    return json.loads(output)
+
+
+def import_times():
+    """
+    Return the best cold import time of each of IMPORT_MODULES, each in a fresh interpreter
+    """
+    results = []
+    for module in IMPORT_MODULES:
+        code = (
+            "import time, json, resource; start = time.perf_counter(); "
+            f"import {module}; "
+            "print(json.dumps([time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss]))"
+        )
+        best = None
+        for i in range(IMPORT_REPEAT):
+            output = subprocess.run([sys.executable, '-c', code], check=True, stdout=subprocess.PIPE).stdout
+            seconds, rss = json.loads(output)
+            if best is None or seconds < best[0]:
+                best = (seconds, rss)
+        results.append({
+            'case': f"import/{module}",
+            'size': 1,
+            'seconds': best[0],
+            'rate': None,
+            'unit': 'imports',
+            'peak_rss_mb': best[1]/1024,
+        })
+    return results
+
+
+def machine_info():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE,
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True
+        ).stdout.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'commit': commit,
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+##################################
+# Reporting
+
+def format_rate(result):
+    if result['rate'] is None:
+        return ''
+    return f"{result['rate']:.4g} {result['unit']}/s"
+
+
+def print_results(results):
+    print(f"{'case':<36} {'size':>8} {'s/call':>10} {'rate':>22} {'balls/s':>10} {'peak MB':>8}")
+    for r in results:
+        balls = f"{r['balls_per_sec']:.4g}" if 'balls_per_sec' in r else ''
+        print(f"{r['case']:<36} {r['size']:>8} {r['seconds']:>10.4g} {format_rate(r):>22} {balls:>10} {r['peak_rss_mb']:>8.1f}")
+
+
+def compare(results, baseline, threshold, file=sys.stdout):
+    """
+    Print each result next to the baseline's, and return the results
+    that are slower than the baseline by more than threshold
+    """
+    base = {(r['case'], r['size']): r for r in baseline['results']}
+    regressions = []
+    print(f"{'case':<36} {'size':>8} {'baseline s':>11} {'s/call':>10} {'ratio':>7} {'peak MB':>8}", file=file)
+    for r in results:
+        b = base.get((r['case'], r['size']))
+        if b is None:
+            print(f"{r['case']:<36} {r['size']:>8} {'-':>11} {r['seconds']:>10.4g} {'new':>7} {r['peak_rss_mb']:>8.1f}", file=file)
+            continue
+        ratio = r['seconds']/b['seconds']
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  SLOWER'
+            regressions.append(r)
+        elif ratio < 1 - threshold:
+            flag = '  faster'
+        print(f"{r['case']:<36} {r['size']:>8} {b['seconds']:>11.4g} {r['seconds']:>10.4g} {ratio:>7.2f} {r['peak_rss_mb']:>8.1f}{flag}", file=file)
+    return regressions
+
+
+def baseline_path(name):
+    return os.path.join(BASELINE_DIR, f'{name}.json')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--scale', choices=['quick', 'full'], default='quick', help='which sizes to run each case at')
+    parser.add_argument('--only', nargs='+', choices=sorted(CASES) + ['import'], help='run only these cases')
+    parser.add_argument('--min-time', type=float, default=0.5, help='minimum seconds to spend repeating each measurement')
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    parser.add_argument('--save', metavar='NAME', help='save the results as baseline NAME')
+    parser.add_argument('--compare', metavar='NAME', help='compare the results with baseline NAME')
+    parser.add_argument('--threshold', type=float, default=0.1, help='fraction slower than the baseline to flag')
+    parser.add_argument('--worker', nargs=2, metavar=('CASE', 'SIZE'), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker is not None:
+        name, size = args.worker
+        json.dump(run_case(name, int(size), args.min_time), sys.stdout)
+        return 0
+
+    baseline = None
+    if args.compare is not None:
+        if not os.path.exists(baseline_path(args.compare)):
+            raise Exception(f"Error: no baseline named {args.compare} in {BASELINE_DIR}")
+        with open(baseline_path(args.compare)) as f:
+            baseline = json.load(f)
+
+    names = args.only if args.only is not None else ['import'] + list(CASES)
+    results = []
+    for name in names:
+        if name == 'import':
+            results += import_times()
+            continue
+        for size in CASES[name][args.scale]:
+            results += run_in_subprocess(name, size, args.min_time)
+            if not args.json:
+                print(f"  {name} {size}: done", file=sys.stderr)
+
+    report = {'machine': machine_info(), 'scale': args.scale, 'results': results}
+    if args.save is not None:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(baseline_path(args.save), 'w') as f:
+            json.dump(report, f, indent=4)
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=4)
+        print()
+    elif baseline is None:
+        print_results(results)
+
+    if baseline is not None:
+        # Keep stdout valid JSON when asked for it
+        out = sys.stderr if args.json else sys.stdout
+        regressions = compare(results, baseline, args.threshold, out)
+        if regressions:
+            print(f"{len(regressions)} result(s) slower than baseline {args.compare} by more than {args.threshold:.0%}", file=out)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,41 @@
+import os
+from gator_poking import (
+    League,
+    GatorLeague,
+    GatorLeagueGenerator,
+    Schedule,
+    SeasonRunner
+)
+
+
+# Run make_league.py first to create tournament/league.json
+HERE = os.path.abspath(os.path.dirname(__file__))
+wd = os.path.join(HERE, 'tournament')
+
+
+def main():
+    league = League(os.path.join(wd, 'league.json'))
+
+    gleague_file = os.path.join(wd, 'gatorleague.json')
+    if not os.path.exists(gleague_file):
+        GatorLeagueGenerator().generate(working_dir=wd)
+    gleague = GatorLeague(gleague_file)
+
+    # Groups of 4 teams, each playing a round robin
+    schedule = Schedule.from_leagues(league, gleague, group_size=4)
+    runner = SeasonRunner(league, gleague, seed=0)
+
+    def on_round(iround, results):
+        print(f"Round {iround+1}: {len(results)} games played")
+
+    results = runner.run_schedule(schedule, on_round=on_round)
+
+    for igroup, table in enumerate(schedule.standings(results)):
+        print("-"*40)
+        print(f"Group {igroup+1}")
+        for team_id, points, net in table:
+            print(f"{league.get_team(team_id).name:>35} {points:>3} {net:>+5}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,4 @@
-from .game import Game
+import importlib
 from .core import (
     League,
     GatorLeague
@@ -7,6 +7,39 @@ from .generators import (
     LeagueGenerator,
     GatorLeagueGenerator
 )
+from .logsetup import (
+    configure_logging,
+    reset_logging
+)
+from .stats import SimulationStats
+from .schedule import Schedule
+from .bracket import Bracket
 
 
 __version__ = "0.0.0.dev0"
+
+
+# The simulation stack needs numpy (and scipy to build quantile tables),
+# so it is imported on first use. League and team generation stay cheap to import.
+_lazy_imports = {
+    'Game': 'game',
+    'MonteCarloGame': 'montecarlo',
+    'SeasonRunner': 'season',
+    'WinProbability': 'winprobability',
+    'ResultStore': 'resultstore',
+    'PlayerTable': 'playertable',
+    'MatchService': 'live',
+}
+
+
+def __getattr__(name):
+    if name in _lazy_imports:
+        module = importlib.import_module('.' + _lazy_imports[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals().keys()) + list(_lazy_imports.keys()))
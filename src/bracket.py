@@ -0,0 +1,99 @@
+class Bracket(object):
+    """
+    A single-elimination bracket.
+
+    Games ("slots") are numbered round by round: the first round is slots
+    0 to n/2-1, and slot s of a later round is played by the winners of its
+    two feeder slots, in order. Each slot has a fixed congregation, and its
+    slot number is the game index SeasonRunner keys its random stream by,
+    so a game's result depends only on which two teams reach it.
+
+    With seeded=True, team_ids are taken to be in seed order and placed
+    so that the top seeds can only meet in the late rounds (1 v n, 2 v n-1, ...);
+    otherwise they are paired in the order given.
+    """
+    def __init__(self, team_ids, cong_ids, seeded=True):
+        team_ids = list(team_ids)
+        n = len(team_ids)
+        if n < 2 or n & (n - 1) != 0:
+            raise Exception(f"Error: a knockout bracket needs a power of 2 teams, got {n}")
+        if len(cong_ids) == 0:
+            raise Exception("Error: a knockout bracket needs at least one congregation")
+
+        if seeded:
+            order = [0]
+            while len(order) < n:
+                order = [k for i in order for k in (i, 2*len(order) - 1 - i)]
+            team_ids = [team_ids[i] for i in order]
+        self.entrants = team_ids
+
+        self.nslots = n - 1
+        self.round_start = [0]
+        size = n//2
+        while size >= 1:
+            self.round_start.append(self.round_start[-1] + size)
+            size //= 2
+        self.nrounds = len(self.round_start) - 1
+
+        cong_ids = list(cong_ids)
+        self.congregations = [cong_ids[s % len(cong_ids)] for s in range(self.nslots)]
+
+    def __len__(self):
+        return self.nslots
+
+    def round_of(self, slot):
+        for r in range(self.nrounds):
+            if slot < self.round_start[r + 1]:
+                return r
+
+    def feeders(self, slot):
+        """
+        Return the two slots whose winners play slot, or None for a first round slot
+        """
+        r = self.round_of(slot)
+        if r == 0:
+            return None
+        i = slot - self.round_start[r]
+        first = self.round_start[r - 1] + 2*i
+        return (first, first + 1)
+
+    def parent(self, slot):
+        """
+        Return the slot the winner of slot plays next, or None for the final
+        """
+        r = self.round_of(slot)
+        if r == self.nrounds - 1:
+            return None
+        return self.round_start[r + 1] + (slot - self.round_start[r])//2
+
+    def first_round(self, slot):
+        """
+        Return the two teams of a first round slot
+        """
+        return (self.entrants[2*slot], self.entrants[2*slot + 1])
+
+    @classmethod
+    def winner(cls, result, team1, team2):
+        """
+        Return the team that goes through: the one with more runs,
+        then the one that lost fewer wickets, then team1
+        """
+        if result['runs1'] != result['runs2']:
+            return team1 if result['runs1'] > result['runs2'] else team2
+        if result['wickets1'] != result['wickets2']:
+            return team1 if result['wickets1'] < result['wickets2'] else team2
+        return team1
+
+    def champion(self, results):
+        """
+        Return the winner of the final, from results in slot order
+        """
+        teams = {}
+        for slot in range(self.nslots):
+            feeders = self.feeders(slot)
+            if feeders is None:
+                t1, t2 = self.first_round(slot)
+            else:
+                t1, t2 = teams[feeders[0]], teams[feeders[1]]
+            teams[slot] = self.winner(results[slot], t1, t2)
+        return teams[self.nslots - 1]
@@ -0,0 +1,67 @@
+import os
+import json
+import time
+import hashlib
+import numpy as np
+
+
+CHECKPOINT_VERSION = 2
+
+# Seconds between checkpoints of a long run
+CHECKPOINT_INTERVAL = 60.0
+
+
+def fingerprint(*parts):
+    """
+    Return a short hash of the JSON form of parts, to tell runs apart
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(json.dumps(part, sort_keys=True, default=str).encode())
+    return h.hexdigest()[:32]
+
+
+class Checkpoint(object):
+    """
+    The progress of a long run, saved to one .npz file: named arrays,
+    plus a header that says which run they belong to.
+
+    The file is replaced atomically, so a run killed while saving
+    leaves the previous checkpoint intact. Loading a checkpoint written
+    by a different run (different fingerprint) is an error rather than
+    a silent fresh start.
+    """
+    def __init__(self, path, kind, run_id, interval=CHECKPOINT_INTERVAL):
+        self.path = path
+        self.kind = kind
+        self.run_id = run_id
+        self.interval = interval
+        self.last_save = time.monotonic()
+
+    def header(self):
+        return {'version': CHECKPOINT_VERSION, 'kind': self.kind, 'run': self.run_id}
+
+    def load(self):
+        """
+        Return the saved arrays as a dict, or None if there is no checkpoint yet
+        """
+        if not os.path.exists(self.path):
+            return None
+        with np.load(self.path) as data:
+            header = json.loads(bytes(data['header']).decode())
+            if header != self.header():
+                raise Exception(f"Error: checkpoint {self.path} belongs to a different run ({header['kind']} {header['run']})")
+            return {k: data[k] for k in data.files if k != 'header'}
+
+    def save(self, **arrays):
+        tmp = self.path + '.tmp'
+        with open(tmp, 'wb') as f:
+            header = np.frombuffer(json.dumps(self.header()).encode(), dtype=np.uint8)
+            np.savez(f, header=header, **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self.last_save = time.monotonic()
+
+    def due(self):
+        return time.monotonic() - self.last_save >= self.interval
@@ -1,8 +1,9 @@
 import os
-import json
-import uuid
 import random
 
+from .leagueindex import LeagueRecords
+from .ids import new_id, allocate_ids, format_id
+
 
 class Config(dict):
     def __init__(self, config_dict):
@@ -33,42 +34,78 @@ class DefaultConfig(Config):
 # Leagues/GatorLeagues
 
 class LeagueBase(object):
+    """
+    A league file is a JSON object mapping ids to records.
+    Records are indexed (and checked for req_keys) when the league is loaded,
+    but only parsed again when they are looked up, see LeagueRecords.
+    If cache_dir is given, the index is cached there for later loads.
+
+    Objects are built once per id, on first lookup, and shared by every
+    caller. Callers that change them (rosters, attributes) should change
+    a copy() instead, as SeasonRunner does.
+
+    close() (or leaving a with block) releases the league file; objects
+    already built stay usable.
+    """
     req_keys = []
-    def __init__(self, league_json_file):
+    def __init__(self, league_json_file, cache_dir=None):
         # Make sure data file exists
         if not os.path.exists(league_json_file):
             raise Exception(f"Error: league file {league_json_file} does not exist")
 
-        # Load the data file
-        with open(league_json_file, 'r') as f:
-            self.data = json.load(f)
+        # Index the data file; self.data maps ids to record dicts
+        self.data = LeagueRecords(league_json_file, self.req_keys, cache_dir)
+
+        # Objects built from records so far, by id
+        self.cache = {}
+
+    def __len__(self):
+        return len(self.data)
 
-        # Validate the loaded data
-        team_req_keys = self.req_keys
-        for teamid, teamdict in self.data.items():
-            for rk in team_req_keys:
-                if rk not in teamdict:
-                    raise Exception(f"Error: could not create league from json file {league_json_file}, team missing key {rk}")
+    def get(self, key):
+        """
+        Return the object for one id, building it on first access
+        """
+        obj = self.cache.get(key)
+        if obj is None:
+            obj = self.from_json(self.data[key])
+            self.cache[key] = obj
+        return obj
+
+    def close(self):
+        self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
 
 
 class League(LeagueBase):
     req_keys = ['id', 'city', 'nickname', 'color', 'name']
 
+    def from_json(self, data_dict):
+        return Team.from_json(data_dict)
+
+    def get_team(self, teamid):
+        return self.get(teamid)
+
     def get_teams(self):
-        teams = []
-        for teamid, teamjson in self.data.items():
-            teams.append(Team.from_json(teamjson))
-        return teams
+        return [self.get(teamid) for teamid in self.data]
 
 
 class GatorLeague(LeagueBase):
     req_keys = ['id', 'place', 'nickname', 'name']
 
+    def from_json(self, data_dict):
+        return Congregation.from_json(data_dict)
+
+    def get_congregation(self, congid):
+        return self.get(congid)
+
     def get_congregations(self):
-        congs = []
-        for congid, congjson in self.data.items():
-            congs.append(Congregation.from_json(congjson))
-        return congs
+        return [self.get(congid) for congid in self.data]
 
 
 
@@ -82,6 +119,7 @@ class Team(object):
     Useful for Game simulator.
     """
     req_keys = ['city', 'nickname', 'color']
+    __slots__ = ['city', 'nickname', 'color', 'id', 'name', 'roster', 'index']
 
     def __init__(self, **kwargs):
         req_keys = self.req_keys
@@ -90,18 +128,20 @@ class Team(object):
                 raise Exception(f"Error: missing required key {rk} in Team constructor")
             setattr(self, rk, kwargs[rk])
         if 'id' not in kwargs:
-            playerid = str(uuid.uuid4())
+            playerid = new_id()
         else:
             playerid = kwargs['id']
         setattr(self, 'id', playerid)
         self.name = self.city + " " + self.nickname
+        self.roster = None
+        self.index = 0
 
     def __repr__(self):
         return self.name
 
     def to_json(self):
         return {
-            "id": self.id,
+            "id": format_id(self.id),
             "name": self.name,
             "nickname": self.nickname,
             "city": self.city,
@@ -116,33 +156,42 @@ class Team(object):
                 raise Exception(f"Error: could not create team from dictionary data, missing key {rk}")
         return cls(**data_dict)
 
-    ### def set_start_roster(self, working_dir, roster=None):
-    ###     if not os.path.isdir(working_dir):
-    ###         raise Exception(f"Error: specified working directory {working_dir} is not a directory")
-    ###     self.working_dir = working_dir
-
-    ###     if roster is None:
-    ###         self.roster = Roster()
-    ###     else:
-    ###         self.roster = roster
-
-    ### def inning_start(self):
-    ###     self.index = 0
-
-    ### def has_next_player(self):
-    ###     """
-    ###     Check if there is a next player to return
-    ###     """
-    ###     return self.index < len(self.roster)
-
-    ### def get_next_player(self):
-    ###     """
-    ###     Get the next player
-    ###     """
-    ###     if self.has_next_player():
-    ###         return self.roster[self.index]
-    ###     else:
-    ###         return None
+    def copy(self):
+        """
+        Return a copy of this team, sharing its roster until one of them sets a new one
+        """
+        team = Team.__new__(Team)
+        for k in self.__slots__:
+            setattr(team, k, getattr(self, k))
+        return team
+
+    def set_roster(self, roster):
+        """
+        Set the batting order: a list of Player objects
+        """
+        self.roster = roster
+        self.index = 0
+
+    def inning_start(self):
+        self.index = 0
+
+    def has_next_player(self):
+        """
+        Check if there is a next player to return
+        """
+        return self.roster is not None and self.index < len(self.roster)
+
+    def get_next_player(self):
+        """
+        Get the next player in the batting order,
+        or None if the roster is exhausted
+        """
+        if self.has_next_player():
+            player = self.roster[self.index]
+            self.index += 1
+            return player
+        else:
+            return None
 
 
 class Congregation(object):
@@ -151,6 +200,8 @@ class Congregation(object):
     This is the "team" of gators that occupy a field.
     """
     req_keys = ['place', 'nickname']
+    attr_keys = ['agg', 'rea', 'rxn', 'con']
+    __slots__ = ['place', 'nickname', 'id', 'name', 'agg', 'rea', 'rxn', 'con']
     def __init__(self, **kwargs):
         req_keys = self.req_keys
         for rk in req_keys:
@@ -158,21 +209,31 @@ class Congregation(object):
                 raise Exception(f"Error: missing required key {rk} from Congregation constructor")
             setattr(self, rk, kwargs[rk])
         if 'id' not in kwargs:
-            playerid = str(uuid.uuid4())
+            playerid = new_id()
         else:
             playerid = kwargs['id']
         setattr(self, 'id', playerid)
         self.name = self.place + " " + self.nickname
+        # Gator attributes are stored with the congregation if known, otherwise rolled
+        if all(k in kwargs for k in self.attr_keys):
+            for k in self.attr_keys:
+                setattr(self, k, kwargs[k])
+        else:
+            self.set_attributes(kwargs.get('rng'))
 
     def __repr__(self):
         return self.name
 
     def to_json(self):
         return {
-            "id": self.id,
+            "id": format_id(self.id),
             "name": self.name,
             "place": self.place,
-            "nickname": self.nickname
+            "nickname": self.nickname,
+            "agg": self.agg,
+            "rea": self.rea,
+            "rxn": self.rxn,
+            "con": self.con
         }
 
     @classmethod
@@ -183,6 +244,15 @@ class Congregation(object):
                 raise Exception(f"Error: could not create team from dictionary data, missing key {rk}")
         return cls(**data_dict)
 
+    def copy(self):
+        """
+        Return a copy of this congregation
+        """
+        cong = Congregation.__new__(Congregation)
+        for k in self.__slots__:
+            setattr(cong, k, getattr(self, k))
+        return cong
+
     def get_next_gator(self):
         return Gator(
             name = self.name,
@@ -192,10 +262,11 @@ class Congregation(object):
             con = self.con
         )
 
-    def set_attributes(self):
-        attr_keys = ['agg', 'rea', 'rxn', 'con']
-        for k in attr_keys:
-            setattr(self, k, random.randint(1,5))
+    def set_attributes(self, rng=None):
+        if rng is None:
+            rng = random
+        for k in self.attr_keys:
+            setattr(self, k, rng.randint(1,5))
 
 
 ##################################
@@ -203,6 +274,8 @@ class Congregation(object):
 
 class PlayerBase(object):
     req_keys = ['name', 'agg', 'rea', 'rxn', 'con']
+    attr_keys = ['agg', 'rea', 'rxn', 'con']
+    __slots__ = ['name', 'agg', 'rea', 'rxn', 'con', 'id', 'attr']
     def __init__(self, **kwargs):
         req_keys = self.req_keys
         for rk in req_keys:
@@ -210,19 +283,55 @@ class PlayerBase(object):
                 raise Exception(f"Error: missing required key {rk} from {type(self).__name__} constructor")
             setattr(self, rk, kwargs[rk])
         if 'id' not in kwargs:
-            playerid = str(uuid.uuid4())
+            playerid = new_id()
         else:
             playerid = kwargs['id']
         setattr(self, 'id', playerid)
+        # Attribute lookup table used by OutcomeRoll
+        self.attr = {k: getattr(self, k) for k in self.attr_keys}
 
     def __repr__(self):
         s = f"{self.name} (agg {self.agg}/rea {self.rea}/rxn {self.rxn}/con {self.con})"
         return s
 
+    @classmethod
+    def from_arrays(cls, names, agg, rea, rxn, con, ids=None):
+        """
+        Build a list of players at once (a whole roster, or many),
+        from parallel sequences of names and star ratings.
+        Star ratings may be lists or integer arrays. If ids is None,
+        every player gets a new id from the id allocator.
+        """
+        n = len(names)
+        columns = [
+            agg.tolist() if hasattr(agg, 'tolist') else agg,
+            rea.tolist() if hasattr(rea, 'tolist') else rea,
+            rxn.tolist() if hasattr(rxn, 'tolist') else rxn,
+            con.tolist() if hasattr(con, 'tolist') else con
+        ]
+        for col in columns:
+            if len(col) != n:
+                raise Exception(f"Error: {cls.__name__}.from_arrays needs one value per name, got {len(col)} for {n} names")
+        if ids is None:
+            ids = allocate_ids(n)
+        players = []
+        new = cls.__new__
+        for name, pid, a, r, x, c in zip(names, ids, *columns):
+            p = new(cls)
+            p.name = name
+            p.id = pid
+            p.agg = a
+            p.rea = r
+            p.rxn = x
+            p.con = c
+            p.attr = {'agg': a, 'rea': r, 'rxn': x, 'con': c}
+            players.append(p)
+        return players
+
 
 class Player(PlayerBase):
-    pass
+    __slots__ = []
 
 
-class Gator(object):
-    pass
+class Gator(PlayerBase):
+    __slots__ = []
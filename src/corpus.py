@@ -0,0 +1,32 @@
+import os
+
+
+# Data files read so far in this process: absolute path -> (mtime_ns, lines).
+# Worker processes forked after a file is loaded inherit it, read-only.
+_corpora = {}
+
+
+def load_corpus(data_file):
+    """
+    Return the stripped lines of a plain text data file as a tuple.
+    Each file is read once per process, and read again only if it changes.
+    """
+    path = os.path.abspath(data_file)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        raise Exception(f"Error: specified data file {data_file} does not exist!")
+    entry = _corpora.get(path)
+    if entry is None or entry[0] != mtime:
+        with open(path, 'r') as f:
+            lines = tuple(j.strip() for j in f.readlines())
+        entry = (mtime, lines)
+        _corpora[path] = entry
+    return entry[1]
+
+
+def clear_corpora():
+    """
+    Forget every data file read so far
+    """
+    _corpora.clear()
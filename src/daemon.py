@@ -0,0 +1,351 @@
+"""
+A long-lived simulation worker, taking jobs over a Unix socket.
+
+    python -m gator_poking.daemon serve --socket /tmp/gp.sock [--workers N] [--cache-dir DIR]
+
+Starting a simulation from a fresh process pays for importing numpy and
+scipy, building the beta quantile tables and reading the name corpora
+before the first ball. The daemon pays once: it warms all of that up,
+then forks its worker pool, so every worker starts warm, and it keeps
+the leagues each worker has loaded for later jobs.
+
+A job is one line of JSON, answered by one line of JSON (see DaemonClient):
+
+    {"job": "matchup", "league": ..., "gator_league": ..., "team1": ..., "team2": ...,
+     "congregation": ..., "games": 1000, "seed": 0, "method": "montecarlo", "config": {...}}
+    {"job": "season", "league": ..., "gator_league": ..., "games": ..., "group_size": ..., "seed": 0}
+    {"job": "ping"}
+    {"job": "shutdown"}
+
+Answers are {"ok": true, "summary": {...}, "seconds": ...}
+or {"ok": false, "error": "..."}, with the job's "id" echoed if it had one.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import logging
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+
+logger = logging.getLogger('gp')
+
+
+def warm_up(cache_dir=None):
+    """
+    Import the simulation stack and load everything a job would otherwise load first
+    """
+    from .game import Game
+    from .montecarlo import MonteCarloGame
+    from .season import SeasonRunner
+    from .outcomeroll import OutcomeRoll
+    from .generators import NameGenerator, GatorNameGenerator
+    if cache_dir is not None:
+        OutcomeRoll.load_tables(cache_dir)
+    else:
+        OutcomeRoll.get_tables()
+    NameGenerator.default()
+    GatorNameGenerator.default()
+
+
+##################################
+# Jobs, run in the worker processes
+
+# Leagues loaded by this worker: (class name, absolute path) -> (mtime_ns, league)
+_leagues = {}
+
+# Season runners built by this worker, so that later jobs on the same leagues,
+# seed and config reuse their rosters instead of drawing them again:
+# (league path, gator league path, seed, config) -> (league mtimes, runner)
+_runners = {}
+
+
+def _load_league(cls, path):
+    """
+    Return (mtime_ns, league) for a league file, loading it again if it has changed
+    """
+    path = os.path.abspath(path)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        raise Exception(f"Error: league file {path} does not exist")
+    key = (cls.__name__, path)
+    entry = _leagues.get(key)
+    if entry is None or entry[0] != mtime:
+        entry = (mtime, cls(path))
+        _leagues[key] = entry
+    return entry
+
+
+def _runner(request):
+    from .core import League, GatorLeague, Config, DefaultConfig
+    from .season import SeasonRunner
+    for key in ['league', 'gator_league']:
+        if key not in request:
+            raise Exception(f"Error: missing required key {key} from {request['job']} job")
+    config = Config(dict(DefaultConfig(), **request.get('config', {})))
+    seed = request.get('seed', 0)
+    mtime, league = _load_league(League, request['league'])
+    gator_mtime, gator_league = _load_league(GatorLeague, request['gator_league'])
+
+    key = (
+        os.path.abspath(request['league']),
+        os.path.abspath(request['gator_league']),
+        seed,
+        json.dumps(config, sort_keys=True)
+    )
+    entry = _runners.get(key)
+    if entry is None or entry[0] != (mtime, gator_mtime):
+        entry = ((mtime, gator_mtime), SeasonRunner(league, gator_league, config=config, seed=seed, workers=1))
+        _runners[key] = entry
+    return entry[1]
+
+
+def _run_matchup(request):
+    from .game import Game
+    from .montecarlo import MonteCarloGame
+    from .rng import game_rng
+    runner = _runner(request)
+    for key in ['team1', 'team2']:
+        if request.get(key) not in runner.teams:
+            raise Exception(f"Error: no team {request.get(key)} in league {request['league']}")
+    team1 = runner.teams[request['team1']]
+    team2 = runner.teams[request['team2']]
+    congregation = request.get('congregation', next(iter(runner.congregations)))
+    if congregation not in runner.congregations:
+        raise Exception(f"Error: no congregation {congregation} in gator league {request['gator_league']}")
+    congregation = runner.congregations[congregation]
+    ngames = request.get('games', 1)
+    if not isinstance(ngames, int) or ngames < 0:
+        raise Exception(f"Error: games must be a non-negative integer, not {ngames}")
+
+    method = request.get('method', 'montecarlo')
+    if method not in ['montecarlo', 'game']:
+        raise Exception(f"Error: unknown method {method}, use montecarlo or game")
+    if ngames == 0:
+        # Nothing to play, and no rates or means to report
+        summary = {'ngames': 0}
+        for key in ['win1', 'win2', 'tie', 'mean_runs1', 'mean_runs2', 'mean_wickets1', 'mean_wickets2', 'eaten1', 'eaten2']:
+            summary[key] = None
+        return summary
+    if method == 'montecarlo':
+        game = MonteCarloGame(team1=team1, team2=team2, congregation=congregation, config=runner.config)
+        return game.simulate(ngames, seed=runner.seed).summary()
+
+    totals = dict.fromkeys(['win1', 'win2', 'tie', 'runs1', 'runs2', 'wickets1', 'wickets2', 'eaten1', 'eaten2'], 0)
+    for i in range(ngames):
+        game = Game(
+            team1 = team1,
+            team2 = team2,
+            congregation = congregation,
+            config = runner.config,
+            rng = game_rng(runner.seed, i)
+        )
+        game.simulate()
+        result = game.result()
+        if result['runs1'] > result['runs2']:
+            totals['win1'] += 1
+        elif result['runs2'] > result['runs1']:
+            totals['win2'] += 1
+        else:
+            totals['tie'] += 1
+        for key in ['runs1', 'runs2', 'wickets1', 'wickets2', 'eaten1', 'eaten2']:
+            totals[key] += result[key]
+    return {
+        'ngames': ngames,
+        'win1': totals['win1']/ngames,
+        'win2': totals['win2']/ngames,
+        'tie': totals['tie']/ngames,
+        'mean_runs1': totals['runs1']/ngames,
+        'mean_runs2': totals['runs2']/ngames,
+        'mean_wickets1': totals['wickets1']/ngames,
+        'mean_wickets2': totals['wickets2']/ngames,
+        'eaten1': totals['eaten1']/ngames,
+        'eaten2': totals['eaten2']/ngames
+    }
+
+
+def _run_season(request):
+    from .schedule import Schedule
+    runner = _runner(request)
+    team_ids = list(runner.teams)
+    cong_ids = list(runner.congregations)
+    if request.get('group_size') is None:
+        schedule = Schedule.round_robin(team_ids, cong_ids)
+    else:
+        schedule = Schedule.group_stage(team_ids, cong_ids, request['group_size'])
+    fixtures = schedule.fixtures[:request.get('games', len(schedule))]
+    results = runner.run(fixtures)
+    return {
+        'games': len(results),
+        'standings': schedule.standings(results)
+    }
+
+
+JOBS = {
+    'matchup': _run_matchup,
+    'season': _run_season,
+}
+
+
+def _run_job(request):
+    start = time.perf_counter()
+    summary = JOBS[request['job']](request)
+    return summary, time.perf_counter() - start
+
+
+def _init_worker(cache_dir):
+    logger.disabled = True
+    warm_up(cache_dir)
+
+
+##################################
+# Server
+
+class SimulationDaemon(object):
+    """
+    Serves simulation jobs on a Unix socket, with a pool of warm worker processes.
+    Jobs from one connection are answered in order; connections are served
+    at the same time, one job per worker.
+    """
+    def __init__(self, path, workers=None, cache_dir=None):
+        self.path = path
+        if workers is None:
+            workers = os.cpu_count()
+        self.workers = workers
+        self.cache_dir = cache_dir
+        self.executor = None
+        self.server = None
+        self.started = None
+        self.jobs = 0
+
+    def start_pool(self):
+        # Warm up before forking, so workers start with everything loaded
+        warm_up(self.cache_dir)
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+        self.executor = ProcessPoolExecutor(
+            max_workers = self.workers,
+            mp_context = context,
+            initializer = _init_worker,
+            initargs = (self.cache_dir,)
+        )
+
+    async def handle(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request = {}
+                try:
+                    job = json.loads(line)
+                    if not isinstance(job, dict):
+                        raise Exception("Error: a job must be a JSON object")
+                    request = job
+                    job = request.get('job')
+                    if job == 'ping':
+                        response = {'ok': True, 'summary': self.status()}
+                    elif job == 'shutdown':
+                        response = {'ok': True, 'summary': self.status()}
+                        self.server.close()
+                    elif job in JOBS:
+                        summary, seconds = await loop.run_in_executor(self.executor, _run_job, request)
+                        self.jobs += 1
+                        response = {'ok': True, 'summary': summary, 'seconds': seconds}
+                    else:
+                        raise Exception(f"Error: unknown job {job}, use one of {sorted(JOBS) + ['ping', 'shutdown']}")
+                except Exception as e:
+                    response = {'ok': False, 'error': str(e)}
+                if 'id' in request:
+                    response['id'] = request['id']
+                writer.write((json.dumps(response) + '\n').encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def status(self):
+        return {
+            'pid': os.getpid(),
+            'workers': self.workers,
+            'jobs': self.jobs,
+            'uptime': time.time() - self.started,
+        }
+
+    async def serve(self):
+        """
+        Serve until a shutdown job arrives
+        """
+        if self.executor is None:
+            self.start_pool()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self.started = time.time()
+        self.server = await asyncio.start_unix_server(self.handle, self.path)
+        try:
+            await self.server.wait_closed()
+        finally:
+            self.executor.shutdown()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+    def run(self):
+        asyncio.run(self.serve())
+
+
+class DaemonClient(object):
+    """
+    Blocking client for a SimulationDaemon: submit() sends one job and
+    returns its summary, or raises an Exception with the daemon's error.
+    """
+    def __init__(self, path, timeout=None):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(path)
+        self.file = self.sock.makefile('rb')
+
+    def submit(self, job, **request):
+        request['job'] = job
+        self.sock.sendall((json.dumps(request) + '\n').encode())
+        line = self.file.readline()
+        if not line:
+            raise Exception("Error: simulation daemon closed the connection")
+        response = json.loads(line)
+        if not response['ok']:
+            raise Exception(response['error'])
+        return response['summary']
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    serve = subparsers.add_parser('serve', help='run the daemon until it gets a shutdown job')
+    serve.add_argument('--socket', required=True, help='path of the Unix socket to listen on')
+    serve.add_argument('--workers', type=int, default=None, help='number of worker processes (default: one per CPU)')
+    serve.add_argument('--cache-dir', default=None, help='directory to cache the quantile tables in')
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        SimulationDaemon(args.socket, workers=args.workers, cache_dir=args.cache_dir).run()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,47 @@
+import logging
+from collections import namedtuple
+
+from .outcomeroll import PLAY_COMMENTARY
+
+
+logger = logging.getLogger('gp')
+
+
+# One event per ball:
+# - innings: 0 for the top of the inning, 1 for the bottom
+# - over, ball: zero-based position of the ball in the innings
+# - outcome: runs (6/4/1), 0, or wicket code (-1/-2/-3)
+# - play: PLAY_* code from outcomeroll, which says how the outcome came about
+# - gator: id of the gator facing the poker
+# - poker: id of the player on strike
+PlayEvent = namedtuple('PlayEvent', ['innings', 'over', 'ball', 'outcome', 'play', 'gator', 'poker'])
+
+
+class EventStream(object):
+    """
+    Publishes a PlayEvent to every subscriber after each ball.
+    Subscribers are callables taking one event.
+    Nothing is built for a ball unless someone is subscribed.
+    """
+    def __init__(self):
+        self.subscribers = []
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        self.subscribers.remove(callback)
+
+    def emit(self, event):
+        for callback in self.subscribers:
+            callback(event)
+
+
+class Commentary(object):
+    """
+    Subscriber that writes the ball-by-ball text commentary
+    to the gp logger at DEBUG level.
+    """
+    def __call__(self, event):
+        logger.debug("%d.%d: %s", event.over+1, event.ball+1, PLAY_COMMENTARY[event.play])
@@ -1,11 +1,13 @@
-import uuid
+import time
 import logging
 import random
 
-from .logsetup import *
 from .inninggenerator import InningGenerator
 from .states import GameState, TeamState
+from .events import EventStream, Commentary
 from .core import Config, DefaultConfig, Team, Congregation
+from .generators import RosterGenerator
+from .ids import new_id, format_id
 
 
 logger = logging.getLogger('gp')
@@ -19,17 +21,31 @@ class Game(object):
     """
     req_keys = ['team1', 'team2', 'congregation']
     def __init__(self, **kwargs):
+        # Optional SimulationStats, to count and time what this game does
+        stats = kwargs.get('stats')
+        if stats is not None:
+            start = time.perf_counter()
+
         req_keys = self.req_keys
         for rk in req_keys:
             if rk not in kwargs:
                 raise Exception(f"Error: missing required key {rk} from Game constructor")
             setattr(self, rk, kwargs[rk])
-        gameid = str(uuid.uuid4())
+        self.id = new_id()
         if 'config' in kwargs:
             config = kwargs['config']
         else:
             config = DefaultConfig()
         self.config = config
+        # Random number stream for this game (a random.Random instance),
+        # or None to draw from the global random module
+        self.rng = kwargs.get('rng')
+
+        # Ball-by-ball play events; the text commentary is one optional subscriber,
+        # attached by default when the gp logger shows DEBUG messages
+        self.events = EventStream()
+        if logger.isEnabledFor(logging.DEBUG):
+            self.events.subscribe(Commentary())
 
         logger.warning("\n\n")
         logger.warning("---------------------- INITIALIZING GAME -------------------------")
@@ -38,10 +54,23 @@ class Game(object):
         logger.debug("DEBUG level: on")
         logger.warning("\n\n")
 
-        state1 = TeamState(team1)
-        state2 = TeamState(team1)
+        # Teams without a roster get a random one, which they keep for later games
+        for team in [self.team1, self.team2]:
+            if team.roster is None:
+                team.set_roster(RosterGenerator().generate(size = config['PLAYERS_PER_SIDE'], rng = self.rng))
+
+        state1 = TeamState(self.team1)
+        state2 = TeamState(self.team2)
 
-        self.state = GameState(config, team1, team2, state1, state2, congregation)
+        self.state = GameState(config, self.team1, self.team2, state1, state2, self.congregation, self.rng, self.events, stats)
+        if stats is not None:
+            stats.time['setup'] += time.perf_counter() - start
+
+    def subscribe(self, callback):
+        """
+        Call callback with a PlayEvent after every ball of this game
+        """
+        return self.events.subscribe(callback)
 
     def simulate(self):
         """
@@ -52,18 +81,87 @@ class Game(object):
         logger.warning('====================================')
         logger.warning('============ TOP INNING ============')
         logger.warning('====================================')
-        t1_w, t1_r = InningGenerator.generate_half(self.config, self.state, True)
+        record1 = InningGenerator.generate_half(self.config, self.state, True)
 
         logger.warning('\n\n')
         logger.warning('====================================')
         logger.warning('============ BOT INNING ============')
         logger.warning('====================================')
-        t2_w, t2_r = InningGenerator.generate_half(self.config, self.state, False)
+        record2 = InningGenerator.generate_half(self.config, self.state, False)
+
+        # Ball-by-ball InningsRecord for the top and bottom of the inning
+        self.innings = [record1, record2]
+        if self.state.stats is not None:
+            self.state.stats.games += 1
 
         logger.warning('\n\n')
         logger.warning('====================================')
         logger.warning('=========== GAME SUMMARY ===========')
         logger.warning('====================================')
         state = self.state
-        logger.info(f"{state.team1.name:>35}: {state.state1.wickets}{'*' if state.state1.eaten else ''} / {state.state1.runs} - {len(t1_r)}.{len(t1_r[-1])}")
-        logger.info(f"{state.team2.name:>35}: {state.state2.wickets}{'*' if state.state2.eaten else ''} / {state.state2.runs} - {len(t2_r)}.{len(t2_r[-1])}")
+        logger.info(f"{state.team1.name:>35}: {state.state1.wickets}{'*' if state.state1.eaten else ''} / {state.state1.runs} - {'%d.%d' % record1.last_ball()}")
+        logger.info(f"{state.team2.name:>35}: {state.state2.wickets}{'*' if state.state2.eaten else ''} / {state.state2.runs} - {'%d.%d' % record2.last_ball()}")
+
+    def replay_over(self, top, over):
+        """
+        Re-run a single over of this game for debugging, and return its
+        (wickets, runs) lists, or None if the inning ended before that over.
+
+        The game must use a counter-based rng (see rng.CounterRNG), so that
+        every ball draws the same numbers as it did in the original game.
+        The overs before it are re-simulated with logging and events disabled
+        to rebuild the game state; only the replayed over is logged and published.
+        """
+        if not hasattr(self.rng, 'seek'):
+            raise Exception("Error: replaying an over requires a counter-based rng")
+        config = self.config
+        state = GameState(
+            config,
+            self.team1,
+            self.team2,
+            TeamState(self.team1),
+            TeamState(self.team2),
+            self.congregation,
+            self.rng
+        )
+        batting_state = state.state1 if top else state.state2
+
+        was_disabled = logger.disabled
+        logger.disabled = True
+        try:
+            if not top:
+                InningGenerator.generate_half(config, state, True)
+            InningGenerator.generate_half(config, state, top, end_over=over)
+        finally:
+            logger.disabled = was_disabled
+
+        if batting_state.done:
+            return None
+        state.events = self.events
+        record = InningGenerator.generate_half(config, state, top, start_over=over, end_over=over+1)
+        wickets, runs = record.overs()
+        return (wickets[0], runs[0])
+
+    def result(self):
+        """
+        Summarize the simulated game as a JSON-friendly dict
+        """
+        state = self.state
+        if state.state1.runs > state.state2.runs:
+            winner = format_id(state.team1.id)
+        elif state.state2.runs > state.state1.runs:
+            winner = format_id(state.team2.id)
+        else:
+            winner = None
+        return {
+            "team1": format_id(state.team1.id),
+            "team2": format_id(state.team2.id),
+            "congregation": format_id(state.congregation.id),
+            "runs1": state.state1.runs,
+            "wickets1": state.state1.wickets,
+            "eaten1": state.state1.eaten,
+            "runs2": state.state2.runs,
+            "wickets2": state.state2.wickets,
+            "eaten2": state.state2.eaten,
+            "winner": winner
+        }
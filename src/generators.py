@@ -1,9 +1,11 @@
 import json
 import logging
-import uuid
 import random
 import os
 from .core import Team, Congregation, Player, Gator
+from .ids import new_id
+from .namespace import NameSpace
+from .corpus import load_corpus
 
 
 HERE = os.path.abspath(os.path.dirname(__file__))
@@ -34,25 +36,21 @@ class LeagueGeneratorBase(object):
 
 class BaseGenerator(object):
     """
-    Base class to load lines from plain text file into list
+    Base class to load lines from plain text file (through the corpus cache)
     """
     def __init__(
         self,
         data_file
     ):
-        # Verify file exists
-        if not os.path.exists(data_file):
-            raise Exception(f"Error: specified data file {data_file} does not exist!")
-        # Load data
-        with open(data_file, 'r') as f:
-            data = f.readlines()
-        self.data = [j.strip() for j in data]
-
-    def generate(self, size=1):
+        self.data = load_corpus(data_file)
+
+    def generate(self, size=1, rng=None):
+        if rng is None:
+            rng = random
         if size > len(self.data):
             raise Exception(f"Error: requested size {size} was larger than size of data {len(self.data)}")
-        data = self.data[:]
-        random.shuffle(data)
+        data = list(self.data)
+        rng.shuffle(data)
         return data[:size]
 
 
@@ -87,7 +85,7 @@ class LeagueGenerator(LeagueGeneratorBase):
         # The team generator does all the hard work
         self.team_generator = TeamGenerator(cities_file, nicknames_file, colors_file)
 
-    def generate(self, working_dir=None, output_file=None, size=4):
+    def generate(self, working_dir=None, output_file=None, size=4, rng=None):
         if working_dir is not None:
             if not os.path.isdir(working_dir):
                 raise Exception(f"Error: provided working directory {working_dir} is not a directory")
@@ -95,7 +93,7 @@ class LeagueGenerator(LeagueGeneratorBase):
             raise Exception(f"Error: leagues must have a number of teams divisible by 4")
 
         # rearrange data into a map
-        league_list = self.team_generator.generate(size = size)
+        league_list = self.team_generator.generate(size = size, rng = rng)
         league_map = {}
         for team in league_list:
             league_map[team['id']] = team
@@ -125,7 +123,7 @@ class GatorLeagueGenerator(LeagueGeneratorBase):
             gatornicknames_file = os.path.join(HERE, 'data', 'gatornicknames.txt')
         self.cong_gen = CongregationGenerator(gatorplaces_file, gatornicknames_file)
 
-    def generate(self, working_dir=None, output_file=None, size=2):
+    def generate(self, working_dir=None, output_file=None, size=2, rng=None):
         if working_dir is not None:
             if not os.path.isdir(working_dir):
                 raise Exception(f"Error: provided working directory {working_dir} is not a directory")
@@ -133,7 +131,7 @@ class GatorLeagueGenerator(LeagueGeneratorBase):
             raise Exception(f"Error: gator leagues must have an even number of congregations")
 
         # rearrange data into a map
-        gleague_list = self.cong_gen.generate(size = size)
+        gleague_list = self.cong_gen.generate(size = size, rng = rng)
         gleague_map = {}
         for cong in gleague_list:
             gleague_map[cong['id']] = cong
@@ -145,27 +143,15 @@ class GatorLeagueGenerator(LeagueGeneratorBase):
         return gleague_map, json_file
 
 
-### class RosterGenerator(object):
-###     """
-###     Generate a roster (a collection of players in the form of a player id: player json map).
-###     """
-###     def __init__(
-###         self,
-###         firstnames_file = None,
-###         lastnames_file = None
-###     ):
-###         if firstnames_file is None:
-###             firstnames_file = os.path.join(HERE, 'firstnames.txt')
-###         if lastnames_file is None:
-###             lastnames_file = os.path.join(HERE, 'lastnames.txt')
-###         self.player_generator = PlayerGenerator(firstnames_file, lastnames_file)
-### 
-###     def generate(self, size=1):
-###         roster = {}
-###         for i in range(size):
-###             p = self.player_generator.generate()[0]
-###             roster[p['id']] = p
-###         return roster
+class RosterGenerator(object):
+    """
+    Generate a roster (a list of random players, in batting order).
+    """
+    def generate(self, size=1, rng=None):
+        roster = []
+        for i in range(size):
+            roster.append(RandomPlayer(rng))
+        return roster
 
 
 ###############################################################
@@ -176,7 +162,9 @@ class GatorLeagueGenerator(LeagueGeneratorBase):
 
 class TeamGenerator(object):
     """
-    Generate info about teams
+    Generate info about teams.
+    Every team gets a different name (city, nickname), drawn in a random
+    order from all of them (see NameSpace), and a color drawn at random.
     """
     def __init__(
         self,
@@ -188,17 +176,20 @@ class TeamGenerator(object):
         self.nickname_generator = BaseGenerator(nicknames_file)
         self.color_generator    = BaseGenerator(colors_file)
 
-    def generate(self, size=1):
-        cities = self.city_generator.generate(size = size)
-        nicknames = self.nickname_generator.generate(size = size)
-        colors = self.color_generator.generate(size = size)
+    def generate(self, size=1, rng=None):
+        if rng is None:
+            rng = random
+        names = NameSpace.from_rng([
+            self.city_generator.data,
+            self.nickname_generator.data
+        ], rng)
+        colors = self.color_generator.data
         teams = []
-        for (city, nickname, color) in zip(cities, nicknames, colors):
+        for (city, nickname) in names.generate(size):
             t = Team(
-                id = str(uuid.uuid4()),
                 city = city,
                 nickname = nickname,
-                color = color
+                color = rng.choice(colors)
             )
             teams.append(t.to_json())
         return teams
@@ -213,15 +204,17 @@ class CongregationGenerator(object):
         self.place_generator = BaseGenerator(gatorplaces_file)
         self.nick_generator = BaseGenerator(gatornicknames_file)
 
-    def generate(self, size=1):
-        places = self.place_generator.generate(size = size)
-        nicks = self.nick_generator.generate(size = size)
+    def generate(self, size=1, rng=None):
+        names = NameSpace.from_rng([
+            self.place_generator.data,
+            self.nick_generator.data
+        ], rng)
         congregations = []
-        for (p, n) in zip(places, nicks):
+        for (p, n) in names.generate(size):
             c = Congregation(
-                id = str(uuid.uuid4()),
                 place = p,
-                nickname = n
+                nickname = n,
+                rng = rng
             )
             congregations.append(c.to_json())
         return congregations
@@ -234,6 +227,8 @@ class GatorNameGenerator(object):
     """
     Generate names of gator types (not individual gators)
     """
+    _default = None
+
     def __init__(
         self,
         gatorplaces_file = None,
@@ -245,19 +240,25 @@ class GatorNameGenerator(object):
         if gatornicknames_file is None:
             gatornicknames_file = os.path.join(HERE, 'data', 'gatornicknames.txt')
 
-        # load place names
-        with open(gatorplaces_file, 'r') as f:
-            gatorplaces = f.readlines()
-        self.gatorplaces = [j.strip() for j in gatorplaces]
-        # load names
-        with open(gatornicknames_file, 'r') as f:
-            gatornicknames = f.readlines()
-        self.gatornicknames = [j.strip() for j in gatornicknames]
-
-    def generate(self, size=1):
+        # load place names and names (through the corpus cache)
+        self.gatorplaces = load_corpus(gatorplaces_file)
+        self.gatornicknames = load_corpus(gatornicknames_file)
+
+    @classmethod
+    def default(cls):
+        """
+        Return a generator for the packaged data files, shared by the whole process
+        """
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    def generate(self, size=1, rng=None):
+        if rng is None:
+            rng = random
         names = []
         for i in range(size):
-            name = random.choice(self.gatorplaces) + ' ' + random.choice(self.gatornicknames)
+            name = rng.choice(self.gatorplaces) + ' ' + rng.choice(self.gatornicknames)
             names.append(name)
         return names
 
@@ -266,6 +267,8 @@ class NameGenerator(object):
     """
     Generate first + last names.
     """
+    _default = None
+
     def __init__(
         self,
         firstnames_file,
@@ -275,23 +278,25 @@ class NameGenerator(object):
             firstnames_file = os.path.join(HERE, 'data', 'firstnames.txt')
         if lastnames_file is None:
             lastnames_file = os.path.join(HERE, 'data', 'lastnames.txt')
-        # verify file exists
-        for data_file in [firstnames_file, lastnames_file]:
-            if not os.path.exists(data_file):
-                raise Exception(f"Error: Could not find data file {data_file}")
-        # load first names
-        with open(firstnames_file, 'r') as f:
-            firstnamesdata = f.readlines()
-        self.firstnamesdata = [j.strip() for j in firstnamesdata]
-        # load last names
-        with open(lastnames_file, 'r') as f:
-            lastnamesdata = f.readlines()
-        self.lastnamesdata = [j.strip() for j in lastnamesdata]
-
-    def generate(self, size=1):
+        # load first names and last names (through the corpus cache)
+        self.firstnamesdata = load_corpus(firstnames_file)
+        self.lastnamesdata = load_corpus(lastnames_file)
+
+    @classmethod
+    def default(cls):
+        """
+        Return a generator for the packaged data files, shared by the whole process
+        """
+        if cls._default is None:
+            cls._default = cls(None, None)
+        return cls._default
+
+    def generate(self, size=1, rng=None):
+        if rng is None:
+            rng = random
         names = []
         for i in range(size):
-            name = random.choice(self.firstnamesdata) + ' ' + random.choice(self.lastnamesdata)
+            name = rng.choice(self.firstnamesdata) + ' ' + rng.choice(self.lastnamesdata)
             names.append(name)
         return names
 
@@ -300,16 +305,17 @@ class NameGenerator(object):
 # Random players/gators
 
 class RandomPlayer(object):
-    def __new__(cls):
-        ng = NameGenerator(firstnames_file, lastnames_file)
-        name = ng.generate()
+    def __new__(cls, rng=None):
+        if rng is None:
+            rng = random
+        name = NameGenerator.default().generate(rng=rng)[0]
         p = Player(
-            id = str(uuid.uuid4()),
+            id = new_id(),
             name = name,
-            agg = random.randint(1,5),
-            rea = random.randint(1,5),
-            rxn = random.randint(1,5),
-            con = random.randint(1,5)
+            agg = rng.randint(1,5),
+            rea = rng.randint(1,5),
+            rxn = rng.randint(1,5),
+            con = rng.randint(1,5)
         )
         return p
 
@@ -318,16 +324,17 @@ class RandomGator(Gator):
     """
     Generate a random ggator
     """
-    def __new__(cls):
-        gng = GatorNameGenerator(gatorplaces_file, gatornicknames_file)
-        name = gng.generate()
+    def __new__(cls, rng=None):
+        if rng is None:
+            rng = random
+        name = GatorNameGenerator.default().generate(rng=rng)[0]
         g = Gator(
-            id = str(uuid.uuid4()),
+            id = new_id(),
             name = name,
-            agg = random.randint(1,5),
-            rea = random.randint(1,5),
-            rxn = random.randint(1,5),
-            con = random.randint(1,5)
+            agg = rng.randint(1,5),
+            rea = rng.randint(1,5),
+            rxn = rng.randint(1,5),
+            con = rng.randint(1,5)
         )
         return g
 
@@ -0,0 +1,134 @@
+import os
+import uuid
+import weakref
+import itertools
+
+
+# Sequential ids: namespace in the top bits, counter in the bottom bits
+NAMESPACE_BITS = 24
+COUNTER_BITS = 40
+
+# Random ids are drawn this many at a time from one os.urandom() call
+RANDOM_ID_BATCH = 4096
+
+# UUID version 4 and RFC 4122 variant bits, as set by uuid.uuid4()
+_UUID4_CLEAR = ~((0xf << 76) | (0xc << 60))
+_UUID4_SET = (0x4 << 76) | (0x8 << 60)
+
+
+class SequentialIds(object):
+    """
+    Compact 64-bit ids: the run namespace in the top NAMESPACE_BITS,
+    followed by a counter. Ids are unique within a process as long as
+    every process (or run) allocating ids uses its own namespace.
+    """
+    def __init__(self, namespace=0, start=0):
+        if not 0 <= namespace < (1 << NAMESPACE_BITS):
+            raise Exception(f"Error: id namespace must be between 0 and {(1 << NAMESPACE_BITS) - 1}, got {namespace}")
+        self.namespace = namespace
+        self.counter = itertools.count(start)
+
+    def new_id(self):
+        count = next(self.counter)
+        if count >> COUNTER_BITS:
+            raise Exception(f"Error: id namespace {self.namespace} has run out of its {1 << COUNTER_BITS} ids")
+        return (self.namespace << COUNTER_BITS) | count
+
+    def allocate(self, n):
+        counter = self.counter
+        base = self.namespace << COUNTER_BITS
+        counts = [next(counter) for i in range(n)]
+        if counts and counts[-1] >> COUNTER_BITS:
+            raise Exception(f"Error: id namespace {self.namespace} has run out of its {1 << COUNTER_BITS} ids")
+        return [base | count for count in counts]
+
+
+# Every RandomIds, so a forked child can drop the buffers it inherited
+_random_allocators = weakref.WeakSet()
+
+
+def _reset_after_fork():
+    for allocator in list(_random_allocators):
+        allocator.reset()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+class RandomIds(object):
+    """
+    Random 128-bit ids with the layout of uuid4 values, cut from one
+    os.urandom() buffer per RANDOM_ID_BATCH ids instead of one call per id.
+    They are as unique as uuid4 strings, across processes and runs.
+    A forked process starts a fresh buffer, so it never reuses the parent's.
+    """
+    def __init__(self, batch=RANDOM_ID_BATCH):
+        self.batch = batch
+        self.pool = iter(())
+        _random_allocators.add(self)
+
+    def reset(self):
+        """
+        Drop the ids left in the buffer
+        """
+        self.pool = iter(())
+
+    def refill(self, n):
+        buf = os.urandom(16*n)
+        return [
+            (int.from_bytes(buf[i:i+16], 'big') & _UUID4_CLEAR) | _UUID4_SET
+            for i in range(0, 16*n, 16)
+        ]
+
+    def new_id(self):
+        try:
+            return next(self.pool)
+        except StopIteration:
+            self.pool = iter(self.refill(self.batch))
+            return next(self.pool)
+
+    def allocate(self, n):
+        return self.refill(n)
+
+
+def format_id(value):
+    """
+    Return the string form of an id, for serialization. Random ids
+    format as uuid strings, sequential ids as 16 hex digits, and ids
+    that are already strings (e.g. loaded from a league file) as themselves.
+    """
+    if isinstance(value, int):
+        if value >= (1 << 64):
+            return str(uuid.UUID(int=value))
+        return f"{value:016x}"
+    return value
+
+
+##################################
+# Process-wide allocator
+
+_allocator = RandomIds()
+
+
+def set_id_allocator(allocator):
+    """
+    Use allocator (anything with new_id() and allocate(n) methods)
+    for every id created from now on, and return the previous allocator
+    """
+    global _allocator
+    previous = _allocator
+    _allocator = allocator
+    return previous
+
+
+def get_id_allocator():
+    return _allocator
+
+
+def new_id():
+    return _allocator.new_id()
+
+
+def allocate_ids(n):
+    return _allocator.allocate(n)
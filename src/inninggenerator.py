@@ -1,6 +1,9 @@
+import time
 import logging
 
-from .outcomeroll import OutcomeRoll
+from .outcomeroll import OutcomeRoll, PLAY_OUTCOMES
+from .events import PlayEvent
+from .inningsrecord import InningsRecord
 
 
 logger = logging.getLogger('gp')
@@ -12,7 +15,13 @@ class InningGenerator(object):
     """
 
     @classmethod
-    def generate_half(cls, config, state, top):
+    def generate_half(cls, config, state, top, start_over=0, end_over=None):
+        """
+        Generate one half-inning, or only overs start_over to end_over-1 of it,
+        and return its InningsRecord.
+        When starting past the first over, the batting team state must already
+        hold the state at the start of that over, including the gator facing it.
+        """
 
         congregation = state.congregation
 
@@ -32,54 +41,82 @@ class InningGenerator(object):
             bowling_state = state.state1
 
         # Initialize team state for top of inning
-        batting_state.inning_start()
-
-        # These are the quantities we will ultimately return:
-        # a list of lists, one list per over, one element per play
-        final_runs = []
-        final_wickets = []
+        if start_over == 0:
+            batting_state.inning_start()
+            batting_state.gator = congregation.get_next_gator()
+            batting_state.igator = 0
+
+        # Ball-by-ball record we will ultimately return
+        record = InningsRecord(config, start_over)
+        # Batting order index of each player, for the record
+        order = {player.id: i for i, player in enumerate(batting_team.roster)}
+        if len(order) != len(batting_team.roster):
+            raise Exception(f"Error: roster of team {batting_team.name} has players with the same id")
 
         team_name = batting_team.name
 
         opi = config['OVERS_PER_INNING']
         ppo = config['PLAYS_PER_OVER']
-        gator = congregation.get_next_gator()
-        for iover in range(opi):
-            this_over = []
-            this_wickets = []
+        if end_over is None:
+            end_over = opi
+
+        # Counter-based random streams are positioned at each ball
+        seek = getattr(state.rng, 'seek', None)
+        innings = 0 if top else 1
+
+        # Ball events are only built if someone is listening
+        subscribers = state.events.subscribers if state.events is not None else None
+
+        # Phases are only timed if someone is counting
+        stats = state.stats
+        if stats is not None:
+            stats.innings += 1
+            start = time.perf_counter()
+
+        # The gator only changes when one is slapped, not between calls
+        gator = batting_state.gator
+        igator = batting_state.igator
+        for iover in range(start_over, end_over):
             for iplay in range(ppo):
 
-                context = f"{iover+1}.{iplay+1}"
-                outcome = OutcomeRoll.outcome_roll(batting_state.pokers[0], gator, context)
+                if seek is not None:
+                    seek(innings, iover, iplay)
+                poker = batting_state.pokers[0]
+                if stats is not None:
+                    t0 = time.perf_counter()
+                play = OutcomeRoll.play_roll(poker, gator, state.rng, stats)
+                outcome = PLAY_OUTCOMES[play]
+                if stats is not None:
+                    t1 = time.perf_counter()
+                    stats.time['play'] += t1 - t0
+                if subscribers:
+                    state.events.emit(PlayEvent(innings, iover, iplay, outcome, play, gator.id, poker.id))
+                    if stats is not None:
+                        t2 = time.perf_counter()
+                        stats.time['events'] += t2 - t1
+                        t1 = t2
+                record.append(play, order[poker.id], igator)
 
                 # Increment runs/wickets and update pokers
                 if outcome > 0:
                     # Outcome is runs for the player
                     batting_state.runs += outcome
-                    this_over.append(outcome)
-                    this_wickets.append(0)
                     if outcome%2 == 1:
                         # Pokers swap positions
                         batting_state.pokers = batting_state.pokers[::-1]
                     if outcome == 6:
                         # Gator got slapped
                         gator = congregation.get_next_gator()
+                        igator += 1
 
                 elif outcome < 0:
                     # Outcome is wickets
                     batting_state.wickets += 1
                     if outcome <= -3:
                         batting_state.eaten = True
-                    this_over.append(0)
-                    this_wickets.append(1)
                     # If we have reached maximum number of wickets, this will be None, check happens below
                     batting_state.pokers[0] = batting_team.get_next_player()
 
-                else:
-                    # Nothing happens
-                    this_over.append(0)
-                    this_wickets.append(0)
-
                 # Determine if the side should end
                 if cls.check_runs_end_over(config, batting_state, bowling_state, top):
                     logger.warning(f"{team_name}: Over {iover+1}: Game ends due to {team_name} getting required runs!")
@@ -89,23 +126,38 @@ class InningGenerator(object):
                     logger.warning(f"{team_name}: Over {iover+1}: Inning ends due to {team_name} getting maximum wickets!")
                     batting_state.done = True
 
+                if stats is not None:
+                    t2 = time.perf_counter()
+                    stats.time['state'] += t2 - t1
+                    stats.ball(outcome, t2)
+
                 if batting_state.done:
                     break
 
-            final_wickets.append(this_wickets)
-            final_runs.append(this_over)
-
-            logger.info("---------------")
-            logger.info(f"{team_name}: This Over ({iover+1}): {sum(this_wickets)} / {'  '.join([str(z) if z>=0 else 'W' for z in this_over])}")
-            logger.info(f"{team_name}: Cumulative: {batting_state.wickets} / {batting_state.runs} - {iover+1}")
-            logger.info(f"--------------")
+            if logger.isEnabledFor(logging.INFO):
+                if stats is not None:
+                    t0 = time.perf_counter()
+                this_over = record.over(iover).tolist()
+                logger.info("---------------")
+                logger.info(f"{team_name}: This Over ({iover+1}): {sum(z < 0 for z in this_over)} / {'  '.join([str(z) if z>=0 else 'W' for z in this_over])}")
+                logger.info(f"{team_name}: Cumulative: {batting_state.wickets} / {batting_state.runs} - {iover+1}")
+                logger.info(f"--------------")
+                if stats is not None:
+                    stats.time['logging'] += time.perf_counter() - t0
 
             if batting_state.done:
                 break
 
-        batting_state.done = True
+        batting_state.gator = gator
+        batting_state.igator = igator
+
+        if end_over == opi:
+            batting_state.done = True
+
+        if stats is not None:
+            stats.time['innings'] += time.perf_counter() - start
 
-        return final_wickets, final_runs
+        return record
 
     @classmethod
     def check_runs_end_over(cls, config, batting_state, bowling_state, top):
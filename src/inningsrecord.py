@@ -0,0 +1,97 @@
+import numpy as np
+
+from .outcomeroll import PLAY_OUTCOMES
+
+
+# Outcome (runs or wicket code) of each PLAY_* code, for vectorized lookup
+PLAY_OUTCOME_ARRAY = np.array(PLAY_OUTCOMES, dtype=np.int8)
+
+
+class InningsRecord(object):
+    """
+    Ball-by-ball record of one half-inning (or of overs start_over onward),
+    stored in arrays preallocated for the full innings, one small integer
+    per ball and column:
+
+    - play:    PLAY_* code from outcomeroll, which fixes the outcome
+    - striker: batting order index of the player on strike
+    - gator:   how many gators the congregation had sent out before this one
+
+    Outcomes, wicket flags and cumulative totals are computed on demand.
+    """
+    def __init__(self, config, start_over=0):
+        self.ppo = config['PLAYS_PER_OVER']
+        self.start_over = start_over
+        nballs = (config['OVERS_PER_INNING'] - start_over) * self.ppo
+        self.play = np.zeros(nballs, dtype=np.uint8)
+        self.striker = np.zeros(nballs, dtype=np.min_scalar_type(config['PLAYERS_PER_SIDE']))
+        self.gator = np.zeros(nballs, dtype=np.min_scalar_type(nballs))
+        self.nballs = 0
+
+    def __len__(self):
+        return self.nballs
+
+    def append(self, play, striker, gator):
+        i = self.nballs
+        self.play[i] = play
+        self.striker[i] = striker
+        self.gator[i] = gator
+        self.nballs = i + 1
+
+    @property
+    def nbytes(self):
+        return self.play.nbytes + self.striker.nbytes + self.gator.nbytes
+
+    def outcomes(self):
+        """
+        Return the outcome of each ball: runs (6/4/1), 0, or wicket code (-1/-2/-3)
+        """
+        return PLAY_OUTCOME_ARRAY[self.play[:self.nballs]]
+
+    def runs(self):
+        return np.maximum(self.outcomes(), 0)
+
+    def wickets(self):
+        return (self.outcomes() < 0).astype(np.uint8)
+
+    def cumulative_runs(self):
+        return np.cumsum(self.runs(), dtype=np.int32)
+
+    def cumulative_wickets(self):
+        return np.cumsum(self.wickets(), dtype=np.int32)
+
+    def total_runs(self):
+        return int(self.runs().sum())
+
+    def total_wickets(self):
+        return int(self.wickets().sum())
+
+    def over(self, iover):
+        """
+        Return the outcomes of the balls of over iover (counted from the start of the innings)
+        """
+        start = (iover - self.start_over) * self.ppo
+        return self.outcomes()[start:start + self.ppo]
+
+    def overs(self):
+        """
+        Return (wickets, runs) as lists of lists, one list per over and one
+        element per ball, the way generate_half used to return them
+        """
+        wickets = self.wickets().tolist()
+        runs = self.runs().tolist()
+        ppo = self.ppo
+        starts = range(0, self.nballs, ppo)
+        return (
+            [wickets[i:i + ppo] for i in starts],
+            [runs[i:i + ppo] for i in starts]
+        )
+
+    def last_ball(self):
+        """
+        Return the (over, ball) of the last ball played, both counted from 1
+        """
+        if self.nballs == 0:
+            return (self.start_over, 0)
+        over, ball = divmod(self.nballs - 1, self.ppo)
+        return (self.start_over + over + 1, ball + 1)
@@ -0,0 +1,238 @@
+import os
+import re
+import json
+import mmap
+import array
+import struct
+import hashlib
+
+
+# Bytes read at a time while scanning a league file
+SCAN_CHUNK_SIZE = 1 << 20
+
+# Cached index file: magic, then (json file size, json file mtime_ns, number of records),
+# then (start, end) byte offsets of every record, then the comma-separated keys
+# every record was checked for, and the record ids, newline-separated
+INDEX_MAGIC = b'GPLIDX02'
+INDEX_HEADER = struct.Struct('<qqq')
+
+# Start of the league object, one '"id":' entry up to its record, and what follows a record
+_open = re.compile(r'[ \t\n\r]*\{[ \t\n\r]*(\}?)')
+_key = re.compile(r'[ \t\n\r]*"((?:[^"\\]|\\.)*)"[ \t\n\r]*:[ \t\n\r]*')
+_sep = re.compile(r'[ \t\n\r]*([,}])')
+
+
+def scan_league_file(league_json_file, req_keys=()):
+    """
+    Read a league file (a JSON object mapping ids to records) in chunks,
+    and return the list of ids and an array of (start, end) byte offsets
+    of each record's JSON text. Records are parsed once, to find where they end
+    and check they have every key in req_keys, and then dropped.
+
+    The file is decoded as latin-1, so that character offsets are byte offsets;
+    JSON punctuation is ASCII, and multi-byte UTF-8 characters can only
+    appear inside strings, so the structure is unaffected.
+    """
+    scan_once = json.JSONDecoder().scan_once
+    ids = []
+    offsets = array.array('q')
+    with open(league_json_file, 'rb') as f:
+        buf = ''
+        # Byte offset of buf[0] in the file
+        base = 0
+        eof = False
+
+        def more(i):
+            # Read the next chunk, dropping the buffer before position i,
+            # and return the new position of i
+            nonlocal buf, base, eof
+            chunk = f.read(SCAN_CHUNK_SIZE)
+            if not chunk:
+                eof = True
+            buf = buf[i:] + chunk.decode('latin-1')
+            base += i
+            return 0
+
+        def error(i):
+            return Exception(f"Error: could not parse league file {league_json_file} at byte {base + i}")
+
+        i = more(0)
+        while True:
+            m = _open.match(buf, i)
+            if m is not None and (m.end() < len(buf) or eof):
+                break
+            if eof:
+                raise error(i)
+            i = more(i)
+        i = m.end()
+        if m.group(1) == '}':
+            return ids, offsets
+
+        # Each pass of the loop indexes one '"id": {record}' entry and the ',' or '}' after it.
+        # If the buffer ends before the entry does, read more and start the entry over.
+        while True:
+            m = _key.match(buf, i)
+            if m is None or m.end() == len(buf):
+                if eof:
+                    raise error(i)
+                i = more(i)
+                continue
+            start = m.end()
+            try:
+                record, end = scan_once(buf, start)
+            except (StopIteration, json.JSONDecodeError):
+                end = None
+            sep = _sep.match(buf, end) if end is not None else None
+            if sep is None:
+                if eof:
+                    raise error(start)
+                i = more(i)
+                continue
+
+            for rk in req_keys:
+                if not isinstance(record, dict) or rk not in record:
+                    raise Exception(f"Error: could not create league from json file {league_json_file}, team missing key {rk}")
+
+            key = m.group(1)
+            if not key.isascii() or '\\' in key:
+                # Ids with UTF-8 characters or escapes
+                key = json.loads(('"' + key + '"').encode('latin-1'))
+            ids.append(key)
+            offsets.append(base + start)
+            offsets.append(base + end)
+            i = sep.end()
+            if sep.group(1) == '}':
+                break
+    return ids, offsets
+
+
+def index_file_name(league_json_file, cache_dir):
+    """
+    Return the name of the cached index of a league file in cache_dir,
+    keyed by the league file's absolute path
+    """
+    path = os.path.abspath(league_json_file)
+    digest = hashlib.sha1(path.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(cache_dir, f"{os.path.basename(path)}-{digest}.idx")
+
+
+def load_index(league_json_file, cache_dir, req_keys=()):
+    """
+    Return (ids, offsets) from the cached index of the league file in cache_dir,
+    or None if there is no cached index, it is out of date, or its records
+    were not checked for every key in req_keys
+    """
+    index_file = index_file_name(league_json_file, cache_dir)
+    try:
+        with open(index_file, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+    if not data.startswith(INDEX_MAGIC):
+        return None
+    st = os.stat(league_json_file)
+    size, mtime_ns, n = INDEX_HEADER.unpack_from(data, len(INDEX_MAGIC))
+    if size != st.st_size or mtime_ns != st.st_mtime_ns:
+        return None
+    pos = len(INDEX_MAGIC) + INDEX_HEADER.size
+    offsets = array.array('q')
+    offsets.frombytes(data[pos:pos + 16*n])
+    checked, _, ids = data[pos + 16*n:].decode('utf-8').partition('\n')
+    if not set(req_keys) <= set(checked.split(',')):
+        return None
+    ids = ids.split('\n') if n else []
+    return ids, offsets
+
+
+def save_index(league_json_file, cache_dir, ids, offsets, req_keys=()):
+    """
+    Save the index of the league file to cache_dir. The index is only a cache,
+    so a read-only directory is not an error.
+    """
+    st = os.stat(league_json_file)
+    index_file = index_file_name(league_json_file, cache_dir)
+    tmp_file = index_file + f".{os.getpid()}.tmp"
+    try:
+        with open(tmp_file, 'wb') as f:
+            f.write(INDEX_MAGIC)
+            f.write(INDEX_HEADER.pack(st.st_size, st.st_mtime_ns, len(ids)))
+            f.write(offsets.tobytes())
+            f.write((','.join(req_keys) + '\n').encode('utf-8'))
+            f.write('\n'.join(ids).encode('utf-8'))
+        os.replace(tmp_file, index_file)
+    except OSError:
+        pass
+
+
+class LeagueRecords(object):
+    """
+    Read-only mapping of id -> record dict over a league file,
+    which only parses a record when it is looked up.
+
+    The id -> byte offset index is built by scanning the file once,
+    checking every record for req_keys. If cache_dir is given, the index
+    is cached in a .idx file there (rebuilt whenever the league file changes).
+    """
+    def __init__(self, league_json_file, req_keys=(), cache_dir=None):
+        self.league_json_file = league_json_file
+        self.req_keys = req_keys
+
+        if cache_dir is not None and not os.path.isdir(cache_dir):
+            raise Exception(f"Error: specified cache directory {cache_dir} is not a directory")
+        index = load_index(league_json_file, cache_dir, req_keys) if cache_dir is not None else None
+        if index is None:
+            index = scan_league_file(league_json_file, req_keys)
+            if cache_dir is not None:
+                save_index(league_json_file, cache_dir, *index, req_keys)
+        ids, offsets = index
+        self.ids = ids
+        self.offsets = offsets
+        self.positions = {k: i for i, k in enumerate(ids)}
+
+        with open(league_json_file, 'rb') as f:
+            if os.fstat(f.fileno()).st_size > 0:
+                self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                self.mm = b''
+
+    def close(self):
+        """
+        Release the memory map of the league file
+        """
+        if isinstance(self.mm, mmap.mmap):
+            self.mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __contains__(self, key):
+        return key in self.positions
+
+    def __getitem__(self, key):
+        i = self.positions[key]
+        return json.loads(self.mm[self.offsets[2*i]:self.offsets[2*i + 1]])
+
+    def get(self, key, default=None):
+        if key in self.positions:
+            return self[key]
+        return default
+
+    def keys(self):
+        return list(self.ids)
+
+    def items(self):
+        for key in self.ids:
+            yield key, self[key]
+
+    def values(self):
+        for key in self.ids:
+            yield self[key]
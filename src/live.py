@@ -0,0 +1,386 @@
+import json
+import array
+import asyncio
+import logging
+from collections import OrderedDict
+
+from .game import Game
+from .ids import format_id
+from .inninggenerator import InningGenerator
+
+
+logger = logging.getLogger('gp')
+
+
+# Messages each client can fall behind by before the oldest are dropped
+QUEUE_SIZE = 256
+
+# Finished matches kept so that late subscribers still get the whole match
+FINISHED_SIZE = 1024
+
+# Fields of each ball kept in a match's history
+BALL_FIELDS = ['innings', 'over', 'ball', 'outcome', 'play']
+
+
+class Subscription(object):
+    """
+    A client's stream of match messages, in a bounded queue.
+
+    Publishing never waits: when the queue is full, the oldest message is
+    dropped, so a slow client loses messages instead of holding up the games.
+    The client is told how many it missed with a 'dropped' message.
+    A subscription to one match ends after that match's 'end' message.
+    """
+    def __init__(self, service, match_id=None, queue_size=QUEUE_SIZE):
+        self.service = service
+        self.match_id = match_id
+        self.queue = asyncio.Queue(queue_size)
+        self.dropped = 0
+        self.closed = False
+
+    def put(self, message):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    async def get(self):
+        if self.dropped:
+            dropped = self.dropped
+            self.dropped = 0
+            return {'type': 'dropped', 'count': dropped}
+        return await self.queue.get()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.service.unsubscribe(self)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.closed:
+            raise StopAsyncIteration
+        message = await self.get()
+        if self.match_id is not None and message['type'] == 'end':
+            self.close()
+        return message
+
+
+class LiveMatch(object):
+    """
+    One Game, played an over at a time in the event loop, with its balls
+    published pace seconds apart.
+
+    Every ball published so far is kept in a compact history (BALL_FIELDS
+    per ball), so that a client subscribing mid-match, or just after the
+    end, is sent the whole match so far (see replay).
+    A match started paused waits for its released event before the first message.
+    """
+    __slots__ = ['id', 'game', 'pace', 'subscribers', 'task', 'start', 'started', 'history', 'end', 'released']
+    def __init__(self, game, pace, paused=False):
+        self.id = format_id(game.id)
+        self.game = game
+        self.pace = pace
+        self.subscribers = []
+        self.task = None
+        self.start = dict(self.info(), type='start')
+        self.started = False
+        self.history = array.array('h')
+        self.end = None
+        self.released = asyncio.Event() if paused else None
+
+    def info(self):
+        state = self.game.state
+        return {
+            'match': self.id,
+            'team1': state.team1.name,
+            'team2': state.team2.name,
+            'congregation': state.congregation.name,
+        }
+
+    def ball_message(self, innings, over, ball, outcome, play, runs, wickets):
+        return {
+            'type': 'ball',
+            'match': self.id,
+            'innings': innings,
+            'over': over,
+            'ball': ball,
+            'outcome': outcome,
+            'play': play,
+            'runs': runs,
+            'wickets': wickets,
+        }
+
+    def replay(self):
+        """
+        Return the messages published so far, in order
+        """
+        if not self.started:
+            return []
+        messages = [self.start]
+        n = len(BALL_FIELDS)
+        last_innings = None
+        for i in range(0, len(self.history), n):
+            innings, over, ball, outcome, play = self.history[i:i+n]
+            if innings != last_innings:
+                runs = wickets = 0
+                last_innings = innings
+            if outcome > 0:
+                runs += outcome
+            elif outcome < 0:
+                wickets += 1
+            messages.append(self.ball_message(innings, over, ball, outcome, play, runs, wickets))
+        if self.end is not None:
+            messages.append(self.end)
+        return messages
+
+    async def play(self, service):
+        game = self.game
+        config = game.config
+        state = game.state
+        loop = asyncio.get_running_loop()
+
+        # Balls of the over being published
+        balls = []
+        game.subscribe(balls.append)
+
+        if self.released is not None:
+            await self.released.wait()
+        self.started = True
+        service.publish(self, self.start)
+        next_time = loop.time()
+        try:
+            for top in [True, False]:
+                batting_state = state.state1 if top else state.state2
+                runs = wickets = 0
+                for iover in range(config['OVERS_PER_INNING']):
+                    InningGenerator.generate_half(config, state, top, start_over=iover, end_over=iover+1)
+                    for event in balls:
+                        if event.outcome > 0:
+                            runs += event.outcome
+                        elif event.outcome < 0:
+                            wickets += 1
+                        next_time += self.pace
+                        delay = next_time - loop.time()
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                        else:
+                            # Running late: carry on from now
+                            next_time = loop.time()
+                        self.history.extend([event.innings, event.over, event.ball, event.outcome, event.play])
+                        service.publish(self, self.ball_message(
+                            event.innings, event.over, event.ball, event.outcome, event.play, runs, wickets
+                        ))
+                    balls.clear()
+                    if batting_state.done:
+                        break
+                    # Let other matches run between overs, even without pacing
+                    if self.pace == 0:
+                        await asyncio.sleep(0)
+                batting_state.done = True
+            self.end = {'type': 'end', 'match': self.id, 'result': game.result()}
+        except Exception as e:
+            logger.exception(f"Live match {self.id} failed")
+            self.end = {'type': 'end', 'match': self.id, 'error': str(e)}
+        finally:
+            if self.end is not None:
+                service.publish(self, self.end)
+            service.finish(self)
+
+
+class MatchService(object):
+    """
+    Plays many Games at once in one asyncio event loop, releasing each
+    ball pace seconds after the last, and streams the balls to clients.
+
+    Clients subscribe to one match or to every match, either in process
+    (subscribe(), an async iterator of message dicts) or over a local
+    socket (serve_socket(), JSON lines) or HTTP (serve_sse(), server-sent
+    events). Messages are dicts with a 'type' of 'start', 'ball', 'end'
+    or 'dropped' (see Subscription).
+
+    Matches are started with start_match() from inside the running loop.
+    A team can only play one live match at a time, since a team keeps
+    its place in the batting order.
+
+    A client subscribing to one match is first sent everything that match
+    has published so far, so it sees the whole match however late it joins.
+    The last finished_size finished matches are kept for the same reason.
+    """
+    def __init__(self, config=None, pace=1.0, queue_size=QUEUE_SIZE, finished_size=FINISHED_SIZE):
+        self.config = config
+        self.pace = pace
+        self.queue_size = queue_size
+        self.matches = {}
+        # Recently finished matches, oldest first
+        self.finished = OrderedDict()
+        self.finished_size = finished_size
+        # Subscriptions to every match
+        self.subscribers = []
+        self.playing = set()
+
+    def start_match(self, team1, team2, congregation, pace=None, rng=None, paused=False):
+        """
+        Start playing a match, and return its id.
+        A paused match does not publish anything until release() is called.
+        """
+        for team in [team1, team2]:
+            if id(team) in self.playing:
+                raise Exception(f"Error: team {team.name} is already playing a live match")
+        kwargs = {'team1': team1, 'team2': team2, 'congregation': congregation, 'rng': rng}
+        if self.config is not None:
+            kwargs['config'] = self.config
+        match = LiveMatch(Game(**kwargs), self.pace if pace is None else pace, paused)
+        self.playing.update([id(team1), id(team2)])
+        self.matches[match.id] = match
+        match.task = asyncio.get_running_loop().create_task(match.play(self))
+        return match.id
+
+    def release(self, match_id):
+        """
+        Let a match started paused begin
+        """
+        if match_id not in self.matches or self.matches[match_id].released is None:
+            raise Exception(f"Error: no paused match with id {match_id}")
+        self.matches[match_id].released.set()
+
+    def finish(self, match):
+        state = match.game.state
+        self.playing.difference_update([id(state.team1), id(state.team2)])
+        del self.matches[match.id]
+        # Keep only what a late subscriber needs
+        match.game = None
+        match.subscribers = []
+        self.finished[match.id] = match
+        while len(self.finished) > self.finished_size:
+            self.finished.popitem(last=False)
+
+    def publish(self, match, message):
+        for subscription in match.subscribers:
+            subscription.put(message)
+        for subscription in self.subscribers:
+            subscription.put(message)
+
+    def subscribe(self, match_id=None, queue_size=None):
+        """
+        Return a Subscription to one match, or to every match if match_id is None.
+        A subscription to one match starts with the messages it has published so far;
+        if those do not fit in queue_size, the oldest are dropped as usual.
+        """
+        if queue_size is None:
+            queue_size = self.queue_size
+        subscription = Subscription(self, match_id, queue_size)
+        if match_id is None:
+            self.subscribers.append(subscription)
+            return subscription
+
+        match = self.matches.get(match_id, self.finished.get(match_id))
+        if match is None:
+            raise Exception(f"Error: no live or recently finished match with id {match_id}")
+        for message in match.replay():
+            subscription.put(message)
+        if match.end is None:
+            match.subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        if subscription.match_id is None:
+            subscribers = self.subscribers
+        elif subscription.match_id in self.matches:
+            subscribers = self.matches[subscription.match_id].subscribers
+        else:
+            return
+        if subscription in subscribers:
+            subscribers.remove(subscription)
+
+    def list_matches(self):
+        return [match.info() for match in self.matches.values()]
+
+    async def wait(self):
+        """
+        Wait until every match started so far has finished
+        """
+        tasks = [match.task for match in self.matches.values()]
+        if tasks:
+            await asyncio.wait(tasks)
+
+    ##################################
+    # Clients
+
+    async def stream(self, subscription, writer, encode):
+        """
+        Write a subscription's messages to a client until it ends or the client goes away
+        """
+        try:
+            async for message in subscription:
+                writer.write(encode(message))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            subscription.close()
+            writer.close()
+
+    async def handle_socket(self, reader, writer):
+        # The client sends one line: a match id, or nothing for every match
+        line = (await reader.readline()).decode().strip()
+        try:
+            subscription = self.subscribe(line or None)
+        except Exception as e:
+            writer.write((json.dumps({'type': 'error', 'error': str(e)}) + '\n').encode())
+            writer.close()
+            return
+        await self.stream(subscription, writer, lambda m: (json.dumps(m) + '\n').encode())
+
+    async def serve_socket(self, path=None, host='127.0.0.1', port=0):
+        """
+        Serve JSON lines over a Unix socket at path, or TCP on host:port,
+        and return the asyncio Server
+        """
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle_socket, path)
+        return await asyncio.start_server(self.handle_socket, host, port)
+
+    async def handle_http(self, reader, writer):
+        request = (await reader.readline()).decode().split()
+        while (await reader.readline()).strip():
+            pass
+        path = request[1] if len(request) > 1 else ''
+
+        def respond(status, content_type, body=b''):
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Cache-Control: no-cache\r\nConnection: close\r\n\r\n".encode() + body
+            )
+
+        if path == '/matches':
+            respond('200 OK', 'application/json', json.dumps(self.list_matches()).encode())
+            writer.close()
+            return
+        if path == '/events' or path.startswith('/events/'):
+            match_id = path[len('/events/'):] or None
+            try:
+                subscription = self.subscribe(match_id)
+            except Exception:
+                respond('404 Not Found', 'text/plain', f"No live or recently finished match {match_id}\n".encode())
+                writer.close()
+                return
+            respond('200 OK', 'text/event-stream')
+            await self.stream(
+                subscription,
+                writer,
+                lambda m: f"event: {m['type']}\ndata: {json.dumps(m)}\n\n".encode()
+            )
+            return
+        respond('404 Not Found', 'text/plain', b"Try /matches, /events or /events/<match id>\n")
+        writer.close()
+
+    async def serve_sse(self, host='127.0.0.1', port=0):
+        """
+        Serve server-sent events over HTTP on host:port, and return the asyncio Server.
+        GET /matches lists the live matches, /events streams every match,
+        and /events/<match id> streams one.
+        """
+        return await asyncio.start_server(self.handle_http, host, port)
@@ -1,23 +1,92 @@
+import atexit
 import logging
+import logging.handlers
+import queue
 
 
-# Set basic universal log options
-# (level should be WARNING INFO DEBUG)
-loglevel = logging.DEBUG
-logging.basicConfig(format='', level=logging.WARNING)
+# The gp logger stays silent until configure_logging() is called.
+# The NullHandler also keeps its warnings away from Python's last-resort stderr handler.
+logger = logging.getLogger('gp')
+logger.addHandler(logging.NullHandler())
 
-root_logger = logging.getLogger()
-root_logger.handlers = []
+# Handlers attached to the gp logger, file/stream handlers created here,
+# and the queue listener, as installed by configure_logging()
+_handlers = []
+_sinks = []
+_listener = None
 
-# Create gp logger and add handlers
-### logger = logging.Logger('gp')
-logger = logging.getLogger('gp')
-logger.setLevel(loglevel)
 
-fh = logging.FileHandler('output.log')
-fh.setLevel(loglevel)
-logger.addHandler(fh)
+def configure_logging(
+    level = logging.INFO,
+    filename = None,
+    stream = True,
+    handlers = None,
+    queued = False,
+    fmt = '%(message)s'
+):
+    """
+    Send gp log messages to the given sinks.
+
+    level:    minimum level to emit (DEBUG adds ball-by-ball commentary, INFO adds
+              per-over summaries, WARNING leaves only game and inning banners)
+    filename: if given, append log messages to this file
+    stream:   if True, write log messages to stderr
+    handlers: list of extra logging.Handler objects to send messages to
+    queued:   if True, the simulation only puts records on a queue, and a
+              background thread does the formatting and (file) writing
+    fmt:      format string for stream and file sinks
+
+    Calling this again replaces the previous configuration.
+    """
+    reset_logging()
+
+    sinks = []
+    if filename is not None:
+        sinks.append(logging.FileHandler(filename))
+    if stream:
+        sinks.append(logging.StreamHandler())
+    formatter = logging.Formatter(fmt)
+    for sink in sinks:
+        sink.setFormatter(formatter)
+    _sinks.extend(sinks)
+    if handlers is not None:
+        sinks.extend(handlers)
+    for sink in sinks:
+        sink.setLevel(level)
+
+    global _listener
+    if queued:
+        q = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(q, *sinks, respect_handler_level=True)
+        _listener.start()
+        _handlers.append(logging.handlers.QueueHandler(q))
+    else:
+        _handlers.extend(sinks)
+
+    for handler in _handlers:
+        logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+    return logger
+
+
+def reset_logging():
+    """
+    Remove the handlers installed by configure_logging(), flushing any queued
+    messages, and return the gp logger to its silent default.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    for handler in _handlers:
+        logger.removeHandler(handler)
+    for sink in _sinks:
+        sink.close()
+    _handlers.clear()
+    _sinks.clear()
+    logger.setLevel(logging.NOTSET)
+    logger.propagate = True
+
 
-sh = logging.StreamHandler()
-sh.setLevel(loglevel)
-logger.addHandler(sh)
+atexit.register(reset_logging)
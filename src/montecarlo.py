@@ -0,0 +1,255 @@
+import numpy as np
+
+from .outcomeroll import OutcomeRoll
+from .core import DefaultConfig
+from .playertable import player_stars, team_stars
+from .checkpoint import Checkpoint, fingerprint, CHECKPOINT_INTERVAL
+
+
+class MonteCarloGame(object):
+    """
+    Simulate many independent copies of one matchup (team1, team2, congregation)
+    in lockstep. Each piece of game state is an array with one entry per copy,
+    and every ball is resolved for all unfinished copies at once with
+    OutcomeRoll.outcome_roll_batch.
+
+    This follows the same rules as Game/InningGenerator, so the resulting
+    distributions match repeated calls to Game.simulate.
+
+    Rosters are taken from the teams, unless roster1/roster2 give the star
+    ratings directly: (players, 4) arrays in batting order, such as
+    PlayerTable.roster_stars().
+    """
+    req_keys = ['team1', 'team2', 'congregation']
+    def __init__(self, **kwargs):
+        req_keys = self.req_keys
+        for rk in req_keys:
+            if rk not in kwargs:
+                raise Exception(f"Error: missing required key {rk} from MonteCarloGame constructor")
+            setattr(self, rk, kwargs[rk])
+        if 'config' in kwargs:
+            config = kwargs['config']
+        else:
+            config = DefaultConfig()
+        self.config = config
+
+        # Star ratings, one row per player in batting order.
+        # An extra row stands in for the missing player after the last wicket.
+        self.roster1 = team_stars(self.team1, config, kwargs.get('roster1'))
+        self.roster2 = team_stars(self.team2, config, kwargs.get('roster2'))
+        self.roster1 = np.concatenate([self.roster1, self.roster1[-1:]])
+        self.roster2 = np.concatenate([self.roster2, self.roster2[-1:]])
+
+        # Star ratings, one row per gator the congregation sends out in turn.
+        # Every gator from a congregation is identical, so this is a single row.
+        self.gators = player_stars([self.congregation.get_next_gator()])
+
+    def simulate(self, ngames, seed=None):
+        """
+        Simulate ngames copies of the game, and return a MonteCarloResult.
+        """
+        rng = np.random.default_rng(seed)
+        top = self.simulate_half(ngames, self.roster1, None, rng)
+        bot = self.simulate_half(ngames, self.roster2, top['runs'], rng)
+        return MonteCarloResult(self.config, top, bot)
+
+    def simulate_batches(
+        self,
+        ngames,
+        batch_size,
+        seed = 0,
+        checkpoint = None,
+        checkpoint_interval = CHECKPOINT_INTERVAL
+    ):
+        """
+        Simulate ngames copies of the game in batches of batch_size, and return
+        a MonteCarloResult. Batch b draws from its own stream, keyed by (seed, b),
+        so the result depends only on seed and batch_size.
+
+        If checkpoint is a file path, the per-game results of the batches done
+        so far are saved there every checkpoint_interval seconds (and when the
+        run stops), and a run started again with the same file and arguments
+        carries on from the last batch saved.
+        """
+        if ngames == 0:
+            # No batches to run, or to save
+            return self.simulate(0, seed)
+
+        keys = ['runs', 'wickets', 'balls', 'eaten']
+        halves = {'top': {k: [] for k in keys}, 'bot': {k: [] for k in keys}}
+        nbatches = -(-ngames//batch_size)
+
+        progress = None
+        if checkpoint is not None:
+            run_id = fingerprint(
+                self.roster1.tolist(), self.roster2.tolist(), self.gators.tolist(),
+                dict(self.config), ngames, batch_size, seed
+            )
+            progress = Checkpoint(checkpoint, 'montecarlo', run_id, checkpoint_interval)
+            saved = progress.load()
+            if saved is not None and len(saved['top_runs']) > 0:
+                for half in halves:
+                    for k in keys:
+                        halves[half][k].append(saved[f'{half}_{k}'])
+
+        def save():
+            progress.save(**{
+                f'{half}_{k}': np.concatenate(halves[half][k]) if halves[half][k] else np.zeros(0)
+                for half in halves for k in keys
+            })
+
+        done = sum(len(a) for a in halves['top']['runs'])
+        try:
+            for b in range(done//batch_size, nbatches):
+                n = min(batch_size, ngames - b*batch_size)
+                rng = np.random.default_rng([seed, b])
+                top = self.simulate_half(n, self.roster1, None, rng)
+                bot = self.simulate_half(n, self.roster2, top['runs'], rng)
+                for k in keys:
+                    halves['top'][k].append(top[k])
+                    halves['bot'][k].append(bot[k])
+                if progress is not None and progress.due():
+                    save()
+        finally:
+            if progress is not None:
+                save()
+
+        top = {k: np.concatenate(halves['top'][k]) for k in keys}
+        bot = {k: np.concatenate(halves['bot'][k]) for k in keys}
+        return MonteCarloResult(self.config, top, bot)
+
+    def simulate_half(self, ngames, roster, target, rng):
+        """
+        Simulate one half-inning for every copy of the game.
+        target is None for the top of the inning, otherwise the array of
+        runs to beat in each copy.
+        """
+        config = self.config
+        opi = config['OVERS_PER_INNING']
+        ppo = config['PLAYS_PER_OVER']
+        max_wickets = config['PLAYERS_PER_SIDE'] - 1
+        ngators = len(self.gators)
+
+        runs = np.zeros(ngames, dtype=np.int32)
+        wickets = np.zeros(ngames, dtype=np.int32)
+        balls = np.zeros(ngames, dtype=np.int32)
+        eaten = np.zeros(ngames, dtype=bool)
+        done = np.zeros(ngames, dtype=bool)
+        # Batting order index of the striker (pokers[0]) and non-striker (pokers[1])
+        striker = np.zeros(ngames, dtype=np.intp)
+        nonstriker = np.ones(ngames, dtype=np.intp)
+        next_player = np.full(ngames, 2, dtype=np.intp)
+        gator = np.zeros(ngames, dtype=np.intp)
+
+        for iball in range(opi*ppo):
+            live = np.flatnonzero(~done)
+            if len(live) == 0:
+                break
+
+            outcomes = OutcomeRoll.outcome_roll_batch(
+                roster[striker[live]],
+                self.gators[gator[live]],
+                rng
+            )
+            balls[live] += 1
+
+            # Runs for the player
+            scored = outcomes > 0
+            runs[live[scored]] += outcomes[scored]
+
+            # Pokers swap positions on odd runs (wickets are negative, and never swap)
+            swap = live[scored & ((outcomes % 2) == 1)]
+            striker[swap], nonstriker[swap] = nonstriker[swap], striker[swap]
+
+            # Gator got slapped, the next gator takes its place
+            slapped = live[outcomes == 6]
+            gator[slapped] = (gator[slapped] + 1) % ngators
+
+            # Wickets: the next player replaces the striker
+            out = live[outcomes < 0]
+            wickets[out] += 1
+            eaten[live[outcomes <= -3]] = True
+            striker[out] = np.minimum(next_player[out], len(roster) - 1)
+            next_player[out] += 1
+
+            # Determine if the side should end
+            if target is not None:
+                done[live] |= runs[live] > target[live]
+            done[live] |= wickets[live] >= max_wickets
+
+        return {
+            'runs': runs,
+            'wickets': wickets,
+            'balls': balls,
+            'eaten': eaten
+        }
+
+
+class MonteCarloResult(object):
+    """
+    Per-game results of a Monte Carlo run, with aggregate distributions.
+    Arrays are indexed by game; 1 is the top (team1) and 2 the bottom (team2) of the inning.
+    """
+    def __init__(self, config, top, bot):
+        self.config = config
+        self.ngames = len(top['runs'])
+        self.runs1 = top['runs']
+        self.runs2 = bot['runs']
+        self.wickets1 = top['wickets']
+        self.wickets2 = bot['wickets']
+        self.balls1 = top['balls']
+        self.balls2 = bot['balls']
+        self.eaten1 = top['eaten']
+        self.eaten2 = bot['eaten']
+
+    def win_probability(self):
+        """
+        Return the fraction of games won by team1, won by team2, and tied
+        """
+        n = self.ngames
+        win1 = np.count_nonzero(self.runs1 > self.runs2)/n
+        win2 = np.count_nonzero(self.runs2 > self.runs1)/n
+        tie = np.count_nonzero(self.runs1 == self.runs2)/n
+        return (win1, win2, tie)
+
+    def run_histograms(self):
+        """
+        Return the number of games ending on each run total, for each team
+        """
+        length = max(self.runs1.max(), self.runs2.max()) + 1
+        return (
+            np.bincount(self.runs1, minlength=length),
+            np.bincount(self.runs2, minlength=length)
+        )
+
+    def wicket_histograms(self):
+        """
+        Return the number of games ending on each wicket total, for each team
+        """
+        length = self.config['PLAYERS_PER_SIDE']
+        return (
+            np.bincount(self.wickets1, minlength=length),
+            np.bincount(self.wickets2, minlength=length)
+        )
+
+    def eaten_rate(self):
+        """
+        Return the fraction of games in which each team had a player eaten
+        """
+        return (self.eaten1.mean(), self.eaten2.mean())
+
+    def summary(self):
+        win1, win2, tie = self.win_probability()
+        eaten1, eaten2 = self.eaten_rate()
+        return {
+            'ngames': self.ngames,
+            'win1': float(win1),
+            'win2': float(win2),
+            'tie': float(tie),
+            'mean_runs1': float(self.runs1.mean()),
+            'mean_runs2': float(self.runs2.mean()),
+            'mean_wickets1': float(self.wickets1.mean()),
+            'mean_wickets2': float(self.wickets2.mean()),
+            'eaten1': float(eaten1),
+            'eaten2': float(eaten2)
+        }
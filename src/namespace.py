@@ -0,0 +1,111 @@
+import random
+
+
+M64 = (1 << 64) - 1
+GOLDEN64 = 0x9E3779B97F4A7C15
+# Four rounds make a Feistel network a strong pseudorandom permutation (Luby-Rackoff)
+FEISTEL_ROUNDS = 4
+
+
+def mix64(z):
+    """
+    SplitMix64 finalizer: a fast bijective scramble of a 64-bit integer
+    """
+    z = (z + GOLDEN64) & M64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & M64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & M64
+    return z ^ (z >> 31)
+
+
+class KeyedPermutation(object):
+    """
+    Pseudorandom permutation of range(n), chosen by an integer key,
+    evaluated one index at a time in O(1) memory.
+
+    Indices are scrambled by a balanced Feistel network over the smallest
+    even number of bits that covers n (a bijection on at most 4n values),
+    and values that land outside range(n) are scrambled again until they
+    land inside ("cycle walking"), which keeps it a bijection on range(n)
+    and takes fewer than 4 rounds of the network on average.
+    """
+    def __init__(self, n, key, rounds=FEISTEL_ROUNDS):
+        self.n = n
+        bits = max((n - 1).bit_length(), 2)
+        self.half_bits = (bits + 1)//2
+        self.mask = (1 << self.half_bits) - 1
+        self.round_keys = [mix64((key + r*GOLDEN64) & M64) for r in range(rounds)]
+
+    def __len__(self):
+        return self.n
+
+    def feistel(self, x):
+        # One SplitMix64 finalizer per round, inlined
+        half = self.half_bits
+        mask = self.mask
+        left = x >> half
+        right = x & mask
+        for k in self.round_keys:
+            z = ((right ^ k) + GOLDEN64) & M64
+            z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & M64
+            z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & M64
+            left, right = right, left ^ ((z ^ (z >> 31)) & mask)
+        return (left << half) | right
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.n:
+            raise IndexError(f"permutation index {i} out of range for size {self.n}")
+        x = self.feistel(i)
+        while x >= self.n:
+            x = self.feistel(x)
+        return x
+
+    def __iter__(self):
+        for i in range(self.n):
+            yield self[i]
+
+
+class NameSpace(object):
+    """
+    The cross product of some lists of name parts (e.g. city x nickname),
+    treated as one index space and walked in a keyed pseudorandom order.
+    Item i is the combination at position KeyedPermutation[i] of the product,
+    so every combination comes up exactly once, without building or shuffling
+    the product.
+    """
+    def __init__(self, columns, key):
+        self.columns = [list(c) for c in columns]
+        self.size = 1
+        for c in self.columns:
+            self.size *= len(c)
+        self.perm = KeyedPermutation(self.size, key)
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, i):
+        j = self.perm[i]
+        parts = [None]*len(self.columns)
+        for d in range(len(self.columns) - 1, -1, -1):
+            c = self.columns[d]
+            j, k = divmod(j, len(c))
+            parts[d] = c[k]
+        return tuple(parts)
+
+    def generate(self, size, start=0):
+        """
+        Yield the combinations at positions start to start+size-1
+        """
+        if start + size > self.size:
+            raise Exception(f"Error: requested {start + size} names, but there are only {self.size} combinations")
+        for i in range(start, start + size):
+            yield self[i]
+
+    @classmethod
+    def from_rng(cls, columns, rng=None):
+        """
+        Make a NameSpace with a key drawn from rng (the random module if None)
+        """
+        if rng is None:
+            rng = random
+        key = (rng.randint(0, 2**32 - 1) << 32) | rng.randint(0, 2**32 - 1)
+        return cls(columns, key)
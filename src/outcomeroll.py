@@ -1,6 +1,7 @@
+import time
 import logging
 import numpy as np
-from .betaroll import BetaRoll
+from .betaroll import BetaRoll, BetaTable
 
 
 logger = logging.getLogger('gp')
@@ -31,34 +32,104 @@ GATOR_EAT_LIMIT = 0.66
 GATOR_LIMB_LIMIT = 0.33
 GATOR_FINGER_LIMIT = 0.05
 
+# Plays: every way a ball can go, with the outcome and commentary for each
+PLAY_PLAYER_FLINCH = 0
+PLAY_SLAP = 1
+PLAY_BOOP = 2
+PLAY_POKE = 3
+PLAY_WILD_POKE = 4
+PLAY_GATOR_FLINCH = 5
+PLAY_EATEN = 6
+PLAY_LIMB = 7
+PLAY_FINGER = 8
+PLAY_NEAR_MISS = 9
+PLAY_RETREAT = 10
+
+PLAY_OUTCOMES = [0, 6, 4, 1, 0, 0, -3, -2, -1, 0, 0]
+
+PLAY_COMMENTARY = [
+    "Player was about to poke but flinched!",
+    "Gator got slapped! The gator retreats into the water... anther gator takes its place.",
+    "Gator got booped in the snoot!",
+    "Gator got poked!",
+    "Player poked wildly, missing the gator!",
+    "Gator was about to chomp but flinched!",
+    "Player was eaten by gator! A new player takes their place. Wicket.",
+    "Player limb chomped by gator! Wicket.",
+    "Player finger chomped by gator! Wicket.",
+    "Gator chomped but narrowly missed! Wicket.",
+    "The gator retreated back into the water.",
+]
+
+# Map star ratings to new spaces
+NSTARS = 5
+# Column order of attribute arrays passed to outcome_roll_batch
+ATTR_KEYS = ['agg', 'rea', 'rxn', 'con']
+# Expected outcome
+PLAYER_ATTR_SPACE = np.linspace(PLAYER_ATTR_MIN, PLAYER_ATTR_MAX, NSTARS)
+GATOR_ATTR_SPACE = np.linspace(GATOR_ATTR_MIN, GATOR_ATTR_MAX, NSTARS)
+# Consistency (alpha param of beta distribution)
+PLAYER_CON_SPACE = np.logspace(PLAYER_LOGALPHA_MIN, PLAYER_LOGALPHA_MAX, NSTARS)
+GATOR_CON_SPACE = np.logspace(GATOR_LOGALPHA_MIN, GATOR_LOGALPHA_MAX, NSTARS)
+
 
 class OutcomeRoll(BetaRoll):
     """
     Use beta function parameters and magic numbers to come up with an outcome for a given play.
+
+    By default, beta functions are sampled from precomputed quantile tables
+    (see BetaTable), which are built on first use. Call load_tables(cache_dir)
+    beforehand to memory-map them from a cache file instead, or set
+    use_tables = False to sample scipy directly.
     """
+    use_tables = True
+    player_table = None
+    gator_table = None
+
+    # Set use_outcome_table = True to sample each play in one draw from its
+    # exact probability (see OutcomeTable) instead of rolling the beta functions
+    use_outcome_table = False
+    outcome_table = None
 
     @classmethod
-    def attr_roll(cls, attr_lab, player, gator):
+    def load_tables(cls, cache_dir=None):
+        """
+        Build (or load from cache_dir) the player and gator quantile tables.
+        """
+        cls.player_table = BetaTable(PLAYER_ATTR_SPACE, PLAYER_CON_SPACE, cache_dir=cache_dir)
+        cls.gator_table = BetaTable(GATOR_ATTR_SPACE, GATOR_CON_SPACE, cache_dir=cache_dir)
+        return cls.player_table, cls.gator_table
+
+    @classmethod
+    def get_tables(cls):
+        if cls.player_table is None or cls.gator_table is None:
+            return cls.load_tables()
+        return cls.player_table, cls.gator_table
+
+    @classmethod
+    def load_outcome_table(cls, cache_dir=None):
+        """
+        Build (or load from cache_dir) the exact play probability table.
+        """
+        from .outcometable import OutcomeTable
+        cls.outcome_table = OutcomeTable(cache_dir=cache_dir)
+        return cls.outcome_table
+
+    @classmethod
+    def get_outcome_table(cls):
+        if cls.outcome_table is None:
+            return cls.load_outcome_table()
+        return cls.outcome_table
+
+    @classmethod
+    def attr_roll(cls, attr_lab, player, gator, rng=None, stats=None):
         """
         Use player/gator attributes to construct a beta function, and sample it randomly.
         Return the player and gator rolls (bounded between 0-1 inclusive).
+        If stats (a SimulationStats) is given, the samples are counted and timed.
         """
-        nstars = 5
-
-        # Map star ratings to new spaces
-        # Expected outcome
-        player_attr_min = PLAYER_ATTR_MIN
-        player_attr_max = PLAYER_ATTR_MAX
-        player_attr_space = np.linspace(player_attr_min, player_attr_max, nstars)
-        # Consistency (alpha param of beta distribution)
-        player_con_space = np.logspace(PLAYER_LOGALPHA_MIN, PLAYER_LOGALPHA_MAX, nstars)
-
-        # Expected outcome
-        gator_attr_min = GATOR_ATTR_MIN
-        gator_attr_max = GATOR_ATTR_MAX
-        gator_attr_space = np.linspace(gator_attr_min, gator_attr_max, nstars)
-        # Consistency
-        gator_con_space = np.logspace(GATOR_LOGALPHA_MIN, GATOR_LOGALPHA_MAX, nstars)
+        if stats is not None:
+            start = time.perf_counter()
 
         # Get attribute
         pa = player.attr[attr_lab]
@@ -68,78 +139,158 @@ class OutcomeRoll(BetaRoll):
         pc = player.attr['con']
         gc = gator.attr['con']
 
-        # Transform to get beta function parameters (expectation E, alpha)
-        p_E = player_attr_space[pa-1]
-        g_E = gator_attr_space[ga-1]
-        p_alpha = player_con_space[pc-1]
-        g_alpha = gator_con_space[gc-1]
+        if cls.use_tables:
+            player_table, gator_table = cls.get_tables()
+            _, p_outcome = cls.random_sample_beta_table(player_table, pa-1, pc-1, rng)
+            _, g_outcome = cls.random_sample_beta_table(gator_table, ga-1, gc-1, rng)
+
+        else:
+            # Transform to get beta function parameters (expectation E, alpha)
+            p_E = PLAYER_ATTR_SPACE[pa-1]
+            g_E = GATOR_ATTR_SPACE[ga-1]
+            p_alpha = PLAYER_CON_SPACE[pc-1]
+            g_alpha = GATOR_CON_SPACE[gc-1]
 
-        _, p_outcome = cls.random_sample_beta_inv_cdf(p_E, p_alpha)
-        _, g_outcome = cls.random_sample_beta_inv_cdf(g_E, g_alpha)
+            _, p_outcome = cls.random_sample_beta_inv_cdf(p_E, p_alpha, rng)
+            _, g_outcome = cls.random_sample_beta_inv_cdf(g_E, g_alpha, rng)
 
+        if stats is not None:
+            stats.ppf_calls += 2
+            stats.time['sample'] += time.perf_counter() - start
         return (p_outcome, g_outcome)
 
     @classmethod
-    def outcome_roll(cls, player, gator, context=None):
+    def play_roll(cls, player, gator, rng=None, stats=None):
         """
-        Generate an outcome for a given play, given a player and a gator.
-        This runs all the necessary attribute rolls and uses those to determine the outcome.
+        Generate the play (one of the PLAY_* codes) for a given player and gator.
+        This runs all the necessary attribute rolls and uses those to determine the play.
         """
+        if cls.use_outcome_table:
+            player_attrs = [player.attr[k] for k in ATTR_KEYS]
+            gator_attrs = [gator.attr[k] for k in ATTR_KEYS]
+            return cls.get_outcome_table().sample_play(player_attrs, gator_attrs, rng)
+
         # First roll requires gator or player wins both aggressiveness and reach rolls
-        agg = cls.attr_roll('agg', player, gator)
-        rea = cls.attr_roll('rea', player, gator)
-        rxn = cls.attr_roll('rxn', player, gator)
+        agg = cls.attr_roll('agg', player, gator, rng, stats)
+        rea = cls.attr_roll('rea', player, gator, rng, stats)
+        rxn = cls.attr_roll('rxn', player, gator, rng, stats)
 
         agg_diff = agg[0] - agg[1]
         rea_diff = rea[0] - rea[1]
         rxn_diff = rxn[0] - rxn[1]
 
-        if context:
-            prefix = f"{context}: "
-        else:
-            prefix = ""
-
         if agg_diff > 0 and rea_diff > 0:
             # Player won
             if rxn_diff < 0:
                 # Player won but gator got reversal
-                logger.debug(prefix + f"Player was about to poke but flinched!")
-                return 0
+                return PLAY_PLAYER_FLINCH
             else:
                 # Outcome: runs
                 if rxn_diff > PLAYER_SIX_LIMIT:
-                    logger.debug(prefix + f"Gator got slapped! The gator retreats into the water... anther gator takes its place.")
-                    return 6
-                elif rxn_diff > 0.33:
-                    logger.debug(prefix + f"Gator got booped in the snoot!")
-                    return 4
-                elif rxn_diff > 0.05:
-                    logger.debug(prefix + f"Gator got poked!")
-                    return 1
+                    return PLAY_SLAP
+                elif rxn_diff > PLAYER_FOUR_LIMIT:
+                    return PLAY_BOOP
+                elif rxn_diff > PLAYER_ONE_LIMIT:
+                    return PLAY_POKE
                 else:
-                    logger.debug(prefix + f"Player poked wildly, missing the gator!")
-                    return 0
+                    return PLAY_WILD_POKE
 
         elif agg_diff < 0 and rea_diff < 0:
             # Gator won
             if rxn_diff > 0:
                 # Gator won but player got reversal
-                logger.debug(prefix + f"Gator was about to chomp but flinched!")
-                return 0
+                return PLAY_GATOR_FLINCH
             else:
                 # Outcome: wickets
                 if abs(rxn_diff) > GATOR_EAT_LIMIT:
-                    logger.debug(prefix + f"Player was eaten by gator! A new player takes their place. Wicket.")
-                    return -3
+                    return PLAY_EATEN
                 elif abs(rxn_diff) > GATOR_LIMB_LIMIT:
-                    logger.debug(prefix + f"Player limb chomped by gator! Wicket.")
-                    return -2
+                    return PLAY_LIMB
                 elif abs(rxn_diff) > GATOR_FINGER_LIMIT:
-                    logger.debug(prefix + f"Player finger chomped by gator! Wicket.")
-                    return -1
+                    return PLAY_FINGER
                 else:
-                    logger.debug(prefix + f"Gator chomped but narrowly missed! Wicket.")
-                    return 0
+                    return PLAY_NEAR_MISS
         else:
-            logger.debug(prefix + f"The gator retreated back into the water.")
-            return 0
+            return PLAY_RETREAT
+
+    @classmethod
+    def outcome_roll(cls, player, gator, context=None, rng=None, stats=None):
+        """
+        Generate an outcome for a given play, given a player and a gator.
+        If context is given, the play commentary is logged at DEBUG level.
+        """
+        play = cls.play_roll(player, gator, rng, stats)
+        if context is not None and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s: %s", context, PLAY_COMMENTARY[play])
+        return PLAY_OUTCOMES[play]
+
+    @classmethod
+    def attr_roll_batch(cls, player_attr, player_con, gator_attr, gator_con, rng):
+        """
+        Vectorized version of attr_roll.
+        Takes arrays of star ratings for one attribute and for consistency,
+        and returns arrays of player and gator rolls.
+        """
+        n = len(player_attr)
+        u = rng.random((2, n))
+        if cls.use_tables:
+            player_table, gator_table = cls.get_tables()
+            p_outcome = player_table.ppf_array(player_attr-1, player_con-1, u[0])
+            g_outcome = gator_table.ppf_array(gator_attr-1, gator_con-1, u[1])
+            return (p_outcome, g_outcome)
+
+        from scipy.stats import beta
+        p_E = PLAYER_ATTR_SPACE[player_attr-1]
+        g_E = GATOR_ATTR_SPACE[gator_attr-1]
+        p_alpha = PLAYER_CON_SPACE[player_con-1]
+        g_alpha = GATOR_CON_SPACE[gator_con-1]
+        p_outcome = beta.ppf(u[0], p_alpha, p_alpha*(1.0/p_E - 1.0))
+        g_outcome = beta.ppf(u[1], g_alpha, g_alpha*(1.0/g_E - 1.0))
+        return (p_outcome, g_outcome)
+
+    @classmethod
+    def outcome_roll_batch(cls, player_attrs, gator_attrs, rng=None):
+        """
+        Generate outcomes for many plays at once.
+
+        player_attrs and gator_attrs are integer arrays of star ratings (1-5)
+        with columns in ATTR_KEYS order (agg, rea, rxn, con), one row per play.
+        Either may also be a single row, which is used for every play.
+        rng is a numpy Generator (a fresh one is used if not given).
+
+        Returns an int8 array of outcomes (6/4/1/0/-1/-2/-3), one per play,
+        following the same rules as outcome_roll.
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        player_attrs = np.atleast_2d(np.asarray(player_attrs, dtype=np.intp))
+        gator_attrs = np.atleast_2d(np.asarray(gator_attrs, dtype=np.intp))
+        player_attrs, gator_attrs = np.broadcast_arrays(player_attrs, gator_attrs)
+
+        if cls.use_outcome_table:
+            plays = cls.get_outcome_table().sample_plays_batch(player_attrs, gator_attrs, rng)
+            return np.array(PLAY_OUTCOMES, dtype=np.int8)[plays]
+
+        pc = player_attrs[:, 3]
+        gc = gator_attrs[:, 3]
+        agg = cls.attr_roll_batch(player_attrs[:, 0], pc, gator_attrs[:, 0], gc, rng)
+        rea = cls.attr_roll_batch(player_attrs[:, 1], pc, gator_attrs[:, 1], gc, rng)
+        rxn = cls.attr_roll_batch(player_attrs[:, 2], pc, gator_attrs[:, 2], gc, rng)
+
+        agg_diff = agg[0] - agg[1]
+        rea_diff = rea[0] - rea[1]
+        rxn_diff = rxn[0] - rxn[1]
+
+        # First roll requires gator or player wins both aggressiveness and reach rolls
+        player_won = (agg_diff > 0) & (rea_diff > 0)
+        gator_won = (agg_diff < 0) & (rea_diff < 0)
+
+        # Reaction roll sets the outcome; reversals fall through to 0
+        outcomes = np.zeros(len(rxn_diff), dtype=np.int8)
+        outcomes[player_won & (rxn_diff > PLAYER_ONE_LIMIT)] = 1
+        outcomes[player_won & (rxn_diff > PLAYER_FOUR_LIMIT)] = 4
+        outcomes[player_won & (rxn_diff > PLAYER_SIX_LIMIT)] = 6
+        outcomes[gator_won & (-rxn_diff > GATOR_FINGER_LIMIT)] = -1
+        outcomes[gator_won & (-rxn_diff > GATOR_LIMB_LIMIT)] = -2
+        outcomes[gator_won & (-rxn_diff > GATOR_EAT_LIMIT)] = -3
+        return outcomes
@@ -0,0 +1,261 @@
+import os
+import random
+import numpy as np
+
+from .outcomeroll import (
+    PLAY_PLAYER_FLINCH,
+    PLAY_SLAP,
+    PLAY_BOOP,
+    PLAY_POKE,
+    PLAY_WILD_POKE,
+    PLAY_GATOR_FLINCH,
+    PLAY_EATEN,
+    PLAY_LIMB,
+    PLAY_FINGER,
+    PLAY_NEAR_MISS,
+    PLAY_RETREAT,
+    PLAY_OUTCOMES,
+    PLAYER_SIX_LIMIT,
+    PLAYER_FOUR_LIMIT,
+    PLAYER_ONE_LIMIT,
+    GATOR_EAT_LIMIT,
+    GATOR_LIMB_LIMIT,
+    GATOR_FINGER_LIMIT,
+    PLAYER_ATTR_SPACE,
+    PLAYER_CON_SPACE,
+    GATOR_ATTR_SPACE,
+    GATOR_CON_SPACE,
+    NSTARS
+)
+
+
+# Margins of victory at which the distribution of (player roll - gator roll) is needed
+DIFF_THRESHOLDS = [
+    -GATOR_EAT_LIMIT,
+    -GATOR_LIMB_LIMIT,
+    -GATOR_FINGER_LIMIT,
+    0.0,
+    PLAYER_ONE_LIMIT,
+    PLAYER_FOUR_LIMIT,
+    PLAYER_SIX_LIMIT
+]
+NPLAYS = len(PLAY_OUTCOMES)
+
+# Gauss-Legendre nodes per smooth piece of each integral
+OUTCOME_TABLE_NODES = 256
+OUTCOME_TABLE_VERSION = 1
+
+
+def alias_table(probs):
+    """
+    Build Walker's alias table for a discrete distribution (Vose's method).
+    Returns (prob, alias): column i is kept with probability prob[i],
+    and otherwise replaced by alias[i].
+    """
+    n = len(probs)
+    scaled = [p*n for p in probs]
+    prob = [1.0]*n
+    alias = list(range(n))
+    small = [i for i, p in enumerate(scaled) if p < 1.0]
+    large = [i for i, p in enumerate(scaled) if p >= 1.0]
+    while small and large:
+        s = small.pop()
+        l = large.pop()
+        prob[s] = scaled[s]
+        alias[s] = l
+        scaled[l] = (scaled[l] + scaled[s]) - 1.0
+        if scaled[l] < 1.0:
+            small.append(l)
+        else:
+            large.append(l)
+    # Anything left over is 1 up to rounding error
+    return (prob, alias)
+
+
+class OutcomeTable(object):
+    """
+    Exact probabilities of every play for a given player and gator,
+    and Walker alias sampling from them, so each ball costs one uniform draw.
+
+    A play depends on three independent rolls (agg, rea, rxn), and each roll
+    only through the distribution of D = (player roll) - (gator roll).
+    That distribution depends on four star ratings (player attribute and
+    consistency, gator attribute and consistency), so the cumulative
+    distribution of D at each of the PLAYER_*/GATOR_* limits (and 0) is
+    integrated numerically for all 5^4 combinations:
+
+        P(D <= t) = integral over u in (0,1) of F_player(ppf_gator(u) + t)
+
+    using Gauss-Legendre quadrature on the pieces between the kinks where
+    ppf_gator(u) + t leaves [0, 1]. The quadrature error is below 1e-6.
+
+    Play probabilities for any of the 5^4 x 5^4 matchups follow from these
+    integrals with a few products. Alias tables are built lazily, per matchup,
+    the first time it is sampled.
+
+    If cache_dir is given, the integrals are loaded from (or saved to)
+    a .npy file in that directory and memory-mapped read-only.
+    """
+    def __init__(self, nodes=OUTCOME_TABLE_NODES, cache_dir=None):
+        self.nodes = nodes
+        if cache_dir is None:
+            self.diff_cdf = self.build()
+        else:
+            self.diff_cdf = self.load(cache_dir)
+        # Alias tables for sampled matchups, keyed by matchup code
+        self.aliases = {}
+
+    def build(self):
+        """
+        Integrate the cumulative distribution of D at every threshold, for every
+        combination of player attribute, player consistency, gator attribute
+        and gator consistency. Returns an array indexed by [pa, pc, ga, gc, threshold]
+        (star ratings minus 1).
+        """
+        from scipy.stats import beta
+        xs, ws = np.polynomial.legendre.leggauss(self.nodes)
+
+        # Player beta params, flattened over (pa, pc)
+        p_a = np.tile(PLAYER_CON_SPACE, NSTARS)
+        p_b = p_a * (1.0/np.repeat(PLAYER_ATTR_SPACE, NSTARS) - 1.0)
+
+        cdf = np.zeros((NSTARS, NSTARS, NSTARS, NSTARS, len(DIFF_THRESHOLDS)))
+        for ga, g_E in enumerate(GATOR_ATTR_SPACE):
+            for gc, g_a in enumerate(GATOR_CON_SPACE):
+                g_b = g_a * (1.0/g_E - 1.0)
+                for it, t in enumerate(DIFF_THRESHOLDS):
+                    # Split the u integral where the gator roll + t crosses 0 or 1
+                    cuts = [0.0, 1.0]
+                    for x in (-t, 1.0 - t):
+                        if 0.0 < x < 1.0:
+                            cuts.append(beta.cdf(x, g_a, g_b))
+                    cuts = sorted(cuts)
+                    total = np.zeros(len(p_a))
+                    for lo, hi in zip(cuts[:-1], cuts[1:]):
+                        u = lo + 0.5*(hi - lo)*(xs + 1.0)
+                        g = beta.ppf(u, g_a, g_b)
+                        F = beta.cdf(g[None, :] + t, p_a[:, None], p_b[:, None])
+                        total += 0.5*(hi - lo)*(F @ ws)
+                    cdf[:, :, ga, gc, it] = total.reshape(NSTARS, NSTARS)
+        return cdf
+
+    def load(self, cache_dir):
+        """
+        Memory-map the integrals from cache_dir, building and saving them first if needed.
+        """
+        if not os.path.isdir(cache_dir):
+            raise Exception(f"Error: specified cache directory {cache_dir} is not a directory")
+        cache_file = os.path.join(cache_dir, f"outcometable-v{OUTCOME_TABLE_VERSION}-n{self.nodes}.npy")
+        if not os.path.exists(cache_file):
+            data = self.build()
+            # Write to a temporary file and rename, so concurrent workers never see a partial file
+            tmp_file = cache_file + f".{os.getpid()}.tmp"
+            with open(tmp_file, 'wb') as f:
+                np.save(f, data)
+            os.replace(tmp_file, cache_file)
+        return np.load(cache_file, mmap_mode='r')
+
+    def play_probabilities(self, player_attrs, gator_attrs):
+        """
+        Return the probability of each play (indexed by PLAY_* code).
+        player_attrs and gator_attrs are star ratings in ATTR_KEYS order
+        (agg, rea, rxn, con), either single rows or (n, 4) arrays,
+        in which case the result has shape (n, NPLAYS).
+        """
+        p = np.asarray(player_attrs, dtype=np.intp) - 1
+        g = np.asarray(gator_attrs, dtype=np.intp) - 1
+        cdf = self.diff_cdf
+        agg = cdf[p[..., 0], p[..., 3], g[..., 0], g[..., 3]]
+        rea = cdf[p[..., 1], p[..., 3], g[..., 1], g[..., 3]]
+        rxn = cdf[p[..., 2], p[..., 3], g[..., 2], g[..., 3]]
+
+        # Ties have probability zero, so winning a roll is P(D > 0) = 1 - P(D <= 0)
+        i0 = DIFF_THRESHOLDS.index(0.0)
+        player_won = (1.0 - agg[..., i0]) * (1.0 - rea[..., i0])
+        gator_won = agg[..., i0] * rea[..., i0]
+
+        # Cumulative distribution of the reaction roll margin at each threshold
+        eat, limb, finger, zero, one, four, six = [rxn[..., i] for i in range(len(DIFF_THRESHOLDS))]
+
+        probs = np.zeros(np.shape(player_won) + (NPLAYS,))
+        probs[..., PLAY_PLAYER_FLINCH] = player_won * zero
+        probs[..., PLAY_WILD_POKE] = player_won * (one - zero)
+        probs[..., PLAY_POKE] = player_won * (four - one)
+        probs[..., PLAY_BOOP] = player_won * (six - four)
+        probs[..., PLAY_SLAP] = player_won * (1.0 - six)
+        probs[..., PLAY_GATOR_FLINCH] = gator_won * (1.0 - zero)
+        probs[..., PLAY_NEAR_MISS] = gator_won * (zero - finger)
+        probs[..., PLAY_FINGER] = gator_won * (finger - limb)
+        probs[..., PLAY_LIMB] = gator_won * (limb - eat)
+        probs[..., PLAY_EATEN] = gator_won * eat
+        probs[..., PLAY_RETREAT] = 1.0 - player_won - gator_won
+        return probs
+
+    def outcome_probabilities(self, player_attrs, gator_attrs):
+        """
+        Return a dict mapping each outcome (6/4/1/0/-1/-2/-3) to its probability
+        """
+        probs = self.play_probabilities(player_attrs, gator_attrs)
+        outcomes = {}
+        for play, outcome in enumerate(PLAY_OUTCOMES):
+            outcomes[outcome] = outcomes.get(outcome, 0.0) + float(probs[play])
+        return outcomes
+
+    def matchup_code(self, player_attrs, gator_attrs):
+        """
+        Encode the 8 star ratings of a matchup as one integer in [0, 5^8)
+        """
+        code = 0
+        for stars in list(player_attrs) + list(gator_attrs):
+            code = code*NSTARS + (stars - 1)
+        return code
+
+    def get_alias(self, player_attrs, gator_attrs):
+        code = self.matchup_code(player_attrs, gator_attrs)
+        alias = self.aliases.get(code)
+        if alias is None:
+            probs = self.play_probabilities(player_attrs, gator_attrs).tolist()
+            alias = alias_table(probs)
+            self.aliases[code] = alias
+        return alias
+
+    def sample_play(self, player_attrs, gator_attrs, rng=None):
+        """
+        Sample one play for the matchup with a single uniform draw
+        """
+        if rng is None:
+            rng = random
+        prob, alias = self.get_alias(player_attrs, gator_attrs)
+        x = rng.random()*NPLAYS
+        i = int(x)
+        if x - i < prob[i]:
+            return i
+        return alias[i]
+
+    def sample_plays_batch(self, player_attrs, gator_attrs, rng):
+        """
+        Vectorized version of sample_play: player_attrs and gator_attrs are (n, 4)
+        arrays (or single rows), rng is a numpy Generator.
+        Returns an array of n plays.
+        """
+        player_attrs, gator_attrs = np.broadcast_arrays(
+            np.atleast_2d(np.asarray(player_attrs, dtype=np.intp)),
+            np.atleast_2d(np.asarray(gator_attrs, dtype=np.intp))
+        )
+        codes = np.zeros(len(player_attrs), dtype=np.intp)
+        for col in np.hstack([player_attrs, gator_attrs]).T:
+            codes = codes*NSTARS + (col - 1)
+
+        # Gather alias tables for the matchups present
+        unique, first, inverse = np.unique(codes, return_index=True, return_inverse=True)
+        probs = np.zeros((len(unique), NPLAYS))
+        aliases = np.zeros((len(unique), NPLAYS), dtype=np.intp)
+        for j, row in enumerate(first):
+            prob, alias = self.get_alias(player_attrs[row], gator_attrs[row])
+            probs[j] = prob
+            aliases[j] = alias
+
+        x = rng.random(len(codes))*NPLAYS
+        i = x.astype(np.intp)
+        keep = (x - i) < probs[inverse, i]
+        return np.where(keep, i, aliases[inverse, i])
@@ -0,0 +1,124 @@
+import os
+import numpy as np
+
+from .core import Player
+from .corpus import load_corpus
+from .generators import RosterGenerator
+from .outcomeroll import NSTARS, ATTR_KEYS
+
+
+HERE = os.path.abspath(os.path.dirname(__file__))
+
+
+def player_stars(players):
+    """
+    Return the star ratings of players as an (n, 4) array, in ATTR_KEYS order
+    """
+    return np.array([[p.attr[k] for k in ATTR_KEYS] for p in players], dtype=np.intp)
+
+
+def team_stars(team, config, stars=None):
+    """
+    Return the star ratings of a team's batting order, one row per player,
+    for the batch simulations (MonteCarloGame, WinProbability).
+    stars gives them directly instead, e.g. from PlayerTable.roster_stars().
+    A team without a roster gets a random one, same as Game.
+    """
+    if stars is None:
+        if team.roster is None:
+            team.set_roster(RosterGenerator().generate(size = config['PLAYERS_PER_SIDE']))
+        stars = player_stars(team.roster)
+    stars = np.asarray(stars, dtype=np.intp)
+    if stars.ndim != 2 or stars.shape[1] != len(ATTR_KEYS):
+        raise Exception(f"Error: roster star ratings for team {team.name} must be an (n, {len(ATTR_KEYS)}) array, got shape {stars.shape}")
+    if len(stars) < config['PLAYERS_PER_SIDE']:
+        raise Exception(f"Error: team {team.name} has {len(stars)} players, needs at least {config['PLAYERS_PER_SIDE']}")
+    return stars
+
+
+class PlayerTable(object):
+    """
+    The rosters of a whole league, stored as columns instead of Player objects.
+
+    Team t's roster is rows t*size to (t+1)*size - 1, in batting order.
+    Each row holds the player's star ratings (a uint8 row of stars, in
+    ATTR_KEYS order: agg, rea, rxn, con) and the indices of their first
+    and last names in the name files.
+
+    Star rows feed directly into the batch simulation (MonteCarloGame and
+    WinProbability take roster1/roster2 star arrays), and Player objects
+    are only built for the rosters that need them (see players()).
+    """
+    def __init__(self, stars, first, last, size, firstnames, lastnames):
+        self.stars = stars
+        self.first = first
+        self.last = last
+        self.size = size
+        self.firstnames = firstnames
+        self.lastnames = lastnames
+
+    @classmethod
+    def generate(
+        cls,
+        nteams,
+        size = 11,
+        rng = None,
+        firstnames_file = None,
+        lastnames_file = None
+    ):
+        """
+        Draw nteams random rosters of size players at once.
+        rng is a numpy Generator, or a seed for one.
+        """
+        if firstnames_file is None:
+            firstnames_file = os.path.join(HERE, 'data', 'firstnames.txt')
+        if lastnames_file is None:
+            lastnames_file = os.path.join(HERE, 'data', 'lastnames.txt')
+        firstnames = load_corpus(firstnames_file)
+        lastnames = load_corpus(lastnames_file)
+
+        rng = np.random.default_rng(rng)
+        n = nteams*size
+        stars = rng.integers(1, NSTARS + 1, size=(n, len(ATTR_KEYS)), dtype=np.uint8)
+        first = rng.integers(0, len(firstnames), size=n, dtype=np.min_scalar_type(len(firstnames)))
+        last = rng.integers(0, len(lastnames), size=n, dtype=np.min_scalar_type(len(lastnames)))
+        return cls(stars, first, last, size, firstnames, lastnames)
+
+    def __len__(self):
+        return len(self.stars)
+
+    @property
+    def nteams(self):
+        return len(self.stars)//self.size
+
+    def attr(self, attr_lab):
+        """
+        Return the column of one star rating (agg, rea, rxn or con) for every player
+        """
+        return self.stars[:, ATTR_KEYS.index(attr_lab)]
+
+    def rows(self, team):
+        """
+        Return the rows of a team's roster, in batting order
+        """
+        if not 0 <= team < self.nteams:
+            raise Exception(f"Error: team index {team} out of range for a table of {self.nteams} teams")
+        return slice(team*self.size, (team + 1)*self.size)
+
+    def roster_stars(self, team):
+        """
+        Return a team's star ratings, one row per player in batting order
+        """
+        return self.stars[self.rows(team)]
+
+    def name(self, row):
+        return self.firstnames[self.first[row]] + ' ' + self.lastnames[self.last[row]]
+
+    def players(self, team, ids=None):
+        """
+        Build Player objects for a team's roster, for the scalar Game
+        """
+        rows = range(*self.rows(team).indices(len(self)))
+        stars = self.roster_stars(team)
+        names = [self.name(row) for row in rows]
+        return Player.from_arrays(names, *stars.T, ids=ids)
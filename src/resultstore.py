@@ -0,0 +1,239 @@
+import os
+import json
+import fcntl
+import contextlib
+import numpy as np
+
+
+RESULT_STORE_VERSION = 2
+
+# Per-game summary columns and their on-disk dtypes.
+# Team and congregation ids are stored as codes into the store's id table.
+# winner is 1 or 2 for the winning team, 0 for a tie. The ball-by-ball
+# columns of a game start at ball_offset: the top of the inning first
+# (balls1 balls), then the bottom (balls2 balls).
+SUMMARY_COLUMNS = [
+    ('game', '<i8'),
+    ('team1', '<i4'),
+    ('team2', '<i4'),
+    ('congregation', '<i4'),
+    ('runs1', '<i4'),
+    ('wickets1', 'u1'),
+    ('eaten1', 'u1'),
+    ('balls1', '<i4'),
+    ('runs2', '<i4'),
+    ('wickets2', 'u1'),
+    ('eaten2', 'u1'),
+    ('balls2', '<i4'),
+    ('winner', 'u1'),
+    ('ball_offset', '<i8'),
+]
+
+# Ball-by-ball columns, as in InningsRecord
+BALL_COLUMNS = [
+    ('play', 'u1'),
+    ('striker', 'u1'),
+    ('gator', 'u1'),
+]
+
+
+class ResultStore(object):
+    """
+    Append-only, column-oriented store of game results in a directory.
+
+    Every column is a flat binary file of fixed-size values, read back
+    with np.memmap, so analyses over millions of games only touch the
+    columns they use. meta.json holds the number of games and balls
+    committed so far, and the table of team/congregation ids.
+
+    Many processes can append to the same store: appends take an exclusive
+    lock on the directory, write the column data, and then replace meta.json.
+    A crashed writer leaves at most some bytes past the committed length,
+    which readers ignore and the next append overwrites.
+
+    If balls is True, appends also take the InningsRecords of each game,
+    and the ball-by-ball columns are stored too. A new store keeps them
+    unless balls is False; an existing store keeps the setting it was
+    created with, and giving a different one is an error.
+    """
+    def __init__(self, path, balls=None):
+        self.path = path
+        if not os.path.isdir(path):
+            os.makedirs(path, exist_ok=True)
+        with self.locked():
+            if not os.path.exists(self.meta_file()):
+                self.write_meta({
+                    'version': RESULT_STORE_VERSION,
+                    'balls': balls is not False,
+                    'ngames': 0,
+                    'nballs': 0,
+                    'ids': []
+                })
+        self.refresh()
+        if balls is not None and balls != self.balls:
+            raise Exception(f"Error: result store {path} was created with balls={self.balls}, not balls={balls}")
+
+    def __len__(self):
+        return self.ngames
+
+    def meta_file(self):
+        return os.path.join(self.path, 'meta.json')
+
+    def column_file(self, name):
+        return os.path.join(self.path, f"{name}.bin")
+
+    @contextlib.contextmanager
+    def locked(self):
+        with open(os.path.join(self.path, 'lock'), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def read_meta(self):
+        with open(self.meta_file(), 'r') as f:
+            meta = json.load(f)
+        if meta['version'] != RESULT_STORE_VERSION:
+            raise Exception(f"Error: result store {self.path} has version {meta['version']}, expected {RESULT_STORE_VERSION}")
+        return meta
+
+    def write_meta(self, meta):
+        # Write to a temporary file and rename, so readers never see a partial file
+        tmp_file = self.meta_file() + f".{os.getpid()}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_file, self.meta_file())
+
+    def refresh(self):
+        """
+        Re-read the committed lengths and id table, to see appends from other processes
+        """
+        meta = self.read_meta()
+        self.balls = meta['balls']
+        self.ngames = meta['ngames']
+        self.nballs = meta['nballs']
+        self.ids = meta['ids']
+
+    ##################################
+    # Writing
+
+    def append(self, results, records=None):
+        """
+        Append a chunk of games.
+        results is a list of Game.result() dicts, optionally with a 'game' index
+        (-1 if missing). If the store keeps balls, records is the matching list
+        of Game.innings (a pair of InningsRecords per game).
+        """
+        if self.balls and (records is None or len(records) != len(results)):
+            raise Exception("Error: this result store keeps balls, so every result needs its InningsRecords")
+        n = len(results)
+        columns = {name: np.zeros(n, dtype=dtype) for name, dtype in SUMMARY_COLUMNS}
+        teams = []
+        for i, r in enumerate(results):
+            columns['game'][i] = r.get('game', -1)
+            for k in ['runs1', 'wickets1', 'eaten1', 'runs2', 'wickets2', 'eaten2']:
+                columns[k][i] = r[k]
+            if r['winner'] is None:
+                columns['winner'][i] = 0
+            else:
+                columns['winner'][i] = 1 if r['winner'] == r['team1'] else 2
+            teams.append((r['team1'], r['team2'], r['congregation']))
+
+        balls = None
+        if self.balls:
+            balls = {}
+            for name, dtype in BALL_COLUMNS:
+                parts = []
+                for pair in records:
+                    for record in pair:
+                        col = getattr(record, name)[:len(record)]
+                        if len(col) and col.max() > np.iinfo(dtype).max:
+                            raise Exception(f"Error: ball column {name} does not fit in {dtype}")
+                        parts.append(col)
+                balls[name] = np.concatenate(parts).astype(dtype) if parts else np.zeros(0, dtype=dtype)
+            columns['balls1'][:] = [len(pair[0]) for pair in records]
+            columns['balls2'][:] = [len(pair[1]) for pair in records]
+        else:
+            columns['ball_offset'][:] = -1
+
+        with self.locked():
+            meta = self.read_meta()
+            codes = {k: i for i, k in enumerate(meta['ids'])}
+            for i, keys in enumerate(teams):
+                for name, key in zip(['team1', 'team2', 'congregation'], keys):
+                    if key not in codes:
+                        codes[key] = len(meta['ids'])
+                        meta['ids'].append(key)
+                    columns[name][i] = codes[key]
+
+            ngames = meta['ngames']
+            nballs = meta['nballs']
+            if balls is not None:
+                lengths = columns['balls1'].astype(np.int64) + columns['balls2']
+                columns['ball_offset'][:] = nballs + np.cumsum(lengths) - lengths
+                for name, dtype in BALL_COLUMNS:
+                    self.write_column(name, dtype, nballs, balls[name])
+                nballs += int(lengths.sum())
+            for name, dtype in SUMMARY_COLUMNS:
+                self.write_column(name, dtype, ngames, columns[name])
+
+            meta['ngames'] = ngames + n
+            meta['nballs'] = nballs
+            self.write_meta(meta)
+        self.refresh()
+
+    def write_column(self, name, dtype, length, values):
+        """
+        Append values to a column file holding length committed values,
+        dropping anything a crashed writer left past them
+        """
+        with open(self.column_file(name), 'ab') as f:
+            f.truncate(length*np.dtype(dtype).itemsize)
+            f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+
+    ##################################
+    # Reading
+
+    def column(self, name):
+        """
+        Return a read-only memory map of one summary column (one value per game)
+        """
+        dtype = dict(SUMMARY_COLUMNS).get(name)
+        if dtype is None:
+            raise Exception(f"Error: no summary column {name} in result store")
+        return self.map_column(name, dtype, self.ngames)
+
+    def ball_column(self, name):
+        """
+        Return a read-only memory map of one ball-by-ball column (one value per ball)
+        """
+        dtype = dict(BALL_COLUMNS).get(name)
+        if dtype is None or not self.balls:
+            raise Exception(f"Error: no ball column {name} in result store")
+        return self.map_column(name, dtype, self.nballs)
+
+    def map_column(self, name, dtype, length):
+        # Zero-length files cannot be memory-mapped
+        if length == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(self.column_file(name), dtype=dtype, mode='r', shape=(length,))
+
+    def columns(self):
+        """
+        Return a dict of memory maps of every summary column
+        """
+        return {name: self.column(name) for name, dtype in SUMMARY_COLUMNS}
+
+    def innings(self, row, top):
+        """
+        Return a dict of the ball-by-ball columns of one half-inning
+        of the game stored at the given row
+        """
+        start = int(self.column('ball_offset')[row])
+        balls1 = int(self.column('balls1')[row])
+        if top:
+            stop = start + balls1
+        else:
+            start, stop = start + balls1, start + balls1 + int(self.column('balls2')[row])
+        return {name: self.ball_column(name)[start:stop] for name, dtype in BALL_COLUMNS}
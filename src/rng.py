@@ -0,0 +1,138 @@
+import random
+import numpy as np
+
+
+# Every random stream is derived from one master seed and a spawn key.
+# The first element of the spawn key says what the stream is for,
+# the rest says which game/team/congregation it belongs to.
+GAME_STREAM = 0
+ROSTER_STREAM = 1
+CONGREGATION_STREAM = 2
+
+# Philox4x32-10 constants
+PHILOX_M0 = 0xD2511F53
+PHILOX_M1 = 0xCD9E8D57
+PHILOX_W0 = 0x9E3779B9
+PHILOX_W1 = 0xBB67AE85
+PHILOX_ROUNDS = 10
+MASK32 = 0xFFFFFFFF
+
+# Innings word of draws made before the first seek(), which no real innings uses
+SETUP_INNINGS = MASK32
+
+
+def stream_seed(master_seed, *key):
+    """
+    Derive an independent 128-bit seed from master_seed and a spawn key.
+    This is the seed of the key[-1]-th child that SeedSequence.spawn() would
+    produce, but is computed directly, so it does not depend on how many
+    other streams were spawned or in which process.
+    """
+    ss = np.random.SeedSequence(master_seed, spawn_key=key)
+    return int.from_bytes(ss.generate_state(4, np.uint32).tobytes(), 'little')
+
+
+def stream_rng(master_seed, *key):
+    """
+    Return a random.Random instance for the stream with the given spawn key
+    """
+    return random.Random(stream_seed(master_seed, *key))
+
+
+def game_rng(master_seed, game_index):
+    """
+    Return the random stream for one game of a season
+    """
+    return CounterRNG(master_seed, game_index)
+
+
+def philox4x32(c0, c1, c2, c3, k0, k1):
+    """
+    Philox4x32-10 block function (Salmon et al., "Parallel random numbers:
+    as easy as 1, 2, 3", SC11). Maps a 128-bit counter (c0..c3) and a 64-bit
+    key (k0, k1), as 32-bit words, to four pseudorandom 32-bit words.
+
+    Words may be Python ints or numpy uint64 arrays, so the same function
+    serves single draws and vectorized batches.
+    """
+    for r in range(PHILOX_ROUNDS):
+        if r > 0:
+            k0 = (k0 + PHILOX_W0) & MASK32
+            k1 = (k1 + PHILOX_W1) & MASK32
+        p0 = PHILOX_M0 * c0
+        p1 = PHILOX_M1 * c2
+        c0, c1, c2, c3 = (p1 >> 32) ^ c1 ^ k0, p1 & MASK32, (p0 >> 32) ^ c3 ^ k1, p0 & MASK32
+    return (c0, c1, c2, c3)
+
+
+class CounterRNG(object):
+    """
+    Counter-based random stream for one game.
+
+    Every draw is a pure function of (season seed, game id, innings, over,
+    ball, roll), computed with the Philox4x32-10 block function, so any ball
+    of any game can be reproduced in O(1) without replaying earlier draws.
+    InningGenerator calls seek() before each ball; random() then returns the
+    rolls for that ball in order. Draws made before the first seek (e.g. rosters)
+    come from their own counters (innings word SETUP_INNINGS), so they
+    never repeat the rolls of any ball.
+
+    Uniforms have 32-bit resolution and never equal 0 or 1.
+    """
+    def __init__(self, master_seed, game_id):
+        if not 0 <= game_id <= MASK32:
+            raise Exception(f"Error: game id {game_id} does not fit in 32 bits")
+        self.key = tuple(int(k) for k in np.random.SeedSequence(master_seed).generate_state(2, np.uint32))
+        self.master_seed = master_seed
+        self.game_id = game_id
+        self.seek(SETUP_INNINGS, 0, 0)
+
+    def seek(self, innings, over, ball):
+        """
+        Position the stream at the first roll of the given ball
+        """
+        self.innings = innings
+        self.ball_word = (over << 16) | ball
+        self.roll = 0
+        self.block = None
+
+    def random(self):
+        """
+        Return the next roll of the current ball, uniform on (0, 1)
+        """
+        i = self.roll & 3
+        if i == 0:
+            k0, k1 = self.key
+            self.block = philox4x32(self.roll >> 2, self.ball_word, self.innings, self.game_id, k0, k1)
+        self.roll += 1
+        return (self.block[i] + 0.5) * 2.0**-32
+
+    def uniforms(self, innings, over, ball, nrolls):
+        """
+        Return the first nrolls rolls of the given ball(s) without moving the stream.
+        innings, over and ball may be integer arrays, for vectorized use;
+        the result then has shape (nrolls, len(ball)).
+        """
+        k0, k1 = self.key
+        innings = np.asarray(innings, dtype=np.uint64)
+        ball_word = (np.asarray(over, dtype=np.uint64) << 16) | np.asarray(ball, dtype=np.uint64)
+        game = np.uint64(self.game_id)
+        rolls = []
+        for iblock in range((nrolls + 3)//4):
+            block = philox4x32(np.uint64(iblock), ball_word, innings, game, k0, k1)
+            rolls.extend(block)
+        rolls = np.array(np.broadcast_arrays(*rolls[:nrolls]), dtype=np.float64)
+        return (rolls + 0.5) * 2.0**-32
+
+    # random.Random-compatible helpers, so a CounterRNG can be passed anywhere an rng is accepted
+
+    def randint(self, a, b):
+        return a + min(int(self.random() * (b - a + 1)), b - a)
+
+    def choice(self, seq):
+        return seq[min(int(self.random() * len(seq)), len(seq) - 1)]
+
+    def shuffle(self, x):
+        for i in reversed(range(1, len(x))):
+            j = min(int(self.random() * (i + 1)), i)
+            x[i], x[j] = x[j], x[i]
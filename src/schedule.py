@@ -0,0 +1,142 @@
+import itertools
+
+
+class Schedule(object):
+    """
+    The fixtures of a season, played in rounds.
+
+    A fixture is a (team1 id, team2 id, congregation id) tuple, and every
+    team plays at most once per round. Fixtures are numbered in round order,
+    and that number is the game index SeasonRunner keys each game's random
+    stream by, so a schedule's results don't depend on how it is run.
+
+    Each fixture depends on the previous fixture of both of its teams
+    (see depends): SeasonRunner.run_schedule starts a game as soon as those
+    have finished, instead of waiting for the whole previous round.
+    """
+    def __init__(self, rounds, groups=None):
+        self.rounds = [list(r) for r in rounds]
+        # Team ids in each group, for group stages
+        self.groups = groups
+        self.fixtures = [f for r in self.rounds for f in r]
+        self.round_of = [i for i, r in enumerate(self.rounds) for f in r]
+
+        # Index of the previous fixture of each team of each fixture
+        last = {}
+        self.depends = []
+        for i, (t1, t2, c) in enumerate(self.fixtures):
+            self.depends.append([last[t] for t in (t1, t2) if t in last])
+            last[t1] = i
+            last[t2] = i
+
+    def __len__(self):
+        return len(self.fixtures)
+
+    @classmethod
+    def round_robin_pairs(cls, team_ids, legs=1):
+        """
+        Return the rounds of pairs in which every team meets every other team
+        legs times (circle method). With an odd number of teams, one team
+        sits out each round. Later legs swap team1 and team2.
+        """
+        teams = list(team_ids)
+        if len(teams) < 2:
+            raise Exception(f"Error: a round robin needs at least 2 teams, got {len(teams)}")
+        if len(teams)%2 == 1:
+            teams.append(None)
+        n = len(teams)
+
+        first_leg = []
+        for r in range(n - 1):
+            pairs = []
+            for i in range(n//2):
+                t1, t2 = teams[i], teams[n - 1 - i]
+                # Alternate the fixed team between team1 and team2
+                if i == 0 and r%2 == 1:
+                    t1, t2 = t2, t1
+                if t1 is not None and t2 is not None:
+                    pairs.append((t1, t2))
+            first_leg.append(pairs)
+            # Keep the first team fixed and rotate the rest
+            teams = [teams[0], teams[-1]] + teams[1:-1]
+
+        rounds = []
+        for leg in range(legs):
+            for pairs in first_leg:
+                rounds.append(pairs if leg%2 == 0 else [(t2, t1) for t1, t2 in pairs])
+        return rounds
+
+    @classmethod
+    def assign_congregations(cls, rounds, cong_ids):
+        """
+        Turn rounds of pairs into rounds of fixtures, with congregations assigned in turn
+        """
+        if len(cong_ids) == 0:
+            raise Exception("Error: a schedule needs at least one congregation")
+        cong = itertools.cycle(cong_ids)
+        return [[(t1, t2, next(cong)) for t1, t2 in pairs] for pairs in rounds]
+
+    @classmethod
+    def round_robin(cls, team_ids, cong_ids, legs=1):
+        """
+        Every team plays every other team legs times, one game per round
+        """
+        rounds = cls.round_robin_pairs(team_ids, legs)
+        return cls(cls.assign_congregations(rounds, list(cong_ids)))
+
+    @classmethod
+    def group_stage(cls, team_ids, cong_ids, group_size=4, legs=1):
+        """
+        Split the teams into groups of group_size, in order, and play
+        a round robin within each group. Round r of the schedule is
+        round r of every group.
+        """
+        team_ids = list(team_ids)
+        if len(team_ids)%group_size != 0:
+            raise Exception(f"Error: {len(team_ids)} teams cannot be split into groups of {group_size}")
+        groups = [team_ids[i:i+group_size] for i in range(0, len(team_ids), group_size)]
+        group_rounds = [cls.round_robin_pairs(g, legs) for g in groups]
+        rounds = [
+            [pair for rounds in group_rounds for pair in rounds[r]]
+            for r in range(len(group_rounds[0]))
+        ]
+        return cls(cls.assign_congregations(rounds, list(cong_ids)), groups)
+
+    @classmethod
+    def from_leagues(cls, league, gator_league, group_size=None, legs=1):
+        """
+        Schedule a League's teams, with a GatorLeague's congregations:
+        a full round robin, or a group stage if group_size is given
+        """
+        team_ids = list(league.data)
+        cong_ids = list(gator_league.data)
+        if group_size is None:
+            return cls.round_robin(team_ids, cong_ids, legs)
+        return cls.group_stage(team_ids, cong_ids, group_size, legs)
+
+    def standings(self, results):
+        """
+        Rank the teams by points (2 for a win, 1 for a tie), then by net runs,
+        from game results (see Game.result) in fixture order.
+        Returns one ranked list of (team id, points, net runs) per group,
+        or a single list for a schedule without groups.
+        """
+        points = {}
+        net = {}
+        for (t1, t2, c), result in zip(self.fixtures, results):
+            for team, runs, against in [(t1, result['runs1'], result['runs2']), (t2, result['runs2'], result['runs1'])]:
+                points.setdefault(team, 0)
+                net[team] = net.get(team, 0) + runs - against
+                if runs > against:
+                    points[team] += 2
+                elif runs == against:
+                    points[team] += 1
+
+        groups = self.groups if self.groups is not None else [list(points)]
+        return [
+            sorted(
+                [(team, points.get(team, 0), net.get(team, 0)) for team in group],
+                key = lambda row: (-row[1], -row[2])
+            )
+            for group in groups
+        ]
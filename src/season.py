@@ -0,0 +1,534 @@
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from .game import Game
+from .ids import format_id
+from .checkpoint import Checkpoint, fingerprint, CHECKPOINT_INTERVAL
+from .core import DefaultConfig
+from .outcomeroll import OutcomeRoll, ATTR_KEYS
+from .generators import RosterGenerator
+from .resultstore import ResultStore
+from .rng import (
+    game_rng,
+    stream_rng,
+    ROSTER_STREAM,
+    CONGREGATION_STREAM
+)
+
+
+class SeasonRunner(object):
+    """
+    Run the games of a season in parallel across a pool of worker processes.
+
+    Every random quantity is derived from one master seed:
+    team rosters, congregation attributes missing from the gator league file,
+    and one counter-based random stream per game (keyed by the game's position
+    in the list of fixtures, see rng.CounterRNG). Results are therefore identical
+    for any number of workers, any single game can be reproduced with run_game(),
+    and any over of it with Game.replay_over().
+
+    A fixture is a (team1 id, team2 id, congregation id) tuple.
+    """
+    def __init__(
+        self,
+        league,
+        gator_league,
+        config = None,
+        seed = 0,
+        workers = None,
+        cache_dir = None
+    ):
+        if config is None:
+            config = DefaultConfig()
+        self.config = config
+        self.seed = seed
+        if workers is None:
+            workers = os.cpu_count()
+        self.workers = workers
+        self.cache_dir = cache_dir
+
+        # Rosters are drawn from one stream per team, onto copies
+        # of the league's teams, which other runners share
+        self.teams = {}
+        for i, team in enumerate(league.get_teams()):
+            team = team.copy()
+            rng = stream_rng(seed, ROSTER_STREAM, i)
+            team.set_roster(RosterGenerator().generate(size = config['PLAYERS_PER_SIDE'], rng = rng))
+            self.teams[team.id] = team
+
+        # Congregations keep their stored attributes, otherwise roll them from one stream each
+        self.congregations = {}
+        for i, cong in enumerate(gator_league.get_congregations()):
+            cong = cong.copy()
+            if not all(k in gator_league.data[cong.id] for k in cong.attr_keys):
+                cong.set_attributes(stream_rng(seed, CONGREGATION_STREAM, i))
+            self.congregations[cong.id] = cong
+
+    def fixtures(self):
+        """
+        Return the default schedule: every pair of teams plays once,
+        with congregations assigned in turn.
+        """
+        team_ids = list(self.teams.keys())
+        cong_ids = list(self.congregations.keys())
+        fixtures = []
+        for i in range(len(team_ids)):
+            for j in range(i+1, len(team_ids)):
+                cong_id = cong_ids[len(fixtures) % len(cong_ids)]
+                fixtures.append((team_ids[i], team_ids[j], cong_id))
+        return fixtures
+
+    def run(
+        self,
+        fixtures = None,
+        chunksize = None,
+        store = None,
+        checkpoint = None,
+        checkpoint_interval = CHECKPOINT_INTERVAL
+    ):
+        """
+        Simulate every fixture and return a list of game results (see Game.result),
+        in fixture order. Each result also records its game index.
+
+        If store is the path of a ResultStore, every worker also appends
+        its games to it, one chunk at a time (in completion order; the game
+        column holds the game index).
+
+        If checkpoint is a file path, the finished games are saved there every
+        checkpoint_interval seconds (and when the run stops, for any reason),
+        and a run started again with the same checkpoint file skips them.
+        See SeasonCheckpoint. A game interrupted midway is simply played
+        again: its random stream is keyed by its game index, so it plays
+        out exactly as it would have. Games finished after the last
+        checkpoint are played (and appended to store) again on resume.
+        """
+        if fixtures is None:
+            fixtures = self.fixtures()
+        progress = None
+        if checkpoint is not None:
+            progress = SeasonCheckpoint(checkpoint, self, fixtures, checkpoint_interval)
+        results = [None]*len(fixtures)
+        if progress is not None:
+            for i in progress.finished():
+                results[i] = progress.result(i)
+        tasks = [(i, t1, t2, c) for i, (t1, t2, c) in enumerate(fixtures) if results[i] is None]
+
+        # Build the quantile tables once, so workers can memory-map them
+        if self.cache_dir is not None:
+            OutcomeRoll.load_tables(self.cache_dir)
+        # Create the store once, so workers agree on its layout
+        if store is not None:
+            ResultStore(store)
+
+        if chunksize is None:
+            chunksize = max(1, len(tasks)//(4*self.workers))
+        chunks = [tasks[i:i+chunksize] for i in range(0, len(tasks), chunksize)]
+
+        def finish(chunk_results):
+            for result in chunk_results:
+                results[result['game']] = result
+            if progress is not None:
+                progress.record(chunk_results)
+
+        init_args = (self.teams, self.congregations, self.config, self.seed, self.cache_dir, store)
+        try:
+            if self.workers == 1:
+                _init_worker(*init_args)
+                for chunk in chunks:
+                    finish(_run_chunk(chunk))
+            else:
+                with ProcessPoolExecutor(
+                    max_workers = self.workers,
+                    initializer = _init_worker,
+                    initargs = init_args
+                ) as executor:
+                    for chunk_results in executor.map(_run_chunk, chunks):
+                        finish(chunk_results)
+        finally:
+            if progress is not None:
+                progress.save()
+        return results
+
+    def run_schedule(
+        self,
+        schedule,
+        chunksize = None,
+        store = None,
+        on_round = None,
+        checkpoint = None,
+        checkpoint_interval = CHECKPOINT_INTERVAL
+    ):
+        """
+        Simulate every fixture of a Schedule and return the game results
+        in fixture order, like run(schedule.fixtures).
+
+        Games are handed to the workers as soon as both teams have finished
+        their previous game, so the next round starts while the slowest
+        games of the current one are still running, and a season takes
+        wall time in proportion to its rounds rather than its games
+        (given workers for a round's games).
+
+        on_round(round index, results of that round) is called as each round
+        is completed, in round order. store and checkpoint are as for run();
+        on resuming, the rounds already finished are reported again.
+        """
+        fixtures = schedule.fixtures
+        ngames = len(fixtures)
+        progress = None
+        if checkpoint is not None:
+            progress = SeasonCheckpoint(checkpoint, self, fixtures, checkpoint_interval)
+
+        if self.cache_dir is not None:
+            OutcomeRoll.load_tables(self.cache_dir)
+        if store is not None:
+            ResultStore(store)
+
+        if chunksize is None:
+            chunksize = max(1, ngames//(2*self.workers*max(1, len(schedule.rounds))))
+
+        # Games waiting on each game, and the number each game still waits on
+        dependents = [[] for i in range(ngames)]
+        waiting = [len(d) for d in schedule.depends]
+        for i, depends in enumerate(schedule.depends):
+            for j in depends:
+                dependents[j].append(i)
+        ready = [i for i in range(ngames) if waiting[i] == 0]
+
+        results = [None]*ngames
+        remaining = [len(r) for r in schedule.rounds]
+        round_start = [0]
+        for r in schedule.rounds:
+            round_start.append(round_start[-1] + len(r))
+        next_round = 0
+
+        def finish(chunk_results):
+            nonlocal next_round
+            for result in chunk_results:
+                i = result['game']
+                results[i] = result
+                remaining[schedule.round_of[i]] -= 1
+                for k in dependents[i]:
+                    waiting[k] -= 1
+                    if waiting[k] == 0 and results[k] is None:
+                        ready.append(k)
+            # Report rounds in order, as soon as each is complete
+            while next_round < len(remaining) and remaining[next_round] == 0:
+                if on_round is not None:
+                    on_round(next_round, results[round_start[next_round]:round_start[next_round + 1]])
+                next_round += 1
+
+        def take_chunk():
+            chunk = [(i,) + fixtures[i] for i in ready[:chunksize]]
+            del ready[:chunksize]
+            return chunk
+
+        def finish_chunk(chunk_results):
+            finish(chunk_results)
+            if progress is not None:
+                progress.record(chunk_results)
+
+        # Games finished before a restart count as played, in fixture order
+        if progress is not None:
+            restored = [progress.result(i) for i in progress.finished()]
+            for result in restored:
+                results[result['game']] = result
+            ready[:] = [i for i in ready if results[i] is None]
+            finish(restored)
+
+        init_args = (self.teams, self.congregations, self.config, self.seed, self.cache_dir, store)
+        try:
+            if self.workers == 1:
+                _init_worker(*init_args)
+                while ready:
+                    finish_chunk(_run_chunk(take_chunk()))
+            else:
+                with ProcessPoolExecutor(
+                    max_workers = self.workers,
+                    initializer = _init_worker,
+                    initargs = init_args
+                ) as executor:
+                    running = set()
+                    while ready or running:
+                        while ready:
+                            running.add(executor.submit(_run_chunk, take_chunk()))
+                        done, running = wait(running, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            finish_chunk(future.result())
+        finally:
+            if progress is not None:
+                progress.save()
+        return results
+
+    def run_bracket(self, bracket, speculate=True):
+        """
+        Play a knockout Bracket and return the game results in slot order
+        (see Bracket.champion for the winner).
+
+        Each round needs the winners of the last, so as a round winds down
+        most workers would sit idle. With speculate=True, idle workers play
+        the possible pairings of upcoming slots instead: every pairing of a
+        slot whose two feeder games have known teams, the likeliest first
+        (those with one feeder already decided). When a slot's teams are
+        decided, a speculative result for that pairing is used in place of
+        playing it again, and the others are thrown away.
+
+        Every game's random stream is keyed by its slot, so a speculative
+        game is the same game the real one would be, and the results are
+        identical to a sequential run (workers=1) with the same seed.
+        The number of speculative games played and used is kept in
+        self.speculation.
+        """
+        nslots = len(bracket)
+        results = [None]*nslots
+        # Teams of each slot, once known, and the winner of each slot played
+        teams = {}
+        winners = {}
+        for slot in range(bracket.round_start[1]):
+            teams[slot] = bracket.first_round(slot)
+        ready = list(teams)
+
+        # Speculative results by (slot, team1, team2), and the pairings being played
+        speculative = {}
+        speculated = set()
+        running_keys = set()
+        self.speculation = {'played': 0, 'used': 0}
+
+        def task(key):
+            slot, t1, t2 = key
+            return (slot, t1, t2, bracket.congregations[slot])
+
+        def resolve(slot, result):
+            t1, t2 = teams[slot]
+            results[slot] = result
+            winners[slot] = bracket.winner(result, t1, t2)
+            parent = bracket.parent(slot)
+            if parent is None:
+                return
+            a, b = bracket.feeders(parent)
+            if a in winners and b in winners:
+                teams[parent] = (winners[a], winners[b])
+                key = (parent,) + teams[parent]
+                # The other pairings of this slot will never be needed
+                result = speculative.pop(key, None)
+                for other in [k for k in speculative if k[0] == parent]:
+                    del speculative[other]
+                if result is not None:
+                    self.speculation['used'] += 1
+                    resolve(parent, result)
+                elif key not in running_keys:
+                    ready.append(parent)
+
+        def candidates(slot):
+            # Teams that may play one side of a slot, if no more than two
+            if slot in winners:
+                return [winners[slot]]
+            return list(teams.get(slot, ()))
+
+        def next_speculation():
+            # Likeliest pairing not yet known, played or being played
+            best = None
+            for slot in range(bracket.round_start[1], nslots):
+                if slot in teams:
+                    continue
+                a, b = bracket.feeders(slot)
+                side1, side2 = candidates(a), candidates(b)
+                if not side1 or not side2:
+                    continue
+                npairs = len(side1)*len(side2)
+                if best is not None and npairs >= best[0]:
+                    continue
+                for t1 in side1:
+                    for t2 in side2:
+                        key = (slot, t1, t2)
+                        if key not in speculative and key not in running_keys:
+                            best = (npairs, key)
+                            break
+                    else:
+                        continue
+                    break
+            return best[1] if best is not None else None
+
+        def finish(keys, chunk_results):
+            for key, result in zip(keys, chunk_results):
+                running_keys.discard(key)
+                slot = key[0]
+                if slot in winners:
+                    continue
+                if teams.get(slot) == key[1:]:
+                    if key in speculated:
+                        self.speculation['used'] += 1
+                    resolve(slot, result)
+                elif slot not in teams:
+                    speculative[key] = result
+
+        init_args = (self.teams, self.congregations, self.config, self.seed, self.cache_dir)
+        if self.workers == 1:
+            _init_worker(*init_args)
+            while ready:
+                slot = ready.pop(0)
+                key = (slot,) + teams[slot]
+                finish([key], _run_chunk([task(key)]))
+            return results
+
+        executor = ProcessPoolExecutor(
+            max_workers = self.workers,
+            initializer = _init_worker,
+            initargs = init_args
+        )
+        try:
+            running = {}
+            while len(winners) < nslots:
+                # Games that will be played for real go first, in chunks
+                chunksize = max(1, len(ready)//(2*self.workers))
+                while ready:
+                    keys = [(slot,) + teams[slot] for slot in ready[:chunksize]]
+                    del ready[:chunksize]
+                    running_keys.update(keys)
+                    running[executor.submit(_run_chunk, [task(key) for key in keys])] = keys
+                # Then keep every worker busy with the likeliest upcoming games
+                while speculate and len(running) < self.workers:
+                    key = next_speculation()
+                    if key is None:
+                        break
+                    self.speculation['played'] += 1
+                    speculated.add(key)
+                    running_keys.add(key)
+                    running[executor.submit(_run_chunk, [task(key)])] = [key]
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(running.pop(future), future.result())
+        finally:
+            # Speculative games still running are not needed. Games a worker
+            # has already started cannot be stopped, so don't wait for them.
+            executor.shutdown(wait=False, cancel_futures=True)
+        return results
+
+    def run_game(self, game_index, fixtures=None):
+        """
+        Reproduce a single game of the season in this process,
+        and return the simulated Game.
+        """
+        if fixtures is None:
+            fixtures = self.fixtures()
+        t1, t2, c = fixtures[game_index]
+        game = Game(
+            team1 = self.teams[t1],
+            team2 = self.teams[t2],
+            congregation = self.congregations[c],
+            config = self.config,
+            rng = game_rng(self.seed, game_index)
+        )
+        game.simulate()
+        return game
+
+
+class SeasonCheckpoint(Checkpoint):
+    """
+    The finished games of a season run: a bit per fixture, and each game's
+    score, from which its result (see Game.result) is rebuilt on resume.
+    Tied to the runner's seed, config, team rosters (in league order),
+    congregation attributes and fixtures.
+    """
+    # Score columns
+    columns = ['runs1', 'wickets1', 'eaten1', 'runs2', 'wickets2', 'eaten2']
+
+    def __init__(self, path, runner, fixtures, interval=CHECKPOINT_INTERVAL):
+        rosters = [
+            [format_id(t.id), [[p.attr[k] for k in ATTR_KEYS] for p in t.roster]]
+            for t in runner.teams.values()
+        ]
+        congregations = {
+            format_id(c.id): [getattr(c, k) for k in c.attr_keys]
+            for c in runner.congregations.values()
+        }
+        run_id = fingerprint(
+            runner.seed, dict(runner.config), rosters, congregations, [list(f) for f in fixtures]
+        )
+        super().__init__(path, 'season', run_id, interval)
+        self.fixtures = fixtures
+        saved = self.load()
+        if saved is None:
+            self.done = np.zeros(len(fixtures), dtype=bool)
+            # Runs can pass 32767 with a long enough OVERS_PER_INNING
+            self.scores = np.zeros((len(fixtures), len(self.columns)), dtype=np.int32)
+        else:
+            self.done = np.unpackbits(saved['done'], count=len(fixtures)).astype(bool)
+            self.scores = saved['scores']
+
+    def finished(self):
+        return np.flatnonzero(self.done).tolist()
+
+    def record(self, results):
+        for result in results:
+            i = result['game']
+            self.done[i] = True
+            self.scores[i] = [result[k] for k in self.columns]
+        if self.due():
+            self.save()
+
+    def save(self):
+        super().save(done=np.packbits(self.done), scores=self.scores)
+
+    def result(self, i):
+        t1, t2, c = self.fixtures[i]
+        runs1, wickets1, eaten1, runs2, wickets2, eaten2 = self.scores[i].tolist()
+        if runs1 > runs2:
+            winner = format_id(t1)
+        elif runs2 > runs1:
+            winner = format_id(t2)
+        else:
+            winner = None
+        return {
+            "team1": format_id(t1),
+            "team2": format_id(t2),
+            "congregation": format_id(c),
+            "runs1": runs1,
+            "wickets1": wickets1,
+            "eaten1": bool(eaten1),
+            "runs2": runs2,
+            "wickets2": wickets2,
+            "eaten2": bool(eaten2),
+            "winner": winner,
+            "game": i
+        }
+
+
+##################################
+# Worker process state
+
+_worker = {}
+
+
+def _init_worker(teams, congregations, config, seed, cache_dir, store=None):
+    _worker['teams'] = teams
+    _worker['congregations'] = congregations
+    _worker['config'] = config
+    _worker['seed'] = seed
+    _worker['store'] = ResultStore(store) if store is not None else None
+    if cache_dir is not None:
+        OutcomeRoll.load_tables(cache_dir)
+
+
+def _run_chunk(tasks):
+    games = [_run_task(task) for task in tasks]
+    results = [result for game, result in games]
+    store = _worker['store']
+    if store is not None:
+        store.append(results, [game.innings for game, result in games] if store.balls else None)
+    return results
+
+
+def _run_task(task):
+    game_index, t1, t2, c = task
+    game = Game(
+        team1 = _worker['teams'][t1],
+        team2 = _worker['teams'][t2],
+        congregation = _worker['congregations'][c],
+        config = _worker['config'],
+        rng = game_rng(_worker['seed'], game_index)
+    )
+    game.simulate()
+    result = game.result()
+    result['game'] = game_index
+    return (game, result)
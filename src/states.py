@@ -6,18 +6,30 @@ class GameState(object):
     - both teams
     - both team states
     - gator congregation
+    - random number stream (None means the global random module)
+    - play event stream (None means no events)
+    - simulation stats (None means no instrumentation)
     """
-    def __init__(self, config, team1, team2, state1, state2, congregation):
+    __slots__ = ['config', 'team1', 'team2', 'state1', 'state2', 'congregation', 'rng', 'events', 'stats']
+    def __init__(self, config, team1, team2, state1, state2, congregation, rng=None, events=None, stats=None):
         self.config = config
         self.team1 = team1
         self.team2 = team2
         self.state1 = state1
         self.state2 = state2
         self.congregation = congregation
+        self.rng = rng
+        self.events = events
+        self.stats = stats
 
 
 class TeamState(object):
-    """Simple class to store team state"""
+    """
+    Simple class to store team state.
+    The gator facing the batting team (and its number in the innings)
+    is kept here too, so an innings can be played a few overs at a time.
+    """
+    __slots__ = ['team', 'pokers', 'runs', 'wickets', 'done', 'eaten', 'gator', 'igator']
     def __init__(self, team):
         self.team = team
         self.pokers = [None, None]
@@ -25,6 +37,8 @@ class TeamState(object):
         self.wickets = 0
         self.done = False
         self.eaten = False
+        self.gator = None
+        self.igator = 0
 
     def inning_start(self):
         self.team.inning_start()
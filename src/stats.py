@@ -0,0 +1,91 @@
+import time
+
+
+# Phases timed directly. 'play' is all of OutcomeRoll.play_roll, which
+# includes 'sample' (the beta quantile lookups); 'innings' is all of
+# InningGenerator.generate_half, which includes every phase but 'setup'.
+TIMERS = ['setup', 'innings', 'play', 'sample', 'state', 'events', 'logging']
+
+COUNTERS = ['games', 'innings', 'balls', 'ppf_calls', 'gator_swaps', 'wickets', 'eaten', 'runs']
+
+
+class SimulationStats(object):
+    """
+    Counters and per-phase timers for one or more simulation runs.
+
+    Pass one to Game (stats=...) and every game, innings and ball it plays
+    is counted, and the time spent in each phase added up. Without one,
+    the simulation only pays for a few None checks per ball.
+
+    If callback is given, it is called with a snapshot() every `every` balls,
+    and/or every `interval` seconds (checked after each ball).
+    """
+    def __init__(self, callback=None, every=None, interval=None):
+        self.callback = callback
+        self.every = every
+        self.interval = interval
+        self.reset()
+
+    def reset(self):
+        for c in COUNTERS:
+            setattr(self, c, 0)
+        self.time = dict.fromkeys(TIMERS, 0.0)
+        self.last_balls = 0
+        self.last_time = time.perf_counter()
+
+    def ball(self, outcome, now):
+        """
+        Count one ball with the given outcome, played at time now (perf_counter)
+        """
+        self.balls += 1
+        if outcome > 0:
+            self.runs += outcome
+            if outcome == 6:
+                self.gator_swaps += 1
+        elif outcome < 0:
+            self.wickets += 1
+            if outcome <= -3:
+                self.eaten += 1
+        if self.callback is not None:
+            due = self.every is not None and self.balls - self.last_balls >= self.every
+            if self.interval is not None and now - self.last_time >= self.interval:
+                due = True
+            if due:
+                self.last_balls = self.balls
+                self.last_time = now
+                self.callback(self.snapshot())
+
+    def snapshot(self):
+        """
+        Return the counters and the seconds spent in each phase, as a dict.
+        Phases don't overlap: 'resolve' is play_roll minus beta sampling,
+        and 'other' is the rest of the innings loop (records, bookkeeping).
+        """
+        t = self.time
+        phases = {
+            'setup': t['setup'],
+            'sample': t['sample'],
+            'resolve': t['play'] - t['sample'],
+            'state': t['state'],
+            'events': t['events'],
+            'logging': t['logging'],
+            'other': t['innings'] - t['play'] - t['state'] - t['events'] - t['logging'],
+        }
+        snapshot = {c: getattr(self, c) for c in COUNTERS}
+        snapshot['seconds'] = t['setup'] + t['innings']
+        snapshot['time'] = phases
+        return snapshot
+
+    def report(self):
+        """
+        Return a short text table of the counters and phase times
+        """
+        snapshot = self.snapshot()
+        seconds = snapshot['seconds']
+        lines = [f"{c:>12}: {snapshot[c]}" for c in COUNTERS]
+        if seconds > 0 and self.balls > 0:
+            lines.append(f"{'balls/sec':>12}: {self.balls/seconds:.0f}")
+        for phase, s in snapshot['time'].items():
+            share = 100*s/seconds if seconds > 0 else 0.0
+            lines.append(f"{phase:>12}: {s:.4f} s ({share:.1f}%)")
+        return '\n'.join(lines)
@@ -0,0 +1,161 @@
+import numpy as np
+
+from .outcomeroll import OutcomeRoll, PLAY_OUTCOMES
+from .core import DefaultConfig
+from .playertable import player_stars, team_stars
+
+
+# Outcome classes tracked by the innings model
+RUN_OUTCOMES = [0, 1, 4, 6]
+
+
+class WinProbability(object):
+    """
+    Exact pre-match odds for a matchup (team1, team2, congregation),
+    by dynamic programming over the innings state instead of sampling games.
+
+    A half-inning is a Markov chain over
+    (wickets, batting order index of the other batter, who is on strike,
+    current gator, runs), following the rules in InningGenerator:
+    the striker and non-striker swap on odd runs, the next gator comes out
+    on a 6, the next player replaces the striker on a wicket, and the innings
+    ends after the last over or at PLAYERS_PER_SIDE - 1 wickets. The newest
+    batter is always number wickets + 1 in the batting order, so only the
+    other batter needs to be tracked. Per-ball outcome probabilities come
+    from OutcomeTable.
+
+    The chase stops as soon as team2 passes team1, but runs never go down,
+    so team2 passes team1 exactly when its full-length innings would have.
+    Win/tie/loss probabilities therefore follow from the two run distributions.
+
+    Rosters are taken from the teams, unless roster1/roster2 give the star
+    ratings directly, as in MonteCarloGame.
+    """
+    req_keys = ['team1', 'team2', 'congregation']
+    def __init__(self, **kwargs):
+        req_keys = self.req_keys
+        for rk in req_keys:
+            if rk not in kwargs:
+                raise Exception(f"Error: missing required key {rk} from WinProbability constructor")
+            setattr(self, rk, kwargs[rk])
+        if 'config' in kwargs:
+            config = kwargs['config']
+        else:
+            config = DefaultConfig()
+        self.config = config
+
+        # Star ratings, one row per player in batting order
+        self.roster1 = team_stars(self.team1, config, kwargs.get('roster1'))
+        self.roster2 = team_stars(self.team2, config, kwargs.get('roster2'))
+
+        # Every gator from a congregation is identical, so there is a single gator
+        self.gators = player_stars([self.congregation.get_next_gator()])
+
+    def outcome_probabilities(self, roster):
+        """
+        Return an array indexed by [batting order index, gator, RUN_OUTCOMES + wicket]
+        for a roster of star ratings
+        """
+        table = OutcomeRoll.get_outcome_table()
+        plays = table.play_probabilities(roster[:, None, :], self.gators[None, :, :])
+        # Sum the plays leading to each outcome class
+        classes = np.zeros((len(PLAY_OUTCOMES), len(RUN_OUTCOMES) + 1))
+        for play, outcome in enumerate(PLAY_OUTCOMES):
+            if outcome < 0:
+                classes[play, -1] = 1.0
+            else:
+                classes[play, RUN_OUTCOMES.index(outcome)] = 1.0
+        return plays @ classes
+
+    def innings_distribution(self, roster):
+        """
+        Return the exact distributions of runs and of wickets at the end of
+        a full-length innings for a batting roster of star ratings.
+        """
+        config = self.config
+        nballs = config['OVERS_PER_INNING'] * config['PLAYS_PER_OVER']
+        max_wickets = config['PLAYERS_PER_SIDE'] - 1
+        ngators = len(self.gators)
+        nruns = 6*nballs + 1
+
+        probs = self.outcome_probabilities(roster)
+
+        # (wickets, other) pairs still in play, laid out so that the pairs
+        # for w wickets are the slice pairs[w]. The striker is batting order
+        # index wickets + 1 if the newest batter is on strike, otherwise the other batter.
+        pairs = []
+        npairs = 0
+        for w in range(max_wickets):
+            pairs.append(slice(npairs, npairs + w + 1))
+            npairs += w + 1
+
+        # Outcome probabilities indexed by [newest on strike, pair, gator, outcome]
+        q = np.zeros((2, npairs, ngators, probs.shape[-1]))
+        for w in range(max_wickets):
+            q[0, pairs[w]] = probs[:w + 1]
+            q[1, pairs[w]] = probs[w + 1]
+        q0, q1, q4, q6, qw = [q[..., i, None] for i in range(probs.shape[-1])]
+
+        # Probability mass over (newest on strike, pair, gator, runs).
+        # At the start, batting order 0 (other) is on strike and 1 (newest) is not.
+        mass = np.zeros((2, npairs, ngators, nruns))
+        mass[0, 0, 0, 0] = 1.0
+        # Mass of innings that have ended on wickets, by runs
+        all_out = np.zeros(nruns)
+
+        for iball in range(nballs):
+            # Only run totals up to 6 per ball so far can have any mass
+            m = 6*iball + 1
+            cur = mass[..., :m]
+            new = np.zeros_like(mass)
+            new[..., :m] = q0*cur
+            new[..., 4:m + 4] += q4*cur
+            # Odd runs swap the striker
+            new[::-1, ..., 1:m + 1] += q1*cur
+            # A 6 brings out the next gator
+            if ngators > 1:
+                new[..., 6:m + 6] += np.roll(q6*cur, 1, axis=2)
+            else:
+                new[..., 6:m + 6] += q6*cur
+
+            # Wickets: the next player replaces the striker and is on strike.
+            # If the newest batter was out, the other batter stays;
+            # otherwise the newest batter becomes the other batter.
+            out = qw*cur
+            for w in range(max_wickets - 1):
+                dest = new[1, pairs[w + 1], :, :m]
+                dest[:w + 1] += out[1, pairs[w]]
+                dest[w + 1] += out[0, pairs[w]].sum(axis=0)
+            all_out[:m] += out[:, pairs[-1]].sum(axis=(0, 1, 2))
+            mass = new
+
+        runs = all_out + mass.sum(axis=(0, 1, 2))
+        wickets = np.zeros(max_wickets + 1)
+        by_pair = mass.sum(axis=(0, 2, 3))
+        for w in range(max_wickets):
+            wickets[w] = by_pair[pairs[w]].sum()
+        wickets[max_wickets] = all_out.sum()
+        return runs, wickets
+
+    def compute(self):
+        """
+        Return a dict with the win/tie probabilities and the run distribution
+        of team1's innings (the full-length run distribution of team2 is also included).
+        """
+        runs1, wickets1 = self.innings_distribution(self.roster1)
+        runs2, wickets2 = self.innings_distribution(self.roster2)
+
+        # P(team2 ends above team1), summed over team1's total
+        above = np.concatenate([np.cumsum(runs2[::-1])[::-1][1:], [0.0]])
+        win2 = float(np.dot(runs1, above))
+        tie = float(np.dot(runs1, runs2))
+        win1 = 1.0 - win2 - tie
+        return {
+            'win1': win1,
+            'win2': win2,
+            'tie': tie,
+            'runs1': runs1,
+            'wickets1': wickets1,
+            'runs2': runs2,
+            'wickets2': wickets2
+        }
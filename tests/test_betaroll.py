@@ -0,0 +1,53 @@
+import os
+import random
+import tempfile
+import unittest
+import numpy as np
+from scipy.stats import beta
+from gator_poking.betaroll import BetaTable
+from gator_poking.outcomeroll import (
+    PLAYER_ATTR_SPACE,
+    PLAYER_CON_SPACE,
+    GATOR_ATTR_SPACE,
+    GATOR_CON_SPACE
+)
+
+HERE = os.path.split(os.path.abspath(__file__))[0]
+
+
+class BetaTableTest(unittest.TestCase):
+    """
+    Test gator_poking.betaroll.BetaTable
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.table = BetaTable(PLAYER_ATTR_SPACE, PLAYER_CON_SPACE)
+
+    def test_max_error(self):
+        self.assertLess(self.table.max_error, 1e-5)
+        gator_table = BetaTable(GATOR_ATTR_SPACE, GATOR_CON_SPACE)
+        self.assertLess(gator_table.max_error, 1e-5)
+
+    def test_ppf(self):
+        rng = random.Random(42)
+        for iE, E in enumerate(PLAYER_ATTR_SPACE):
+            for ia, a in enumerate(PLAYER_CON_SPACE):
+                b = a * (1.0/E - 1.0)
+                for _ in range(20):
+                    y = rng.random()
+                    self.assertAlmostEqual(self.table.ppf(iE, ia, y), beta.ppf(y, a, b), delta=1e-5)
+
+        # Array form agrees with scalar form
+        ys = np.linspace(0.0, 1.0, 101)
+        xs = self.table.ppf_array(2, 3, ys)
+        for y, x in zip(ys, xs):
+            self.assertAlmostEqual(self.table.ppf(2, 3, y), x)
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            t1 = BetaTable(PLAYER_ATTR_SPACE, PLAYER_CON_SPACE, cache_dir=cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            t2 = BetaTable(PLAYER_ATTR_SPACE, PLAYER_CON_SPACE, cache_dir=cache_dir)
+            self.assertIsInstance(t2.tables, np.memmap)
+            self.assertTrue(np.array_equal(t1.tables, t2.tables))
+            self.assertEqual(t1.max_error, self.table.max_error)
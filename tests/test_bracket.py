@@ -0,0 +1,77 @@
+import os
+import random
+import logging
+import tempfile
+import unittest
+from gator_poking import (
+    Bracket,
+    SeasonRunner,
+    League,
+    GatorLeague,
+    LeagueGenerator,
+    GatorLeagueGenerator
+)
+
+HERE = os.path.split(os.path.abspath(__file__))[0]
+
+
+class BracketTest(unittest.TestCase):
+    """
+    Test gator_poking.bracket.Bracket
+    """
+    def setUp(self):
+        self.logger = logging.getLogger('gp')
+        self.logger.disabled = True
+        self.tmpdir = tempfile.TemporaryDirectory()
+        wd = self.tmpdir.name
+        _, league_file = LeagueGenerator().generate(working_dir=wd, size=16, rng=random.Random(1))
+        _, gleague_file = GatorLeagueGenerator().generate(working_dir=wd, size=2, rng=random.Random(2))
+        self.league = League(league_file)
+        self.gator_league = GatorLeague(gleague_file)
+
+    def tearDown(self):
+        self.logger.disabled = False
+        self.tmpdir.cleanup()
+
+    def test_structure(self):
+        bracket = Bracket(range(8), ['a'])
+        self.assertEqual(len(bracket), 7)
+        self.assertEqual(bracket.nrounds, 3)
+        # Top seeds meet in the final at the earliest
+        self.assertEqual([bracket.first_round(s) for s in range(4)], [(0, 7), (3, 4), (1, 6), (2, 5)])
+        self.assertEqual(bracket.feeders(4), (0, 1))
+        self.assertEqual(bracket.feeders(6), (4, 5))
+        self.assertEqual(bracket.parent(3), 5)
+        self.assertIsNone(bracket.parent(6))
+        self.assertIsNone(bracket.feeders(2))
+        with self.assertRaises(Exception):
+            Bracket(range(6), ['a'])
+
+        tied = {'runs1': 10, 'runs2': 10, 'wickets1': 3, 'wickets2': 2}
+        self.assertEqual(Bracket.winner(tied, 'x', 'y'), 'y')
+
+    def test_speculative(self):
+        bracket = Bracket(list(self.league.data), list(self.gator_league.data))
+        def runner(workers):
+            return SeasonRunner(self.league, self.gator_league, seed=9, workers=workers)
+
+        serial = runner(1).run_bracket(bracket)
+        self.assertEqual([r['game'] for r in serial], list(range(15)))
+
+        parallel = runner(3)
+        results = parallel.run_bracket(bracket, speculate=True)
+        self.assertEqual(results, serial)
+        self.assertGreater(parallel.speculation['played'], 0)
+        self.assertLessEqual(parallel.speculation['used'], parallel.speculation['played'])
+        self.assertEqual(bracket.champion(results), bracket.champion(serial))
+
+        # The final is played by the winners of the semifinals
+        semis = [bracket.winner(serial[s], *self.teams(bracket, serial, s)) for s in (12, 13)]
+        self.assertEqual(serial[14]['team1'], semis[0])
+        self.assertEqual(serial[14]['team2'], semis[1])
+
+    def teams(self, bracket, results, slot):
+        feeders = bracket.feeders(slot)
+        if feeders is None:
+            return bracket.first_round(slot)
+        return tuple(bracket.winner(results[f], *self.teams(bracket, results, f)) for f in feeders)
@@ -0,0 +1,154 @@
+import os
+import json
+import random
+import logging
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from gator_poking import (
+    Schedule,
+    SeasonRunner,
+    MonteCarloGame,
+    League,
+    GatorLeague,
+    LeagueGenerator,
+    GatorLeagueGenerator
+)
+from gator_poking import season
+from gator_poking.core import Team, Congregation
+from gator_poking.generators import RosterGenerator
+
+HERE = os.path.split(os.path.abspath(__file__))[0]
+
+
+class Preempted(Exception):
+    pass
+
+
+def fail_after(n, f):
+    """
+    Wrap f so that it raises Preempted on its call after the first n
+    """
+    calls = [0]
+    def wrapped(*args, **kwargs):
+        calls[0] += 1
+        if calls[0] > n:
+            raise Preempted()
+        return f(*args, **kwargs)
+    return wrapped
+
+
+class CheckpointTest(unittest.TestCase):
+    """
+    Test gator_poking.checkpoint
+    """
+    def setUp(self):
+        self.logger = logging.getLogger('gp')
+        self.logger.disabled = True
+        self.tmpdir = tempfile.TemporaryDirectory()
+        wd = self.tmpdir.name
+        _, self.league_file = LeagueGenerator().generate(working_dir=wd, size=8, rng=random.Random(1))
+        _, gleague_file = GatorLeagueGenerator().generate(working_dir=wd, size=2, rng=random.Random(2))
+        self.league = League(self.league_file)
+        self.gator_league = GatorLeague(gleague_file)
+        self.path = os.path.join(wd, 'run.ckpt')
+
+    def tearDown(self):
+        self.logger.disabled = False
+        self.tmpdir.cleanup()
+
+    def runner(self, seed=11):
+        return SeasonRunner(self.league, self.gator_league, seed=seed, workers=1)
+
+    def test_season(self):
+        fixtures = self.runner().fixtures()
+        expected = self.runner().run(fixtures)
+
+        with mock.patch.object(season, '_run_chunk', fail_after(3, season._run_chunk)):
+            with self.assertRaises(Preempted):
+                self.runner().run(fixtures, chunksize=2, checkpoint=self.path, checkpoint_interval=3600)
+        self.assertTrue(os.path.exists(self.path))
+
+        # Only the games that weren't saved are played again
+        played = []
+        original = season._run_chunk
+        def run_chunk(tasks):
+            played.extend(task[0] for task in tasks)
+            return original(tasks)
+        with mock.patch.object(season, '_run_chunk', run_chunk):
+            resumed = self.runner().run(fixtures, chunksize=2, checkpoint=self.path)
+        self.assertEqual(resumed, expected)
+        self.assertEqual(sorted(played), list(range(6, len(fixtures))))
+
+        # A checkpoint only resumes the run it came from
+        with self.assertRaises(Exception):
+            self.runner(seed=12).run(fixtures, checkpoint=self.path)
+
+        # Rosters follow the league file order, so the same teams reordered are a different run
+        with open(self.league_file) as f:
+            data = json.load(f)
+        reordered = os.path.join(self.tmpdir.name, 'reordered.json')
+        with open(reordered, 'w') as f:
+            json.dump(dict(reversed(list(data.items()))), f)
+        runner = SeasonRunner(League(reordered), self.gator_league, seed=11, workers=1)
+        with self.assertRaises(Exception):
+            runner.run(fixtures, checkpoint=self.path)
+
+    def test_large_scores(self):
+        fixtures = self.runner().fixtures()
+        # More runs than an int16 holds
+        result = self.runner().run_game(0).result()
+        result = dict(result, runs1=40000, runs2=39999, winner=result['team1'], game=0)
+        progress = season.SeasonCheckpoint(self.path, self.runner(), fixtures)
+        progress.record([result])
+        progress.save()
+        resumed = season.SeasonCheckpoint(self.path, self.runner(), fixtures)
+        self.assertEqual(resumed.finished(), [0])
+        self.assertEqual(resumed.result(0), result)
+
+    def test_schedule(self):
+        schedule = Schedule.from_leagues(self.league, self.gator_league)
+        expected = self.runner().run_schedule(schedule)
+
+        with mock.patch.object(season, '_run_chunk', fail_after(5, season._run_chunk)):
+            with self.assertRaises(Preempted):
+                self.runner().run_schedule(schedule, chunksize=1, checkpoint=self.path, checkpoint_interval=0)
+
+        rounds = []
+        resumed = self.runner().run_schedule(
+            schedule,
+            checkpoint = self.path,
+            on_round = lambda r, results: rounds.append(r)
+        )
+        self.assertEqual(resumed, expected)
+        self.assertEqual(rounds, list(range(len(schedule.rounds))))
+
+    def test_montecarlo(self):
+        teams = []
+        for i in range(2):
+            team = Team(city="Tampa", nickname=f"Pokers {i}", color="Red")
+            team.set_roster(RosterGenerator().generate(size=11, rng=random.Random(i)))
+            teams.append(team)
+        congregation = Congregation(place="Everglades", nickname="Glories", agg=3, rea=3, rxn=3, con=3)
+        game = MonteCarloGame(team1=teams[0], team2=teams[1], congregation=congregation)
+        expected = game.simulate_batches(1000, 150, seed=4)
+
+        # Interrupted in the fourth batch (two halves per batch)
+        with mock.patch.object(game, 'simulate_half', fail_after(7, game.simulate_half)):
+            with self.assertRaises(Preempted):
+                game.simulate_batches(1000, 150, seed=4, checkpoint=self.path, checkpoint_interval=0)
+
+        resumed = game.simulate_batches(1000, 150, seed=4, checkpoint=self.path)
+        self.assertEqual(resumed.ngames, 1000)
+        self.assertTrue(np.array_equal(resumed.runs1, expected.runs1))
+        self.assertTrue(np.array_equal(resumed.runs2, expected.runs2))
+        self.assertTrue(np.array_equal(resumed.eaten2, expected.eaten2))
+        self.assertEqual(resumed.summary(), expected.summary())
+
+        with self.assertRaises(Exception):
+            game.simulate_batches(1000, 100, seed=4, checkpoint=self.path)
+
+        empty = game.simulate_batches(0, 150, seed=4, checkpoint=self.path + '.empty')
+        self.assertEqual(empty.ngames, 0)
+        self.assertEqual(len(empty.runs1), 0)
@@ -1,9 +1,17 @@
 import os
+import json
+import random
+import tempfile
 import unittest
+from gator_poking import leagueindex
 from gator_poking.core import (
     Config,
-    DefaultConfig
+    DefaultConfig,
+    League,
+    Team,
+    Player
 )
+from gator_poking.generators import LeagueGenerator
 
 HERE = os.path.split(os.path.abspath(__file__))[0]
 
@@ -23,3 +31,114 @@ class CoreTest(unittest.TestCase):
 
         d = DefaultConfig()
         self.assertDictEqual(d, g)
+
+    def test_players_from_arrays(self):
+        players = Player.from_arrays(["A B", "C D"], [1, 2], [3, 4], [5, 1], [2, 2], ids=["a", "c"])
+        self.assertEqual([p.id for p in players], ["a", "c"])
+        self.assertEqual(players[1].attr, {'agg': 2, 'rea': 4, 'rxn': 1, 'con': 2})
+        single = Player(id="c", name="C D", agg=2, rea=4, rxn=1, con=2)
+        self.assertEqual(repr(players[1]), repr(single))
+        # Slotted, so no per-instance dict
+        self.assertFalse(hasattr(single, '__dict__'))
+        with self.assertRaises(Exception):
+            Player.from_arrays(["A B"], [1, 2], [3], [5], [2])
+
+
+class LeagueTest(unittest.TestCase):
+    """
+    Test gator_poking.core.League loading through gator_poking.leagueindex
+    """
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.wd = self.tmpdir.name
+        _, self.league_file = LeagueGenerator().generate(working_dir=self.wd, size=4, rng=random.Random(3))
+        with open(self.league_file, 'r') as f:
+            self.expected = json.load(f)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_lazy_league(self):
+        league = League(self.league_file)
+        self.assertEqual(len(league), len(self.expected))
+        self.assertEqual(list(league.data), list(self.expected))
+        self.assertEqual(dict(league.data.items()), self.expected)
+
+        # Teams are built once, on access, and shared
+        teamid = list(self.expected)[2]
+        self.assertEqual(league.cache, {})
+        team = league.get_team(teamid)
+        self.assertEqual(team.to_json(), Team.from_json(self.expected[teamid]).to_json())
+        self.assertIs(league.get_teams()[2], team)
+
+        # Changes go on a copy
+        copy = team.copy()
+        copy.set_roster([])
+        self.assertEqual(copy.to_json(), team.to_json())
+        self.assertIsNone(league.get_team(teamid).roster)
+
+        # Built teams outlive the league file being closed
+        with league:
+            pass
+        self.assertIs(league.get_team(teamid), team)
+
+    def test_index_cache(self):
+        # Only cached when asked, and never next to the league file
+        files = set(os.listdir(self.wd))
+        League(self.league_file)
+        self.assertEqual(set(os.listdir(self.wd)), files)
+
+        cache_dir = os.path.join(self.wd, 'cache')
+        os.mkdir(cache_dir)
+        League(self.league_file, cache_dir=cache_dir)
+        self.assertEqual(set(os.listdir(self.wd)), files | {'cache'})
+        index_file = leagueindex.index_file_name(self.league_file, cache_dir)
+        self.assertEqual(os.path.dirname(index_file), cache_dir)
+        self.assertTrue(os.path.exists(index_file))
+        ids, offsets = leagueindex.load_index(self.league_file, cache_dir, League.req_keys)
+        self.assertEqual(ids, list(self.expected))
+        # An index checked for fewer keys than needed is not used
+        self.assertIsNone(leagueindex.load_index(self.league_file, cache_dir, ['id', 'place']))
+
+        # Changing the league file invalidates the index
+        data = dict(self.expected)
+        teamid = list(data)[0]
+        data[teamid] = dict(data[teamid], city="Näples")
+        data["ångström"] = data.pop(list(data)[1])
+        with open(self.league_file, 'w') as f:
+            json.dump(data, f)
+        os.utime(self.league_file, ns=(0, 0))
+        self.assertIsNone(leagueindex.load_index(self.league_file, cache_dir))
+        league = League(self.league_file, cache_dir=cache_dir)
+        self.assertEqual(league.data[teamid]['city'], "Näples")
+        self.assertEqual(list(league.data), list(data))
+        self.assertEqual(League(self.league_file, cache_dir=cache_dir).data["ångström"], data["ångström"])
+
+    def test_chunked_scan(self):
+        # Records straddling chunk boundaries
+        chunk_size = leagueindex.SCAN_CHUNK_SIZE
+        leagueindex.SCAN_CHUNK_SIZE = 7
+        try:
+            ids, offsets = leagueindex.scan_league_file(self.league_file)
+        finally:
+            leagueindex.SCAN_CHUNK_SIZE = chunk_size
+        self.assertEqual(ids, list(self.expected))
+        with open(self.league_file, 'rb') as f:
+            text = f.read()
+        for i, teamid in enumerate(ids):
+            self.assertEqual(json.loads(text[offsets[2*i]:offsets[2*i + 1]]), self.expected[teamid])
+
+    def test_missing_key(self):
+        # Checked when the league is loaded, not when the team is looked up
+        with open(self.league_file, 'w') as f:
+            json.dump({"a": {"id": "a", "city": "Tampa"}}, f)
+        with self.assertRaises(Exception):
+            League(self.league_file)
+
+    def test_empty_league(self):
+        _, league_file = LeagueGenerator().generate(working_dir=self.wd, size=0)
+        self.assertEqual(League(league_file).get_teams(), [])
+        for text in ["{}", "{}\n", " { \n } "]:
+            with open(self.league_file, 'w') as f:
+                f.write(text)
+            self.assertEqual(League(self.league_file).get_teams(), [])
@@ -0,0 +1,34 @@
+import os
+import tempfile
+import unittest
+from gator_poking.corpus import load_corpus
+from gator_poking.generators import NameGenerator
+
+HERE = os.path.split(os.path.abspath(__file__))[0]
+
+
+class CorpusTest(unittest.TestCase):
+    """
+    Test gator_poking.corpus
+    """
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as wd:
+            data_file = os.path.join(wd, 'names.txt')
+            with open(data_file, 'w') as f:
+                f.write("Alice\nBob \n")
+            lines = load_corpus(data_file)
+            self.assertEqual(lines, ("Alice", "Bob"))
+            # Read once, shared by every caller
+            self.assertIs(load_corpus(data_file), lines)
+
+            # Changed files are read again
+            with open(data_file, 'w') as f:
+                f.write("Carol\n")
+            os.utime(data_file, ns=(0, 0))
+            self.assertEqual(load_corpus(data_file), ("Carol",))
+
+            with self.assertRaises(Exception):
+                load_corpus(os.path.join(wd, 'missing.txt'))
+
+    def test_generators_share_data(self):
+        self.assertIs(NameGenerator(None, None).firstnamesdata, NameGenerator.default().firstnamesdata)
@@ -0,0 +1,106 @@
+import os
+import sys
+import time
+import random
+import logging
+import tempfile
+import unittest
+import subprocess
+from gator_poking import (
+    MonteCarloGame,
+    SeasonRunner,
+    League,
+    GatorLeague,
+    LeagueGenerator,
+    GatorLeagueGenerator
+)
+from gator_poking.daemon import DaemonClient
+
+HERE = os.path.split(os.path.abspath(__file__))[0]
+
+
+class SimulationDaemonTest(unittest.TestCase):
+    """
+    Test gator_poking.daemon.SimulationDaemon
+    """
+    def setUp(self):
+        self.logger = logging.getLogger('gp')
+        self.logger.disabled = True
+        self.tmpdir = tempfile.TemporaryDirectory()
+        wd = self.tmpdir.name
+        _, self.league_file = LeagueGenerator().generate(working_dir=wd, size=4, rng=random.Random(1))
+        _, self.gleague_file = GatorLeagueGenerator().generate(working_dir=wd, size=2, rng=random.Random(2))
+        self.path = os.path.join(wd, 'gp.sock')
+        self.daemon = subprocess.Popen(
+            [sys.executable, '-m', 'gator_poking.daemon', 'serve', '--socket', self.path, '--workers', '2']
+        )
+        deadline = time.time() + 60
+        while not os.path.exists(self.path):
+            if time.time() > deadline or self.daemon.poll() is not None:
+                raise Exception("Error: simulation daemon did not start")
+            time.sleep(0.05)
+
+    def tearDown(self):
+        self.logger.disabled = False
+        if self.daemon.poll() is None:
+            self.daemon.kill()
+        self.daemon.wait()
+        self.tmpdir.cleanup()
+
+    def test_jobs(self):
+        league = League(self.league_file)
+        gator_league = GatorLeague(self.gleague_file)
+        team_ids = list(league.data)
+        cong_id = list(gator_league.data)[1]
+        leagues = {'league': self.league_file, 'gator_league': self.gleague_file}
+
+        with DaemonClient(self.path) as client:
+            self.assertEqual(client.submit('ping')['jobs'], 0)
+
+            # Same rosters and stream as running it here
+            summary = client.submit('matchup', team1=team_ids[0], team2=team_ids[3], congregation=cong_id, games=500, seed=7, **leagues)
+            runner = SeasonRunner(league, gator_league, seed=7, workers=1)
+            game = MonteCarloGame(team1=runner.teams[team_ids[0]], team2=runner.teams[team_ids[3]], congregation=runner.congregations[cong_id])
+            self.assertEqual(summary, game.simulate(500, seed=7).summary())
+
+            summary = client.submit('matchup', team1=team_ids[0], team2=team_ids[3], games=20, method='game', **leagues)
+            self.assertEqual(summary['ngames'], 20)
+            self.assertAlmostEqual(summary['win1'] + summary['win2'] + summary['tie'], 1.0)
+
+            # Same rosters as the first job, whichever worker runs it
+            summary = client.submit('matchup', team1=team_ids[0], team2=team_ids[3], congregation=cong_id, games=500, seed=7, **leagues)
+            self.assertEqual(summary, game.simulate(500, seed=7).summary())
+
+            for method in ['montecarlo', 'game']:
+                summary = client.submit('matchup', team1=team_ids[0], team2=team_ids[3], games=0, method=method, **leagues)
+                self.assertEqual(summary['ngames'], 0)
+                self.assertIsNone(summary['win1'])
+
+            season = client.submit('season', seed=3, **leagues)
+            self.assertEqual(season['games'], 6)
+            self.assertEqual(sum(row[1] for row in season['standings'][0]), 12)
+
+            with self.assertRaises(Exception):
+                client.submit('matchup', team1='nobody', team2=team_ids[1], **leagues)
+            with self.assertRaises(Exception):
+                client.submit('dance')
+            self.assertEqual(client.submit('ping')['jobs'], 6)
+
+            client.submit('shutdown')
+        self.daemon.wait(timeout=60)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_runner_cache(self):
+        from gator_poking import daemon
+        request = {'job': 'matchup', 'league': self.league_file, 'gator_league': self.gleague_file, 'seed': 2}
+        runner = daemon._runner(request)
+        self.assertIs(daemon._runner(dict(request)), runner)
+        self.assertIsNot(daemon._runner(dict(request, seed=3)), runner)
+        self.assertIsNot(daemon._runner(dict(request, config={'OVERS_PER_INNING': 5})), runner)
+
+        # A changed league file gets a new runner
+        st = os.stat(self.league_file)
+        os.utime(self.league_file, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        self.assertIsNot(daemon._runner(request), runner)
+        daemon._runners.clear()
+        daemon._leagues.clear()
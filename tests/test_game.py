@@ -0,0 +1,113 @@
+import os
+import random
+import logging
+import unittest
+from gator_poking import Game
+from gator_poking.core import Team, Congregation, Player
+from gator_poking.generators import RosterGenerator
+from gator_poking.rng import CounterRNG
+from gator_poking.inninggenerator import InningGenerator
+
+HERE = os.path.split(os.path.abspath(__file__))[0]
+
+
+class GameTest(unittest.TestCase):
+    """
+    Test gator_poking.game.Game
+    """
+    def setUp(self):
+        self.logger = logging.getLogger('gp')
+        self.logger.disabled = True
+        random.seed(8)
+        self.team1 = Team(city="Tampa", nickname="Pokers", color="Red")
+        self.team2 = Team(city="Ocala", nickname="Prodders", color="Blue")
+        self.team1.set_roster(RosterGenerator().generate(size=11))
+        self.team2.set_roster(RosterGenerator().generate(size=11))
+        self.congregation = Congregation(place="Everglades", nickname="Glories", agg=3, rea=3, rxn=3, con=3)
+
+    def tearDown(self):
+        self.logger.disabled = False
+
+    def game(self):
+        return Game(
+            team1 = self.team1,
+            team2 = self.team2,
+            congregation = self.congregation,
+            rng = CounterRNG(21, 0)
+        )
+
+    def test_events(self):
+        game = self.game()
+        events = []
+        game.subscribe(events.append)
+        game.simulate()
+
+        state = game.state
+        for innings, team_state in [(0, state.state1), (1, state.state2)]:
+            plays = [e for e in events if e.innings == innings]
+            wickets, runs = game.innings[innings].overs()
+            self.assertEqual(len(plays), sum(len(over) for over in runs))
+            self.assertEqual(sum(max(e.outcome, 0) for e in plays), team_state.runs)
+            self.assertEqual(sum(e.outcome < 0 for e in plays), team_state.wickets)
+        self.assertEqual(events[0].poker, self.team1.roster[0].id)
+
+        # Events do not change the game
+        quiet = self.game()
+        quiet.simulate()
+        self.assertEqual(quiet.result(), game.result())
+
+    def test_innings_record(self):
+        game = self.game()
+        events = []
+        game.subscribe(events.append)
+        game.simulate()
+
+        state = game.state
+        for innings, team_state in [(0, state.state1), (1, state.state2)]:
+            record = game.innings[innings]
+            plays = [e for e in events if e.innings == innings]
+            self.assertEqual(len(record), len(plays))
+            self.assertEqual(record.total_runs(), team_state.runs)
+            self.assertEqual(record.total_wickets(), team_state.wickets)
+            self.assertEqual(record.cumulative_runs()[-1], team_state.runs)
+            self.assertEqual(list(record.outcomes()), [e.outcome for e in plays])
+            self.assertEqual(list(record.play[:len(record)]), [e.play for e in plays])
+            roster = game.state.team1.roster if innings == 0 else game.state.team2.roster
+            self.assertEqual([roster[i].id for i in record.striker[:len(record)]], [e.poker for e in plays])
+        # One byte per ball for each column of a 20-over innings
+        self.assertEqual(game.innings[0].nbytes, 3*120)
+
+    def test_innings_in_overs(self):
+        # Playing an innings an over at a time faces the same gators as playing it whole
+        game = self.game()
+        game.simulate()
+
+        stepped = self.game()
+        events = []
+        stepped.subscribe(events.append)
+        state = stepped.state
+        config = stepped.config
+        for innings, top in [(0, True), (1, False)]:
+            batting_state = state.state1 if top else state.state2
+            gators = []
+            for iover in range(config['OVERS_PER_INNING']):
+                record = InningGenerator.generate_half(config, state, top, start_over=iover, end_over=iover+1)
+                gators.extend(record.gator[:len(record)].tolist())
+                if batting_state.done:
+                    break
+            full = game.innings[innings]
+            self.assertEqual(gators, full.gator[:len(full)].tolist())
+        self.assertEqual(stepped.result(), game.result())
+
+        # A new gator comes in only after one is slapped for six
+        for last, event in zip(events, events[1:]):
+            if event.innings == last.innings:
+                self.assertEqual(event.gator != last.gator, last.outcome == 6)
+
+    def test_duplicate_player_ids(self):
+        # The innings record stores the striker by batting order, looked up by player id
+        roster = RosterGenerator().generate(size=11)
+        roster[5] = Player(id=roster[2].id, name="Same Id", agg=1, rea=1, rxn=1, con=1)
+        self.team1.set_roster(roster)
+        with self.assertRaises(Exception):
+            self.game().simulate()
@@ -0,0 +1,71 @@
+import os
+import uuid
+import unittest
+from gator_poking import ids
+from gator_poking.ids import (
+    SequentialIds,
+    RandomIds,
+    format_id,
+    set_id_allocator
+)
+from gator_poking.core import Team, Player
+
+HERE = os.path.split(os.path.abspath(__file__))[0]
+
+
+class IdsTest(unittest.TestCase):
+    """
+    Test gator_poking.ids
+    """
+    def test_sequential(self):
+        alloc = SequentialIds(namespace=3)
+        first = alloc.new_id()
+        self.assertEqual(first, 3 << ids.COUNTER_BITS)
+        self.assertEqual(alloc.allocate(3), [first + 1, first + 2, first + 3])
+        self.assertEqual(format_id(first + 1), "0000030000000001")
+        with self.assertRaises(Exception):
+            SequentialIds(namespace=1 << ids.NAMESPACE_BITS)
+
+        # The counter never spills into the namespace bits
+        last = SequentialIds(namespace=3, start=(1 << ids.COUNTER_BITS) - 1)
+        self.assertEqual(last.new_id() >> ids.COUNTER_BITS, 3)
+        with self.assertRaises(Exception):
+            last.new_id()
+        with self.assertRaises(Exception):
+            SequentialIds(namespace=3, start=(1 << ids.COUNTER_BITS) - 2).allocate(3)
+
+    def test_random(self):
+        alloc = RandomIds(batch=8)
+        values = [alloc.new_id() for i in range(20)] + alloc.allocate(5)
+        self.assertEqual(len(set(values)), len(values))
+        for v in values:
+            u = uuid.UUID(format_id(v))
+            self.assertEqual(u.version, 4)
+            self.assertEqual(u.variant, uuid.RFC_4122)
+            self.assertEqual(u.int, v)
+
+        # A forked process does not reuse the parent's buffer
+        alloc.new_id()
+        r, w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.write(w, alloc.new_id().to_bytes(16, 'big'))
+            os._exit(0)
+        os.close(w)
+        child = int.from_bytes(os.read(r, 16), 'big')
+        os.close(r)
+        os.waitpid(pid, 0)
+        self.assertNotEqual(child, alloc.new_id())
+
+    def test_allocator(self):
+        previous = set_id_allocator(SequentialIds(namespace=7))
+        try:
+            team = Team(city="Tampa", nickname="Pokers", color="Red")
+            players = Player.from_arrays(["A B", "C D"], [1, 2], [3, 4], [5, 1], [2, 2])
+        finally:
+            set_id_allocator(previous)
+        self.assertEqual(team.id >> ids.COUNTER_BITS, 7)
+        self.assertEqual(players[1].id, players[0].id + 1)
+        # Strings only on serialization
+        self.assertEqual(team.to_json()['id'], format_id(team.id))
+        self.assertEqual(Team.from_json(team.to_json()).id, format_id(team.id))
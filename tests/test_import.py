@@ -0,0 +1,49 @@
+import os
+import sys
+import json
+import tempfile
+import unittest
+import subprocess
+
+HERE = os.path.split(os.path.abspath(__file__))[0]
+
+# Budget for a cold `import gator_poking`, in seconds.
+# The league generation path currently imports in a few tens of milliseconds;
+# importing scipy.stats alone takes about a second.
+IMPORT_TIME_BUDGET = 0.3
+
+IMPORT_SCRIPT = """
+import sys, time, json
+t0 = time.perf_counter()
+import gator_poking
+elapsed = time.perf_counter() - t0
+heavy = [m for m in ('numpy', 'scipy') if m in sys.modules]
+from gator_poking import Game
+json.dump({'elapsed': elapsed, 'heavy': heavy, 'scipy_after_game': 'scipy' in sys.modules}, sys.stdout)
+"""
+
+
+class ImportTest(unittest.TestCase):
+    """
+    Guard the import time of gator_poking
+    """
+    def test_import_budget(self):
+        with tempfile.TemporaryDirectory() as cwd:
+            # Best of a few runs, to keep a busy machine from failing the test
+            runs = []
+            for i in range(3):
+                out = subprocess.run(
+                    [sys.executable, '-c', IMPORT_SCRIPT],
+                    cwd = cwd,
+                    capture_output = True,
+                    check = True,
+                    text = True
+                )
+                runs.append(json.loads(out.stdout))
+            # Importing must not write any files (e.g. logs) to the working directory
+            self.assertEqual(os.listdir(cwd), [])
+
+        for run in runs:
+            self.assertEqual(run['heavy'], [])
+            self.assertFalse(run['scipy_after_game'])
+        self.assertLess(min(run['elapsed'] for run in runs), IMPORT_TIME_BUDGET)
@@ -0,0 +1,182 @@
+import os
+import json
+import random
+import asyncio
+import logging
+import tempfile
+import unittest
+from gator_poking import Game, MatchService
+from gator_poking.core import Team, Congregation
+from gator_poking.generators import RosterGenerator
+from gator_poking.rng import CounterRNG
+
+HERE = os.path.split(os.path.abspath(__file__))[0]
+
+
+class MatchServiceTest(unittest.TestCase):
+    """
+    Test gator_poking.live.MatchService
+    """
+    def setUp(self):
+        self.logger = logging.getLogger('gp')
+        self.logger.disabled = True
+        random.seed(8)
+        self.congregation = Congregation(place="Everglades", nickname="Glories", agg=3, rea=3, rxn=3, con=3)
+
+    def tearDown(self):
+        self.logger.disabled = False
+
+    def teams(self, n):
+        teams = []
+        for i in range(n):
+            team = Team(city="Tampa", nickname=f"Pokers {i}", color="Red")
+            team.set_roster(RosterGenerator().generate(size=11))
+            teams.append(team)
+        return teams
+
+    def test_matches(self):
+        teams = self.teams(20)
+
+        async def main():
+            service = MatchService(pace=0)
+            ids = [
+                service.start_match(teams[2*i], teams[2*i+1], self.congregation, rng=CounterRNG(3, i))
+                for i in range(10)
+            ]
+            with self.assertRaises(Exception):
+                service.start_match(teams[0], teams[5], self.congregation)
+            one = service.subscribe(ids[4])
+            everything = service.subscribe(queue_size=100000)
+            slow = service.subscribe(ids[7], queue_size=5)
+            messages = [m async for m in one]
+            await service.wait()
+            return ids, messages, everything, slow
+
+        ids, messages, everything, slow = asyncio.run(main())
+        self.assertEqual(messages[0]['type'], 'start')
+        self.assertEqual(messages[-1]['type'], 'end')
+        balls = [m for m in messages if m['type'] == 'ball']
+
+        # The live match is the same game as Game.simulate with the same stream
+        game = Game(team1=teams[8], team2=teams[9], congregation=self.congregation, rng=CounterRNG(3, 4))
+        game.simulate()
+        self.assertEqual(len(balls), game.innings[0].nballs + game.innings[1].nballs)
+        self.assertEqual(messages[-1]['result']['runs1'], game.result()['runs1'])
+        self.assertEqual(messages[-1]['result']['runs2'], game.result()['runs2'])
+        top = [m for m in balls if m['innings'] == 0]
+        self.assertEqual(top[-1]['runs'], game.result()['runs1'])
+        self.assertEqual(top[-1]['wickets'], game.result()['wickets1'])
+
+        # Every match is on the firehose
+        firehose = []
+        while not everything.queue.empty():
+            firehose.append(everything.queue.get_nowait())
+        self.assertEqual(sorted(m['match'] for m in firehose if m['type'] == 'end'), sorted(ids))
+
+        # The slow client kept only the newest messages
+        self.assertGreater(slow.dropped, 0)
+        self.assertEqual(slow.queue.qsize(), 5)
+
+        async def drain():
+            return [m async for m in slow]
+        kept = asyncio.run(drain())
+        self.assertEqual(kept[0]['type'], 'dropped')
+        self.assertEqual(kept[-1]['type'], 'end')
+
+    def test_late_subscribers(self):
+        teams = self.teams(2)
+
+        async def main():
+            service = MatchService(pace=0)
+            match_id = service.start_match(teams[0], teams[1], self.congregation, rng=CounterRNG(5, 1))
+            early = service.subscribe(match_id)
+            # Let a few overs go by
+            for _ in range(5):
+                await asyncio.sleep(0)
+            self.assertGreater(len(service.matches[match_id].history), 0)
+            late = service.subscribe(match_id)
+            await service.wait()
+            # Subscribing just after the end still gets the whole match
+            after = service.subscribe(match_id)
+            return [[m async for m in s] for s in [early, late, after]]
+
+        early, late, after = asyncio.run(main())
+        self.assertEqual(early[0]['type'], 'start')
+        self.assertEqual(early[-1]['type'], 'end')
+        self.assertEqual(late, early)
+        self.assertEqual(after, early)
+
+        with self.assertRaises(Exception):
+            asyncio.run(MatchService().subscribe('no-such-match'))
+
+    def test_stream_cancelled(self):
+        teams = self.teams(2)
+
+        class Writer(object):
+            closed = False
+            def write(self, data):
+                pass
+            async def drain(self):
+                pass
+            def close(self):
+                self.closed = True
+
+        async def main():
+            service = MatchService(pace=0)
+            match_id = service.start_match(teams[0], teams[1], self.congregation, paused=True)
+            subscription = service.subscribe(match_id)
+            writer = Writer()
+            task = asyncio.get_running_loop().create_task(service.stream(subscription, writer, str.encode))
+            await asyncio.sleep(0)
+            task.cancel()
+            # Shutting down can cancel a handler
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            self.assertTrue(writer.closed)
+            self.assertTrue(subscription.closed)
+            service.release(match_id)
+            await service.wait()
+
+        asyncio.run(main())
+
+    def test_servers(self):
+        teams = self.teams(2)
+
+        async def main(path):
+            service = MatchService(pace=0.001)
+            # Paused until both clients are subscribed
+            match_id = service.start_match(teams[0], teams[1], self.congregation, rng=CounterRNG(5, 0), paused=True)
+            sock = await service.serve_socket(path)
+            http = await service.serve_sse()
+            port = http.sockets[0].getsockname()[1]
+
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(f"{match_id}\n".encode())
+            await writer.drain()
+
+            hreader, hwriter = await asyncio.open_connection('127.0.0.1', port)
+            hwriter.write(f"GET /events/{match_id} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+            await hwriter.drain()
+
+            while len(service.matches[match_id].subscribers) < 2:
+                await asyncio.sleep(0.001)
+            service.release(match_id)
+
+            lines = [json.loads(line) for line in (await reader.read()).decode().splitlines()]
+            sse = (await hreader.read()).decode()
+            sock.close()
+            http.close()
+            return lines, sse
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            lines, sse = asyncio.run(main(os.path.join(tmpdir, 'live.sock')))
+        self.assertEqual(lines[0]['type'], 'start')
+        self.assertEqual(lines[-1]['type'], 'end')
+        self.assertTrue(sse.startswith('HTTP/1.1 200 OK'))
+        self.assertIn('text/event-stream', sse)
+        events = [json.loads(line[len('data: '):]) for line in sse.splitlines() if line.startswith('data: ')]
+        self.assertEqual(events, lines)
+
+        game = Game(team1=teams[0], team2=teams[1], congregation=self.congregation, rng=CounterRNG(5, 0))
+        game.simulate()
+        self.assertEqual(sum(1 for m in lines if m['type'] == 'ball'), game.innings[0].nballs + game.innings[1].nballs)
@@ -0,0 +1,97 @@
+import os
+import random
+import logging
+import unittest
+from unittest import mock
+import numpy as np
+from gator_poking import Game, MonteCarloGame
+from gator_poking.core import Team, Congregation, Player
+from gator_poking.outcomeroll import OutcomeRoll, PLAY_OUTCOMES, ATTR_KEYS
+from gator_poking.generators import RosterGenerator
+
+HERE = os.path.split(os.path.abspath(__file__))[0]
+
+
+class MonteCarloTest(unittest.TestCase):
+    """
+    Test gator_poking.montecarlo.MonteCarloGame against Game
+    """
+    @classmethod
+    def setUpClass(cls):
+        random.seed(11)
+        cls.team1 = Team(city="Tampa", nickname="Pokers", color="Red")
+        cls.team2 = Team(city="Ocala", nickname="Prodders", color="Blue")
+        cls.team1.set_roster(RosterGenerator().generate(size=11))
+        cls.team2.set_roster(RosterGenerator().generate(size=11))
+        cls.congregation = Congregation(place="Everglades", nickname="Glories", agg=3, rea=3, rxn=3, con=3)
+
+    def setUp(self):
+        self.logger = logging.getLogger('gp')
+        self.logger.disabled = True
+
+    def tearDown(self):
+        self.logger.disabled = False
+
+    def test_matches_game(self):
+        nscalar = 300
+        runs1 = []
+        runs2 = []
+        wickets1 = []
+        for i in range(nscalar):
+            g = Game(team1=self.team1, team2=self.team2, congregation=self.congregation)
+            g.simulate()
+            runs1.append(g.state.state1.runs)
+            runs2.append(g.state.state2.runs)
+            wickets1.append(g.state.state1.wickets)
+
+        mc = MonteCarloGame(team1=self.team1, team2=self.team2, congregation=self.congregation)
+        result = mc.simulate(20000, seed=5)
+        self.assertEqual(result.ngames, 20000)
+
+        # Compare means within 5 standard errors
+        for scalar, batch in [(runs1, result.runs1), (runs2, result.runs2), (wickets1, result.wickets1)]:
+            se = np.std(scalar)/np.sqrt(nscalar)
+            self.assertAlmostEqual(np.mean(scalar), batch.mean(), delta=5*se + 0.1)
+
+        win1, win2, tie = result.win_probability()
+        self.assertAlmostEqual(win1 + win2 + tie, 1.0)
+        h1, h2 = result.run_histograms()
+        self.assertEqual(h1.sum(), 20000)
+        # The chase stops as soon as team2 passes team1
+        won2 = result.runs2 > result.runs1
+        self.assertTrue(np.all(result.runs2[won2] - result.runs1[won2] <= 6))
+
+    def test_seeded(self):
+        mc = MonteCarloGame(team1=self.team1, team2=self.team2, congregation=self.congregation)
+        r1 = mc.simulate(100, seed=1)
+        r2 = mc.simulate(100, seed=1)
+        self.assertTrue(np.array_equal(r1.runs2, r2.runs2))
+
+    def test_striker_rotation(self):
+        # With the same scripted outcomes, the same players face the same balls as in Game.
+        # Every player has different star ratings, so each ball's striker can be told apart.
+        script = [1, -1, 4, -3, 0, 1, 6, -2, 1, -1, 0, 4, 1, 1, -3]
+        teams = []
+        for side in range(2):
+            team = Team(city="Tampa", nickname=f"Pokers {side}", color="Red")
+            team.set_roster([
+                Player(name=f"P {i}", agg=1 + i%5, rea=1 + (i//5)%5, rxn=1 + side, con=3)
+                for i in range(11)
+            ])
+            teams.append(team)
+
+        strikers = []
+        def play_roll(player, gator, rng=None, stats=None):
+            strikers.append(tuple(player.attr[k] for k in ATTR_KEYS))
+            return PLAY_OUTCOMES.index(script[(len(strikers) - 1)%len(script)])
+        with mock.patch.object(OutcomeRoll, 'play_roll', play_roll):
+            Game(team1=teams[0], team2=teams[1], congregation=self.congregation).simulate()
+        expected = strikers
+
+        strikers = []
+        def outcome_roll_batch(player_attrs, gator_attrs, rng=None):
+            strikers.extend(tuple(row) for row in np.asarray(player_attrs).tolist())
+            return np.array([script[(len(strikers) - 1)%len(script)]], dtype=np.int8)
+        with mock.patch.object(OutcomeRoll, 'outcome_roll_batch', outcome_roll_batch):
+            MonteCarloGame(team1=teams[0], team2=teams[1], congregation=self.congregation).simulate(1, seed=0)
+        self.assertEqual(strikers, expected)
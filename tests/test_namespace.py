@@ -0,0 +1,46 @@
+import os
+import random
+import unittest
+from gator_poking.namespace import KeyedPermutation, NameSpace
+from gator_poking.core import Team
+from gator_poking.generators import LeagueGenerator
+
+HERE = os.path.split(os.path.abspath(__file__))[0]
+
+
+class NameSpaceTest(unittest.TestCase):
+    """
+    Test gator_poking.namespace
+    """
+    def test_permutation(self):
+        for n in [1, 2, 3, 5, 17, 64, 1000]:
+            perm = KeyedPermutation(n, key=12345)
+            self.assertEqual(sorted(perm), list(range(n)))
+        self.assertNotEqual(list(KeyedPermutation(1000, 1)), list(KeyedPermutation(1000, 2)))
+        self.assertEqual(list(KeyedPermutation(1000, 1)), list(KeyedPermutation(1000, 1)))
+        with self.assertRaises(IndexError):
+            KeyedPermutation(10, 1)[10]
+
+    def test_namespace(self):
+        space = NameSpace([['a', 'b', 'c'], ['x', 'y'], ['1', '2', '3', '4']], key=9)
+        self.assertEqual(len(space), 24)
+        names = list(space.generate(24))
+        self.assertEqual(len(set(names)), 24)
+        self.assertEqual(list(space.generate(4, start=10)), names[10:14])
+        with self.assertRaises(Exception):
+            list(space.generate(25))
+
+    def test_large_league(self):
+        # More teams than there are cities
+        league, _ = LeagueGenerator().generate(size=48, rng=random.Random(5))
+        self.assertEqual(len({t['name'] for t in league.values()}), 48)
+        # Only 7 x 7 names in the bundled files
+        with self.assertRaises(Exception):
+            LeagueGenerator().generate(size=52, rng=random.Random(5))
+
+    def test_unique_names(self):
+        for seed in range(5):
+            size = 40
+            league, _ = LeagueGenerator().generate(size=size, rng=random.Random(seed))
+            teams = [Team.from_json(t) for t in league.values()]
+            self.assertEqual(len({t.name for t in teams}), size)
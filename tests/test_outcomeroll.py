@@ -0,0 +1,145 @@
+import os
+import random
+import unittest
+import numpy as np
+from gator_poking.outcomeroll import (
+    OutcomeRoll,
+    ATTR_KEYS,
+    NSTARS,
+    PLAYER_ATTR_SPACE,
+    PLAYER_CON_SPACE,
+    GATOR_ATTR_SPACE,
+    GATOR_CON_SPACE
+)
+from gator_poking.outcometable import DIFF_THRESHOLDS, NPLAYS
+
+HERE = os.path.split(os.path.abspath(__file__))[0]
+
+OUTCOMES = [6, 4, 1, 0, -1, -2, -3]
+
+
+class Roller(object):
+    def __init__(self, stars):
+        self.attr = dict(zip(ATTR_KEYS, stars))
+
+
+class OutcomeRollTest(unittest.TestCase):
+    """
+    Test gator_poking.outcomeroll.OutcomeRoll
+    """
+    def test_batch_shape(self):
+        rng = np.random.default_rng(1)
+        player_attrs = rng.integers(1, 6, size=(1000, 4))
+        outcomes = OutcomeRoll.outcome_roll_batch(player_attrs, [3, 3, 3, 3], rng)
+        self.assertEqual(outcomes.dtype, np.int8)
+        self.assertEqual(outcomes.shape, (1000,))
+        self.assertTrue(set(np.unique(outcomes)) <= set(OUTCOMES))
+
+    def test_batch_seeded(self):
+        o1 = OutcomeRoll.outcome_roll_batch([4, 2, 5, 1], [2, 3, 4, 5], np.random.default_rng(7))
+        o2 = OutcomeRoll.outcome_roll_batch([4, 2, 5, 1], [2, 3, 4, 5], np.random.default_rng(7))
+        self.assertTrue(np.array_equal(o1, o2))
+
+    def test_batch_matches_scalar(self):
+        pstars = [4, 3, 5, 2]
+        gstars = [3, 4, 2, 4]
+        player = Roller(pstars)
+        gator = Roller(gstars)
+
+        random.seed(3)
+        nscalar = 20000
+        scalar = [OutcomeRoll.outcome_roll(player, gator) for _ in range(nscalar)]
+
+        nbatch = 200000
+        player_attrs = np.tile(pstars, (nbatch, 1))
+        batch = OutcomeRoll.outcome_roll_batch(player_attrs, gstars, np.random.default_rng(3))
+
+        for outcome in OUTCOMES:
+            p_scalar = scalar.count(outcome)/nscalar
+            p_batch = np.count_nonzero(batch == outcome)/nbatch
+            self.assertAlmostEqual(p_scalar, p_batch, delta=0.015)
+
+
+class OutcomeTableTest(unittest.TestCase):
+    """
+    Test gator_poking.outcometable.OutcomeTable
+    """
+    @classmethod
+    def setUpClass(cls):
+        cls.table = OutcomeRoll.load_outcome_table()
+
+    def tearDown(self):
+        OutcomeRoll.use_outcome_table = False
+
+    def test_probabilities(self):
+        rng = np.random.default_rng(2)
+        player_attrs = rng.integers(1, 6, size=(50, 4))
+        gator_attrs = rng.integers(1, 6, size=(50, 4))
+        probs = self.table.play_probabilities(player_attrs, gator_attrs)
+        self.assertEqual(probs.shape, (50, 11))
+        self.assertTrue(np.all(probs >= 0.0))
+        self.assertTrue(np.allclose(probs.sum(axis=1), 1.0))
+
+    def test_matches_adaptive_quadrature(self):
+        # P(D <= t) = integral over x of pdf_player(x) * (1 - cdf_gator(x - t)),
+        # integrated adaptively, should agree with the table to 1e-6
+        from scipy.stats import beta
+        from scipy.integrate import quad
+        rng = np.random.default_rng(6)
+        for pa, pc, ga, gc in rng.integers(0, NSTARS, size=(6, 4)):
+            p_a = PLAYER_CON_SPACE[pc]
+            p_b = p_a*(1.0/PLAYER_ATTR_SPACE[pa] - 1.0)
+            g_a = GATOR_CON_SPACE[gc]
+            g_b = g_a*(1.0/GATOR_ATTR_SPACE[ga] - 1.0)
+            for it, t in enumerate(DIFF_THRESHOLDS):
+                # The gator survival function has kinks where x - t leaves [0, 1]
+                kinks = [x for x in (t, t + 1.0) if 0.0 < x < 1.0]
+                exact, _ = quad(
+                    lambda x: beta.pdf(x, p_a, p_b)*beta.sf(x - t, g_a, g_b),
+                    0.0, 1.0, points=kinks or None, epsabs=1e-10, limit=200
+                )
+                self.assertAlmostEqual(self.table.diff_cdf[pa, pc, ga, gc, it], exact, delta=1e-6)
+
+    def test_matches_play_roll(self):
+        # Every play's probability against scalar play_roll, within 5 standard errors
+        pstars = [3, 4, 2, 3]
+        gstars = [4, 2, 3, 2]
+        exact = self.table.play_probabilities(pstars, gstars)
+
+        player = Roller(pstars)
+        gator = Roller(gstars)
+        rng = random.Random(8)
+        n = 200000
+        counts = np.bincount([OutcomeRoll.play_roll(player, gator, rng) for _ in range(n)], minlength=NPLAYS)
+        for play in range(NPLAYS):
+            p = exact[play]
+            se = np.sqrt(p*(1.0 - p)/n)
+            self.assertAlmostEqual(counts[play]/n, p, delta=5*se + 1e-5)
+
+    def test_matches_rolls(self):
+        pstars = [4, 3, 5, 2]
+        gstars = [3, 4, 2, 4]
+        exact = self.table.outcome_probabilities(pstars, gstars)
+
+        n = 1000000
+        player_attrs = np.tile(pstars, (n, 1))
+        rolled = OutcomeRoll.outcome_roll_batch(player_attrs, gstars, np.random.default_rng(4))
+        OutcomeRoll.use_outcome_table = True
+        sampled = OutcomeRoll.outcome_roll_batch(player_attrs, gstars, np.random.default_rng(4))
+
+        for outcome in OUTCOMES:
+            p = exact[outcome]
+            se = np.sqrt(p*(1.0 - p)/n)
+            self.assertAlmostEqual(np.count_nonzero(rolled == outcome)/n, p, delta=5*se + 1e-5)
+            self.assertAlmostEqual(np.count_nonzero(sampled == outcome)/n, p, delta=5*se + 1e-5)
+
+        # Scalar alias sampling
+        player = Roller(pstars)
+        gator = Roller(gstars)
+        rng = random.Random(5)
+        nscalar = 50000
+        scalar = [OutcomeRoll.outcome_roll(player, gator, rng=rng) for _ in range(nscalar)]
+        for outcome in OUTCOMES:
+            p = exact[outcome]
+            se = np.sqrt(p*(1.0 - p)/nscalar)
+            self.assertAlmostEqual(scalar.count(outcome)/nscalar, p, delta=5*se + 1e-4)
@@ -0,0 +1,67 @@
+import os
+import logging
+import unittest
+import numpy as np
+from gator_poking import PlayerTable, MonteCarloGame, WinProbability
+from gator_poking.core import Team, Congregation
+
+HERE = os.path.split(os.path.abspath(__file__))[0]
+
+
+class PlayerTableTest(unittest.TestCase):
+    """
+    Test gator_poking.playertable.PlayerTable
+    """
+    def setUp(self):
+        self.logger = logging.getLogger('gp')
+        self.logger.disabled = True
+        self.table = PlayerTable.generate(50, size=11, rng=3)
+        self.congregation = Congregation(place="Everglades", nickname="Glories", agg=3, rea=3, rxn=3, con=3)
+
+    def tearDown(self):
+        self.logger.disabled = False
+
+    def test_generate(self):
+        table = self.table
+        self.assertEqual(len(table), 550)
+        self.assertEqual(table.nteams, 50)
+        self.assertEqual(table.stars.dtype, np.uint8)
+        self.assertTrue(table.stars.min() >= 1 and table.stars.max() <= 5)
+        self.assertTrue(np.array_equal(table.stars, PlayerTable.generate(50, size=11, rng=3).stars))
+
+        players = table.players(7)
+        self.assertEqual(len(players), 11)
+        self.assertEqual(players[2].attr['rxn'], table.attr('rxn')[7*11 + 2])
+        self.assertEqual(players[2].name, table.name(7*11 + 2))
+        with self.assertRaises(Exception):
+            table.rows(50)
+
+    def test_simulation(self):
+        # Star arrays and the equivalent Player objects give the same games
+        teams = []
+        for i in range(2):
+            team = Team(city="Tampa", nickname=f"Pokers {i}", color="Red")
+            team.set_roster(self.table.players(i))
+            teams.append(team)
+        from_objects = MonteCarloGame(team1=teams[0], team2=teams[1], congregation=self.congregation)
+        from_table = MonteCarloGame(
+            team1 = teams[0],
+            team2 = teams[1],
+            congregation = self.congregation,
+            roster1 = self.table.roster_stars(0),
+            roster2 = self.table.roster_stars(1)
+        )
+        r1 = from_objects.simulate(200, seed=4)
+        r2 = from_table.simulate(200, seed=4)
+        self.assertTrue(np.array_equal(r1.runs1, r2.runs1))
+        self.assertTrue(np.array_equal(r1.runs2, r2.runs2))
+
+        odds1 = WinProbability(team1=teams[0], team2=teams[1], congregation=self.congregation).compute()
+        odds2 = WinProbability(
+            team1 = teams[0],
+            team2 = teams[1],
+            congregation = self.congregation,
+            roster1 = self.table.roster_stars(0),
+            roster2 = self.table.roster_stars(1)
+        ).compute()
+        self.assertAlmostEqual(odds1['win1'], odds2['win1'])
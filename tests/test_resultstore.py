@@ -0,0 +1,93 @@
+import os
+import random
+import logging
+import tempfile
+import unittest
+import numpy as np
+from gator_poking import (
+    SeasonRunner,
+    ResultStore,
+    League,
+    GatorLeague,
+    LeagueGenerator,
+    GatorLeagueGenerator
+)
+
+HERE = os.path.split(os.path.abspath(__file__))[0]
+
+
+class ResultStoreTest(unittest.TestCase):
+    """
+    Test gator_poking.resultstore.ResultStore
+    """
+    def setUp(self):
+        self.logger = logging.getLogger('gp')
+        self.logger.disabled = True
+        self.tmpdir = tempfile.TemporaryDirectory()
+        wd = self.tmpdir.name
+        _, league_file = LeagueGenerator().generate(working_dir=wd, size=4, rng=random.Random(1))
+        _, gleague_file = GatorLeagueGenerator().generate(working_dir=wd, size=2, rng=random.Random(2))
+        self.runner = SeasonRunner(
+            League(league_file),
+            GatorLeague(gleague_file),
+            seed = 77,
+            workers = 2
+        )
+        self.store_dir = os.path.join(wd, 'results')
+
+    def tearDown(self):
+        self.logger.disabled = False
+        self.tmpdir.cleanup()
+
+    def test_season_store(self):
+        results = self.runner.run(chunksize=2, store=self.store_dir)
+        store = ResultStore(self.store_dir)
+        self.assertEqual(len(store), len(results))
+
+        # Rows are in completion order; the game column says which game each row is
+        games = np.array(store.column('game'))
+        self.assertEqual(sorted(games.tolist()), list(range(len(results))))
+        for row, idx in enumerate(games):
+            r = results[idx]
+            self.assertEqual(store.ids[store.column('team1')[row]], r['team1'])
+            self.assertEqual(store.ids[store.column('congregation')[row]], r['congregation'])
+            self.assertEqual(store.column('runs2')[row], r['runs2'])
+            self.assertEqual(bool(store.column('eaten1')[row]), r['eaten1'])
+            winner = {None: 0, r['team1']: 1, r['team2']: 2}[r['winner']]
+            self.assertEqual(store.column('winner')[row], winner)
+
+        # Ball-by-ball columns match a replayed game
+        row = int(np.flatnonzero(games == 3)[0])
+        game = self.runner.run_game(3)
+        for top, record in zip([True, False], game.innings):
+            balls = store.innings(row, top)
+            self.assertTrue(np.array_equal(balls['play'], record.play[:len(record)]))
+            self.assertTrue(np.array_equal(balls['striker'], record.striker[:len(record)]))
+        self.assertEqual(store.nballs, int(store.column('balls1').sum() + store.column('balls2').sum()))
+
+    def test_partial_write(self):
+        results = self.runner.run(store=self.store_dir)
+        store = ResultStore(self.store_dir)
+        n = len(store)
+
+        # Bytes left behind by a crashed writer are ignored, then overwritten
+        with open(store.column_file('runs1'), 'ab') as f:
+            f.write(b'\xff'*7)
+        self.assertEqual(len(store.column('runs1')), n)
+        store.append(results[:2], [self.runner.run_game(i).innings for i in range(2)])
+        self.assertEqual(len(store), n + 2)
+        self.assertEqual(os.path.getsize(store.column_file('runs1')), 4*(n + 2))
+        self.assertEqual(store.column('runs1')[n + 1], results[1]['runs1'])
+
+    def test_large_scores(self):
+        # Runs past 32767, as with a long enough OVERS_PER_INNING
+        result = dict(self.runner.run_game(0).result(), game=0, runs1=40000, runs2=39999)
+        store = ResultStore(self.store_dir, balls=False)
+        store.append([result])
+        self.assertEqual(int(store.column('runs1')[0]), 40000)
+        self.assertEqual(int(store.column('runs2')[0]), 39999)
+
+        # An existing store keeps its own setting
+        self.assertFalse(ResultStore(self.store_dir).balls)
+        with self.assertRaises(Exception):
+            ResultStore(self.store_dir, balls=True)
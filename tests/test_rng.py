@@ -0,0 +1,91 @@
+import os
+import random
+import logging
+import unittest
+from gator_poking import Game
+from gator_poking.core import Team, Congregation
+from gator_poking.generators import RosterGenerator
+from gator_poking.rng import philox4x32, CounterRNG, stream_seed
+
+HERE = os.path.split(os.path.abspath(__file__))[0]
+
+
+class RngTest(unittest.TestCase):
+    """
+    Test gator_poking.rng
+    """
+    def test_philox_known_answers(self):
+        # Known-answer vectors from the Random123 distribution
+        self.assertEqual(
+            philox4x32(0, 0, 0, 0, 0, 0),
+            (0x6627e8d5, 0xe169c58d, 0xbc57ac4c, 0x9b00dbd8)
+        )
+        self.assertEqual(
+            philox4x32(0x243f6a88, 0x85a308d3, 0x13198a2e, 0x03707344, 0xa4093822, 0x299f31d0),
+            (0xd16cfe09, 0x94fdcceb, 0x5001e420, 0x24126ea1)
+        )
+
+    def test_stream_seed(self):
+        self.assertEqual(stream_seed(1, 0, 5), stream_seed(1, 0, 5))
+        self.assertNotEqual(stream_seed(1, 0, 5), stream_seed(1, 0, 6))
+
+    def test_counter_rng(self):
+        rng = CounterRNG(99, 48213)
+        rng.seek(1, 12, 3)
+        rolls = [rng.random() for _ in range(6)]
+        self.assertTrue(all(0.0 < r < 1.0 for r in rolls))
+
+        # Same ball from a fresh stream, and from the vectorized form
+        other = CounterRNG(99, 48213)
+        other.seek(0, 0, 0)
+        other.random()
+        other.seek(1, 12, 3)
+        self.assertEqual(rolls, [other.random() for _ in range(6)])
+        self.assertEqual(rolls, list(rng.uniforms(1, 12, 3, 6)))
+
+        other.seek(1, 12, 4)
+        self.assertNotEqual(rolls, [other.random() for _ in range(6)])
+
+    def test_setup_draws(self):
+        # Draws before the first seek (rosters) do not repeat the first ball's rolls
+        rng = CounterRNG(5, 1)
+        setup = [rng.random() for _ in range(3)]
+        rng.seek(0, 0, 0)
+        self.assertNotEqual(setup, [rng.random() for _ in range(3)])
+
+        team1 = Team(city="Tampa", nickname="Pokers", color="Red")
+        team2 = Team(city="Ocala", nickname="Prodders", color="Blue")
+        cong = Congregation(place="Everglades", nickname="Glories", agg=3, rea=3, rxn=3, con=3)
+        rng = CounterRNG(5, 1)
+        Game(team1=team1, team2=team2, congregation=cong, rng=rng)
+        # Rolls used for the rosters Game made, against the rolls of ball 0.0
+        nrolls = rng.roll
+        self.assertGreater(nrolls, 0)
+        fresh = CounterRNG(5, 1)
+        roster_rolls = [fresh.random() for _ in range(nrolls)]
+        self.assertFalse(set(roster_rolls) & set(CounterRNG(5, 1).uniforms(0, 0, 0, nrolls)))
+
+    def test_replay_over(self):
+        logger = logging.getLogger('gp')
+        logger.disabled = True
+        try:
+            random.seed(4)
+            team1 = Team(city="Tampa", nickname="Pokers", color="Red")
+            team2 = Team(city="Ocala", nickname="Prodders", color="Blue")
+            team1.set_roster(RosterGenerator().generate(size=11))
+            team2.set_roster(RosterGenerator().generate(size=11))
+            cong = Congregation(place="Everglades", nickname="Glories", agg=3, rea=3, rxn=3, con=3)
+
+            game = Game(team1=team1, team2=team2, congregation=cong, rng=CounterRNG(7, 3))
+            game.simulate()
+            for top, over in [(True, 0), (True, 5), (False, 2)]:
+                wickets, runs = game.innings[0 if top else 1].overs()
+                replay = game.replay_over(top, over)
+                if over < len(runs):
+                    self.assertEqual(replay, (wickets[over], runs[over]))
+                else:
+                    self.assertIsNone(replay)
+                # The caller's logging setting is left as it was
+                self.assertTrue(logger.disabled)
+        finally:
+            logger.disabled = False
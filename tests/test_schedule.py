@@ -0,0 +1,85 @@
+import os
+import random
+import logging
+import tempfile
+import unittest
+from itertools import combinations
+from gator_poking import (
+    Schedule,
+    SeasonRunner,
+    League,
+    GatorLeague,
+    LeagueGenerator,
+    GatorLeagueGenerator
+)
+
+HERE = os.path.split(os.path.abspath(__file__))[0]
+
+
+class ScheduleTest(unittest.TestCase):
+    """
+    Test gator_poking.schedule.Schedule
+    """
+    def setUp(self):
+        self.logger = logging.getLogger('gp')
+        self.logger.disabled = True
+        self.tmpdir = tempfile.TemporaryDirectory()
+        wd = self.tmpdir.name
+        _, league_file = LeagueGenerator().generate(working_dir=wd, size=8, rng=random.Random(1))
+        _, gleague_file = GatorLeagueGenerator().generate(working_dir=wd, size=2, rng=random.Random(2))
+        self.league = League(league_file)
+        self.gator_league = GatorLeague(gleague_file)
+
+    def tearDown(self):
+        self.logger.disabled = False
+        self.tmpdir.cleanup()
+
+    def check_rounds(self, schedule):
+        for r in schedule.rounds:
+            teams = [t for f in r for t in f[:2]]
+            self.assertEqual(len(teams), len(set(teams)))
+
+    def test_round_robin(self):
+        for n in [2, 5, 8]:
+            teams = list(range(n))
+            schedule = Schedule.round_robin(teams, ['a', 'b'], legs=2)
+            self.check_rounds(schedule)
+            rounds = n - 1 if n%2 == 0 else n
+            self.assertEqual(len(schedule.rounds), 2*rounds)
+            # Every pair meets once each way round
+            pairs = sorted((t1, t2) for t1, t2, c in schedule.fixtures)
+            self.assertEqual(pairs, sorted([(i, j) for i, j in combinations(teams, 2)] + [(j, i) for i, j in combinations(teams, 2)]))
+            # A game waits on its teams' previous games
+            for i, (t1, t2, c) in enumerate(schedule.fixtures):
+                for j in schedule.depends[i]:
+                    self.assertLess(schedule.round_of[j], schedule.round_of[i])
+                    self.assertTrue({t1, t2} & set(schedule.fixtures[j][:2]))
+
+    def test_group_stage(self):
+        schedule = Schedule.from_leagues(self.league, self.gator_league, group_size=4)
+        self.check_rounds(schedule)
+        self.assertEqual(len(schedule.groups), 2)
+        self.assertEqual(len(schedule.rounds), 3)
+        self.assertEqual(len(schedule), 12)
+        group_of = {t: g for g, group in enumerate(schedule.groups) for t in group}
+        for t1, t2, c in schedule.fixtures:
+            self.assertEqual(group_of[t1], group_of[t2])
+        with self.assertRaises(Exception):
+            Schedule.group_stage(list(range(6)), ['a'], group_size=4)
+
+    def test_run_schedule(self):
+        schedule = Schedule.from_leagues(self.league, self.gator_league)
+        def runner(workers):
+            return SeasonRunner(self.league, self.gator_league, seed=5, workers=workers)
+
+        rounds = []
+        serial = runner(1).run_schedule(schedule, on_round=lambda r, results: rounds.append((r, len(results))))
+        self.assertEqual(rounds, [(r, 4) for r in range(7)])
+        parallel = runner(3).run_schedule(schedule, chunksize=1)
+        self.assertEqual(serial, parallel)
+        self.assertEqual(serial, runner(1).run(schedule.fixtures))
+
+        standings = schedule.standings(serial)
+        self.assertEqual(len(standings), 1)
+        self.assertEqual(sum(row[1] for row in standings[0]), 2*len(schedule))
+        self.assertEqual(sum(row[2] for row in standings[0]), 0)
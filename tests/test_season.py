@@ -0,0 +1,65 @@
+import os
+import random
+import logging
+import tempfile
+import unittest
+from gator_poking import (
+    SeasonRunner,
+    League,
+    GatorLeague,
+    LeagueGenerator,
+    GatorLeagueGenerator
+)
+
+HERE = os.path.split(os.path.abspath(__file__))[0]
+
+
+class SeasonRunnerTest(unittest.TestCase):
+    """
+    Test gator_poking.season.SeasonRunner
+    """
+    def setUp(self):
+        self.logger = logging.getLogger('gp')
+        self.logger.disabled = True
+        self.tmpdir = tempfile.TemporaryDirectory()
+        wd = self.tmpdir.name
+        _, league_file = LeagueGenerator().generate(working_dir=wd, size=4, rng=random.Random(1))
+        _, gleague_file = GatorLeagueGenerator().generate(working_dir=wd, size=2, rng=random.Random(2))
+        self.league_file = league_file
+        self.gleague_file = gleague_file
+
+    def tearDown(self):
+        self.logger.disabled = False
+        self.tmpdir.cleanup()
+
+    def runner(self, workers):
+        return SeasonRunner(
+            League(self.league_file),
+            GatorLeague(self.gleague_file),
+            seed = 1234,
+            workers = workers
+        )
+
+    def test_reproducible(self):
+        serial = self.runner(1).run()
+        parallel = self.runner(3).run()
+        self.assertEqual(len(serial), 6)
+        self.assertEqual(serial, parallel)
+        self.assertEqual([r['game'] for r in serial], list(range(6)))
+
+        # Any single game can be replayed on its own
+        game = self.runner(1).run_game(4)
+        result = game.result()
+        result['game'] = 4
+        self.assertEqual(result, serial[4])
+
+    def test_shared_league(self):
+        # Runners with different seeds on one League keep their own rosters
+        league = League(self.league_file)
+        gator_league = GatorLeague(self.gleague_file)
+        runner1 = SeasonRunner(league, gator_league, seed=1, workers=1)
+        runner2 = SeasonRunner(league, gator_league, seed=2, workers=1)
+        teamid = next(iter(runner1.teams))
+        self.assertIsNot(runner1.teams[teamid].roster, runner2.teams[teamid].roster)
+        self.assertIsNone(league.get_team(teamid).roster)
+        self.assertEqual(runner1.run(), SeasonRunner(league, gator_league, seed=1, workers=1).run())
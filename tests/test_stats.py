@@ -0,0 +1,73 @@
+import os
+import random
+import logging
+import unittest
+from gator_poking import Game, SimulationStats
+from gator_poking.core import Team, Congregation
+from gator_poking.generators import RosterGenerator
+from gator_poking.rng import CounterRNG
+
+HERE = os.path.split(os.path.abspath(__file__))[0]
+
+
+class SimulationStatsTest(unittest.TestCase):
+    """
+    Test gator_poking.stats.SimulationStats
+    """
+    def setUp(self):
+        self.logger = logging.getLogger('gp')
+        self.logger.disabled = True
+        random.seed(8)
+        self.team1 = Team(city="Tampa", nickname="Pokers", color="Red")
+        self.team2 = Team(city="Ocala", nickname="Prodders", color="Blue")
+        self.team1.set_roster(RosterGenerator().generate(size=11))
+        self.team2.set_roster(RosterGenerator().generate(size=11))
+        self.congregation = Congregation(place="Everglades", nickname="Glories", agg=3, rea=3, rxn=3, con=3)
+
+    def tearDown(self):
+        self.logger.disabled = False
+
+    def game(self, seed, stats=None):
+        return Game(
+            team1 = self.team1,
+            team2 = self.team2,
+            congregation = self.congregation,
+            rng = CounterRNG(seed, 0),
+            stats = stats
+        )
+
+    def test_counters(self):
+        snapshots = []
+        stats = SimulationStats(callback=snapshots.append, every=50)
+        results = []
+        for seed in range(5):
+            game = self.game(seed, stats)
+            game.simulate()
+            result = game.result()
+            # Counting doesn't change the game
+            plain = self.game(seed)
+            plain.simulate()
+            self.assertEqual(result['runs1'], plain.result()['runs1'])
+            self.assertEqual(result['runs2'], plain.result()['runs2'])
+            results.append((game, result))
+
+        balls = sum(g.innings[0].nballs + g.innings[1].nballs for g, r in results)
+        self.assertEqual(stats.games, 5)
+        self.assertEqual(stats.innings, 10)
+        self.assertEqual(stats.balls, balls)
+        self.assertEqual(stats.ppf_calls, 6*balls)
+        self.assertEqual(stats.runs, sum(r['runs1'] + r['runs2'] for g, r in results))
+        self.assertEqual(stats.wickets, sum(r['wickets1'] + r['wickets2'] for g, r in results))
+
+        # One snapshot every 50 balls
+        self.assertEqual(len(snapshots), balls//50)
+        self.assertEqual([s['balls'] for s in snapshots], [50*(i+1) for i in range(balls//50)])
+
+        snapshot = stats.snapshot()
+        self.assertGreater(snapshot['seconds'], 0)
+        self.assertAlmostEqual(sum(snapshot['time'].values()), snapshot['seconds'])
+        self.assertTrue(all(t >= 0 for t in snapshot['time'].values()))
+        self.assertIn('balls/sec', stats.report())
+
+        stats.reset()
+        self.assertEqual(stats.snapshot()['balls'], 0)
@@ -0,0 +1,68 @@
+import os
+import random
+import logging
+import unittest
+import numpy as np
+from gator_poking import MonteCarloGame, WinProbability
+from gator_poking.core import Team, Congregation
+from gator_poking.generators import RosterGenerator
+
+HERE = os.path.split(os.path.abspath(__file__))[0]
+
+
+class WinProbabilityTest(unittest.TestCase):
+    """
+    Test gator_poking.winprobability.WinProbability against MonteCarloGame
+    """
+    @classmethod
+    def setUpClass(cls):
+        random.seed(13)
+        cls.team1 = Team(city="Tampa", nickname="Pokers", color="Red")
+        cls.team2 = Team(city="Ocala", nickname="Prodders", color="Blue")
+        cls.team1.set_roster(RosterGenerator().generate(size=11))
+        cls.team2.set_roster(RosterGenerator().generate(size=11))
+        cls.congregation = Congregation(place="Everglades", nickname="Glories", agg=3, rea=3, rxn=3, con=3)
+
+    def setUp(self):
+        self.logger = logging.getLogger('gp')
+        self.logger.disabled = True
+
+    def tearDown(self):
+        self.logger.disabled = False
+
+    def test_matches_montecarlo(self):
+        wp = WinProbability(team1=self.team1, team2=self.team2, congregation=self.congregation)
+        odds = wp.compute()
+        self.assertAlmostEqual(odds['runs1'].sum(), 1.0)
+        self.assertAlmostEqual(odds['wickets1'].sum(), 1.0)
+        self.assertAlmostEqual(odds['win1'] + odds['win2'] + odds['tie'], 1.0)
+
+        ngames = 20000
+        mc = MonteCarloGame(team1=self.team1, team2=self.team2, congregation=self.congregation)
+        result = mc.simulate(ngames, seed=3)
+
+        # Compare within 5 standard errors
+        win1, win2, tie = result.win_probability()
+        for exact, sampled in [(odds['win1'], win1), (odds['win2'], win2), (odds['tie'], tie)]:
+            se = np.sqrt(exact*(1.0 - exact)/ngames)
+            self.assertAlmostEqual(exact, sampled, delta=5*se + 1e-3)
+
+        runs = np.arange(len(odds['runs1']))
+        mean = np.dot(runs, odds['runs1'])
+        se = np.sqrt(np.dot((runs - mean)**2, odds['runs1'])/ngames)
+        self.assertAlmostEqual(mean, result.runs1.mean(), delta=5*se)
+
+        wickets = np.arange(len(odds['wickets1']))
+        mean = np.dot(wickets, odds['wickets1'])
+        se = np.sqrt(np.dot((wickets - mean)**2, odds['wickets1'])/ngames)
+        self.assertAlmostEqual(mean, result.wickets1.mean(), delta=5*se)
+
+    def test_short_roster(self):
+        # Both batch simulations read up to PLAYERS_PER_SIDE players from each roster
+        short = Team(city="Tampa", nickname="Shorts", color="Red")
+        short.set_roster(RosterGenerator().generate(size=5))
+        for cls in [WinProbability, MonteCarloGame]:
+            with self.assertRaises(Exception):
+                cls(team1=short, team2=self.team2, congregation=self.congregation)
+            with self.assertRaises(Exception):
+                cls(team1=self.team1, team2=self.team2, congregation=self.congregation, roster2=np.ones((11, 3)))